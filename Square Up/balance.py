@@ -0,0 +1,228 @@
+# balance.py
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import statistics
+import multiprocessing
+import numpy as np
+import save
+from iowriter import IO
+
+# ==========================================
+# MONTE CARLO WAVE BALANCE
+# ==========================================
+# Plays many headless games with the scripted bot (bot.py) across a process
+# pool and reports, per level: how many runs got there, how long the wave
+# took, damage taken, money at the end of the wave and how long enemies
+# lived. Use it to check a balance change before anyone has to play it.
+#
+#   python balance.py --runs 64 --workers 8 --max-level 10
+#
+# Each run is seeded (--seed + run index), so a single run can be replayed.
+# --start begins every run from a snapshot (see save.py, e.g. a boss fight)
+# instead of level 1.
+# Headless games tick at a fixed --tick; bullet hits are swept, so a coarser
+# tick than the 120 FPS the game renders at does not let shots tunnel.
+
+_GAME = None  # One Game per worker process, reset between runs
+
+
+def _init_worker():
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    # SDL turns SIGTERM into a quit event by default, which would keep the
+    # pool from ever shutting its workers down
+    os.environ["SDL_NO_SIGNAL_HANDLERS"] = "1"
+
+
+def _get_game():
+    global _GAME
+    from main import Game
+    if _GAME is None:
+        _GAME = Game(headless=True)
+    else:
+        _GAME.reset_game()
+    return _GAME
+
+
+def _new_level(game, t):
+    return {"level": game.level, "start": t, "duration": 0.0, "damage": 0.0,
+            "money_start": game.player.money, "money_end": None,
+            "kill_times": [], "cleared": False, "died": False}
+
+
+def play_run(job):
+    """Plays one game to death, --max-level or --max-time. Returns a plain dict."""
+    seed, max_level, max_time, tick, start = job
+    from bot import ScriptedBot
+    game = _get_game()
+    if start:
+        save.load_file(game, start)
+    else:
+        game.land()  # No intro drop in headless runs
+    # Seed after loading: a snapshot carries its own RNG state, and every run
+    # from the same snapshot should still play out differently
+    random.seed(seed)
+    np.random.seed(seed % (2 ** 32))
+    bot = ScriptedBot(seed)
+
+    t = 0.0
+    levels = [_new_level(game, t)]
+    born = {}  # enemy uid -> time first seen
+    outcome = "timeout"
+    wall_t0 = time.perf_counter()
+
+    while t < max_time:
+        lv = levels[-1]
+        if not game.wave_active:
+            lv["cleared"] = True
+            lv["duration"] = t - lv["start"]
+            lv["money_end"] = game.player.money
+            if game.level >= max_level:
+                outcome = "cleared"
+                break
+            lv["bought"] = bot.shop(game)
+            game.start_next_level()
+            levels.append(_new_level(game, t))
+            continue
+
+        hp = game.player.health
+        before = game.enemies
+        game.update(tick, bot.act(game, tick))
+        t += tick
+
+        lost = hp - game.player.health
+        if lost > 0: lv["damage"] += lost
+
+        alive = {e.uid for e in game.enemies}
+        for e in before:
+            if e.uid not in alive:
+                lv["kill_times"].append(t - born.pop(e.uid, t))
+        for e in game.enemies:
+            born.setdefault(e.uid, t)
+
+        if game.game_over:
+            outcome = "died"
+            lv["died"] = True
+            break
+
+    lv = levels[-1]
+    if not lv["cleared"]:
+        lv["duration"] = t - lv["start"]
+        lv["money_end"] = game.player.money
+    IO.flush()  # Pool workers exit without running atexit: this run's metrics go to disk now
+    return {"seed": seed, "outcome": outcome, "survival_time": t, "level_reached": game.level,
+            "wall_time": time.perf_counter() - wall_t0, "levels": levels}
+
+
+# ==========================================
+# AGGREGATION
+# ==========================================
+def _mean(xs):
+    return statistics.fmean(xs) if xs else 0.0
+
+
+def _pct(xs, q):
+    if not xs: return 0.0
+    xs = sorted(xs)
+    return xs[min(len(xs) - 1, int(q * len(xs)))]
+
+
+def summarize(runs):
+    by_level = {}
+    for run in runs:
+        for lv in run["levels"]:
+            by_level.setdefault(lv["level"], []).append(lv)
+
+    levels = []
+    for level in sorted(by_level):
+        rows = by_level[level]
+        cleared = [r for r in rows if r["cleared"]]
+        kills = [k for r in rows for k in r["kill_times"]]
+        levels.append({
+            "level": level,
+            "reached": len(rows),
+            "cleared": len(cleared),
+            "died": sum(1 for r in rows if r["died"]),
+            "duration_mean": _mean([r["duration"] for r in cleared]),
+            "damage_mean": _mean([r["damage"] for r in rows]),
+            "money_end_mean": _mean([r["money_end"] for r in cleared]),
+            "kill_time_mean": _mean(kills),
+            "kill_time_median": statistics.median(kills) if kills else 0.0,
+            "kill_time_p90": _pct(kills, 0.9),
+        })
+
+    survival = [r["survival_time"] for r in runs]
+    return {
+        "runs": len(runs),
+        "outcomes": {o: sum(1 for r in runs if r["outcome"] == o) for o in ("died", "cleared", "timeout")},
+        "survival_mean": _mean(survival),
+        "survival_median": statistics.median(survival) if survival else 0.0,
+        "survival_min": min(survival, default=0.0),
+        "survival_max": max(survival, default=0.0),
+        "levels": levels,
+    }
+
+
+def format_report(summary):
+    lines = [f"runs: {summary['runs']}  outcomes: {summary['outcomes']}",
+             f"survival (sim s): mean {summary['survival_mean']:.1f}  median {summary['survival_median']:.1f}  "
+             f"min {summary['survival_min']:.1f}  max {summary['survival_max']:.1f}",
+             "",
+             f"{'lvl':>3} {'reach':>5} {'clear':>5} {'died':>4} {'wave s':>7} {'dmg':>6} {'$ end':>7} "
+             f"{'kill mean':>9} {'median':>7} {'p90':>6}"]
+    for lv in summary["levels"]:
+        lines.append(f"{lv['level']:>3} {lv['reached']:>5} {lv['cleared']:>5} {lv['died']:>4} "
+                     f"{lv['duration_mean']:>7.1f} {lv['damage_mean']:>6.1f} {lv['money_end_mean']:>7.0f} "
+                     f"{lv['kill_time_mean']:>9.2f} {lv['kill_time_median']:>7.2f} {lv['kill_time_p90']:>6.2f}")
+    return "\n".join(lines)
+
+
+# ==========================================
+# CLI
+# ==========================================
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Headless Monte Carlo balance runs for Square Up")
+    ap.add_argument("--runs", type=int, default=32)
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    ap.add_argument("--seed", type=int, default=0, help="Seed of the first run; run i uses seed + i")
+    ap.add_argument("--max-level", type=int, default=10)
+    ap.add_argument("--max-time", type=float, default=900.0, help="Simulated seconds per run")
+    ap.add_argument("--tick", type=float, default=1.0 / 30.0, help="Fixed simulation step in seconds")
+    ap.add_argument("--start", help="Start every run from this snapshot instead of level 1")
+    ap.add_argument("--json", help="Also write raw runs + summary to this file")
+    ap.add_argument("--memtrace", action="store_true",
+                    help="Per-wave tracemalloc reports on the metrics stream (memtrace.py); set $SQUARE_UP_METRICS")
+    args = ap.parse_args(argv)
+    if args.memtrace: os.environ["SQUARE_UP_MEMTRACE"] = "1"  # Read when each worker builds its Game
+
+    jobs = [(args.seed + i, args.max_level, args.max_time, args.tick, args.start) for i in range(args.runs)]
+    t0 = time.perf_counter()
+    runs = []
+    if args.workers <= 1:
+        _init_worker()
+        for job in jobs: runs.append(play_run(job))
+    else:
+        with multiprocessing.Pool(args.workers, initializer=_init_worker) as pool:
+            for run in pool.imap_unordered(play_run, jobs):
+                runs.append(run)
+                print(f"  run {len(runs)}/{args.runs}: seed {run['seed']} {run['outcome']} "
+                      f"at level {run['level_reached']} ({run['survival_time']:.0f}s sim, "
+                      f"{run['wall_time']:.1f}s wall)", file=sys.stderr)
+            pool.close()
+            pool.join()
+    runs.sort(key=lambda r: r["seed"])
+
+    summary = summarize(runs)
+    print(format_report(summary))
+    print(f"\n{args.runs} runs in {time.perf_counter() - t0:.1f}s wall")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"args": vars(args), "summary": summary, "runs": runs}, f, indent=1)
+
+
+if __name__ == "__main__":
+    main()
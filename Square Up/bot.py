@@ -0,0 +1,116 @@
+# bot.py
+import math
+import random
+from config import *
+from utils import distance, check_grid_collision
+from controls import Controls
+
+# ==========================================
+# SCRIPTED BALANCE BOT
+# ==========================================
+# A deliberately simple player used by balance.py. It is not meant to play
+# well, just consistently: the same bot on the same seed plays the same game,
+# so changes in the numbers come from the game, not from the player.
+#
+# Combat: aim at the nearest enemy, keep it between KITE_MIN and KITE_MAX
+# tiles away, strafe around it, dash out when something gets too close.
+# Shop: heal when low, then weapon upgrades, then the cheapest stat upgrade.
+
+KITE_MIN = 4.0
+KITE_MAX = 6.5
+PANIC_DIST = 1.5
+HEAL_BELOW = 0.6  # Fraction of max HP
+GRENADE_CLUSTER = 3  # Enemies within GRENADE_RADIUS of the target
+GRENADE_RADIUS = 2.0
+ULT_MIN_ENEMIES = 5
+
+# Stat upgrades, by button label. The bot buys whichever is cheapest.
+UPGRADES = ("Damage +20%", "Fire Rate +0.5", "Pierce +1", "Regen +0.5", "BUY DRONE")
+WEAPON_ORDER = (("BUY SHOTGUN", "shotgun"),)
+SAVE_FROM_LEVEL = 2  # From this wave on, stat upgrades never eat into the next weapon's price
+
+
+class ScriptedBot:
+    def __init__(self, seed=None):
+        self.rng = random.Random(seed)
+        self.strafe = 1
+        self.strafe_timer = 0.0
+        self.grenade_timer = 0.0
+
+    # --- COMBAT ---
+    def act(self, game, dt):
+        """Returns this tick's Controls for `game`."""
+        c = Controls()
+        p = game.player
+        self.strafe_timer -= dt
+        self.grenade_timer -= dt
+        if self.strafe_timer <= 0:
+            self.strafe = self.rng.choice((-1, 1))
+            self.strafe_timer = self.rng.uniform(1.0, 3.0)
+
+        if not game.enemies:
+            return c
+
+        target = min(game.enemies, key=lambda e: distance(p.wx, p.wy, e.wx, e.wy))
+        dist = distance(p.wx, p.wy, target.wx, target.wy)
+        c.fire = True
+        c.aim_wx, c.aim_wy = target.wx, target.wy
+
+        # Unit vector towards the target and its perpendicular
+        dx, dy = (target.wx - p.wx) / max(dist, 1e-6), (target.wy - p.wy) / max(dist, 1e-6)
+        px, py = -dy * self.strafe, dx * self.strafe
+        if dist < KITE_MIN:
+            mx, my = -dx + px * 0.5, -dy + py * 0.5
+        elif dist > KITE_MAX:
+            mx, my = dx + px * 0.3, dy + py * 0.3
+        else:
+            mx, my = px, py
+        c.move_x, c.move_y = self._steer(game, mx, my)
+
+        c.dash = dist < PANIC_DIST
+
+        if p.grenade_count > 0 and self.grenade_timer <= 0:
+            cluster = sum(1 for e in game.enemies if distance(e.wx, e.wy, target.wx, target.wy) < GRENADE_RADIUS)
+            if cluster >= GRENADE_CLUSTER:
+                c.grenade_target = (target.wx, target.wy)
+                self.grenade_timer = 2.0
+
+        c.ultimate = p.energy >= p.max_energy and len(game.enemies) >= ULT_MIN_ENEMIES
+        return c
+
+    def _steer(self, game, mx, my):
+        """Turns the wanted direction away from walls (tries +-45 and +-90 degrees)."""
+        l = math.hypot(mx, my)
+        if l == 0: return 0, 0
+        mx, my = mx / l, my / l
+        p = game.player
+        look = 0.8
+        for turn in (0, 45, -45, 90, -90, 135, -135):
+            a = math.radians(turn * self.strafe)
+            tx = mx * math.cos(a) - my * math.sin(a)
+            ty = mx * math.sin(a) + my * math.cos(a)
+            if not check_grid_collision(p.wx + tx * look, p.wy + ty * look, game.map_grid):
+                return tx, ty
+        return -mx, -my
+
+    # --- SHOP ---
+    def shop(self, game):
+        """Spends money between waves. Returns the list of labels bought."""
+        p = game.player
+        buttons = {b.text: b for b in game.buttons}
+        bought = []
+        while p.health < p.stats["hp_max"] * HEAL_BELOW and buttons["Heal (30HP)"].buy(p):
+            bought.append("Heal (30HP)")
+        reserve = 0
+        for label, weapon in WEAPON_ORDER:
+            if p.weapon_type == weapon: continue
+            if buttons[label].buy(p):
+                bought.append(label)
+            elif game.level >= SAVE_FROM_LEVEL:
+                reserve = buttons[label].cost_fn()[0]
+                break
+        while True:
+            label = min(UPGRADES, key=lambda name: buttons[name].cost_fn()[0])
+            if p.money - buttons[label].cost_fn()[0] < reserve or not buttons[label].buy(p): break
+            bought.append(label)
+        return bought
@@ -0,0 +1,134 @@
+# bullets.py
+import math
+import numpy as np
+import pygame
+from pools import PackedPool
+
+
+# ==========================================
+# POOLED BULLET STORE
+# ==========================================
+# Every live projectile lives in one set of parallel arrays instead of a list
+# of bullet objects. Live bullets are always packed into [0, count), so the
+# update is a handful of array ops no matter how many are on screen.
+#
+# Pierce history is stored alongside: each row keeps the uids (ecs handles)
+# it has already hit in a small int64 block, widened only when a bullet
+# pierces more enemies than any before it, and narrowed again once the
+# bullets that needed it are gone.
+
+HIT_SLOTS = 4  # Initial width of the per-bullet hit block
+
+
+class BulletPool(PackedPool):
+    FIELDS = ("wx", "wy", "px", "py", "vx", "vy", "damage", "lifetime", "radius", "pierce", "owner", "color",
+              "hit_count", "hit_ids")
+
+    def __init__(self, capacity=256):
+        self.wx = np.zeros(0)
+        self.wy = np.zeros(0)
+        self.px = np.zeros(0)  # Position at the start of the current step (for swept tests)
+        self.py = np.zeros(0)
+        self.vx = np.zeros(0)
+        self.vy = np.zeros(0)
+        self.damage = np.zeros(0)
+        self.lifetime = np.zeros(0)
+        self.radius = np.zeros(0)
+        self.pierce = np.zeros(0, dtype=np.int32)
+        self.owner = np.zeros(0, dtype=np.int64)
+        self.color = np.zeros((0, 3), dtype=np.uint8)
+        self.hit_count = np.zeros(0, dtype=np.int32)
+        self.hit_ids = np.zeros((0, HIT_SLOTS), dtype=np.int64)  # First hit_count[i] entries are live
+        super().__init__(capacity)
+
+    def _reserve(self, n):
+        s = super()._reserve(n)
+        self.hit_count[s] = 0
+        return s
+
+    # --- EMISSION ---
+    def spawn(self, wx, wy, dx, dy, speed, damage, pierce, color, owner_id, lifetime=3.0, radius=5):
+        """Single bullet; (dx, dy) is normalized and scaled to `speed`."""
+        l = math.hypot(dx, dy)
+        if l == 0: l = 1
+        s = self._reserve(1)
+        i = s.start
+        self.wx[i] = self.px[i] = wx
+        self.wy[i] = self.py[i] = wy
+        self.vx[i] = (dx / l) * speed
+        self.vy[i] = (dy / l) * speed
+        self.damage[i] = damage
+        self.pierce[i] = pierce
+        self.lifetime[i] = lifetime
+        self.radius[i] = radius
+        self.color[i] = color
+        self.owner[i] = owner_id
+        return i
+
+    def emit(self, wx, wy, cos_arr, sin_arr, speed, damage, pierce, color, owner_id, lifetime=3.0, radius=5):
+        """Bulk emission from unit direction tables (e.g. a compiled pattern)."""
+        n = len(cos_arr)
+        if n == 0: return
+        s = self._reserve(n)
+        self.wx[s] = self.px[s] = wx
+        self.wy[s] = self.py[s] = wy
+        self.vx[s] = np.asarray(cos_arr) * speed
+        self.vy[s] = np.asarray(sin_arr) * speed
+        self.damage[s] = damage
+        self.pierce[s] = pierce
+        self.lifetime[s] = lifetime
+        self.radius[s] = radius
+        self.color[s] = color
+        self.owner[s] = owner_id
+
+    def clear(self):
+        super().clear()
+        self._narrow_hits()
+
+    # --- PIERCE HITS ---
+    def has_hit(self, i, uid):
+        return uid in self.hit_ids[i, :self.hit_count[i]]
+
+    def add_hit(self, i, uid):
+        k = int(self.hit_count[i])
+        if k == self.hit_ids.shape[1]:
+            self.hit_ids = np.pad(self.hit_ids, ((0, 0), (0, k)))
+        self.hit_ids[i, k] = uid
+        self.hit_count[i] = k + 1
+
+    def hits(self, i):
+        return self.hit_ids[i, :self.hit_count[i]].tolist()
+
+    # --- SIMULATION ---
+    def update(self, dt):
+        n = self.count
+        if n == 0: return
+        self.px[:n] = self.wx[:n]
+        self.py[:n] = self.wy[:n]
+        self.wx[:n] += self.vx[:n] * dt
+        self.wy[:n] += self.vy[:n] * dt
+        self.lifetime[:n] -= dt
+        self.compact()
+
+    def compact(self):
+        """Drops expired bullets, keeping the live ones packed at the front."""
+        if self.keep(self.lifetime[:self.count] > 0):
+            self._narrow_hits()
+
+    def _narrow_hits(self):
+        """Drops the hit block back to HIT_SLOTS once no live bullet needs the extra width."""
+        if self.hit_ids.shape[1] == HIT_SLOTS: return
+        if self.hit_count[:self.count].max(initial=0) <= HIT_SLOTS:
+            self.hit_ids = self.hit_ids[:, :HIT_SLOTS].copy()
+
+    # --- RENDERING ---
+    def draw(self, surf, cam):
+        n = self.count
+        if n == 0: return
+        sx, sy = cam.world_to_screen_array(self.wx[:n], self.wy[:n])
+        radii = (self.radius[:n] * cam.zoom).tolist()
+        colors = self.color[:n].tolist()
+        circle = pygame.draw.circle
+        for x, y, r, col in zip(sx.tolist(), sy.tolist(), radii, colors):
+            circle(surf, (255, 200, 50), (x, y), r + 2, 1)
+            circle(surf, col, (x, y), r)
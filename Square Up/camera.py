@@ -5,9 +5,12 @@ from config import *
 
 
 class Camera:
-    def __init__(self, width, height):
+    def __init__(self, width, height, render_scale=1.0):
+        # width/height are the size of the surface we project onto (the scene),
+        # render_scale is scene pixels per display pixel
         self.w = width
         self.h = height
+        self.render_scale = render_scale
 
         # Focus Point (World Coordinates)
         self.focus_wx = 0.0
@@ -15,8 +18,9 @@ class Camera:
         self.target_wx = 0.0
         self.target_wy = 0.0
 
-        self.zoom = 1.0
+        self.view_zoom = 1.0  # The zoom the player sees (ZOOM_MIN..ZOOM_MAX)
         self.target_zoom = 1.0
+        self.zoom = self.view_zoom * render_scale  # Effective scene zoom, used by all drawing
 
         # ROTATION ANIMATION VARIABLES
         self.angle = 0.0  # The current visual angle (smooth)
@@ -27,6 +31,8 @@ class Camera:
         self.shake_mag = 0.0
         self.shake_offset_x = 0
         self.shake_offset_y = 0
+        # Shake is cosmetic: its own generator keeps it out of the simulation's random stream
+        self.shake_rng = random.Random()
 
     def rotate_view(self):
         # Update the logical index (for controls)
@@ -44,6 +50,16 @@ class Camera:
     def zoom_out(self):
         self.target_zoom = max(self.target_zoom - 0.1, ZOOM_MIN)
 
+    def set_render_scale(self, width, height, render_scale):
+        self.w = width
+        self.h = height
+        self.render_scale = render_scale
+        self.zoom = self.view_zoom * render_scale
+
+    def at_rest(self):
+        """True when not mid-rotation or mid-zoom (cached sprites are exact)."""
+        return self.angle == self.target_angle and self.view_zoom == self.target_zoom
+
     def set_target(self, wx, wy):
         self.target_wx = wx
         self.target_wy = wy
@@ -53,18 +69,24 @@ class Camera:
         speed = 5.0
         self.focus_wx += (self.target_wx - self.focus_wx) * speed * dt
         self.focus_wy += (self.target_wy - self.focus_wy) * speed * dt
-        self.zoom += (self.target_zoom - self.zoom) * speed * dt
+        self.view_zoom += (self.target_zoom - self.view_zoom) * speed * dt
 
         # 2. Smoothly interpolate Rotation Angle
         # "10.0" is the rotation speed. Higher = faster snap.
         diff = self.target_angle - self.angle
         self.angle += diff * 10.0 * dt
 
+        # Snap once close enough so cached layers (floor) stop rebuilding
+        if abs(self.target_zoom - self.view_zoom) < 0.001: self.view_zoom = self.target_zoom
+        if abs(self.target_angle - self.angle) < 0.001: self.angle = self.target_angle
+        self.zoom = self.view_zoom * self.render_scale
+
         # 3. Handle Shake
         if self.shake_timer > 0:
             self.shake_timer -= dt
-            self.shake_offset_x = random.uniform(-self.shake_mag, self.shake_mag)
-            self.shake_offset_y = random.uniform(-self.shake_mag, self.shake_mag)
+            mag = self.shake_mag * self.render_scale
+            self.shake_offset_x = self.shake_rng.uniform(-mag, mag)
+            self.shake_offset_y = self.shake_rng.uniform(-mag, mag)
             self.shake_mag = max(0, self.shake_mag - 60 * dt)
         else:
             self.shake_offset_x = 0
@@ -96,6 +118,22 @@ class Camera:
 
         return final_sx, final_sy
 
+    def world_to_screen_array(self, wx, wy):
+        """Same projection as world_to_screen, applied to whole numpy arrays at once."""
+        half_w = TILE_W_BASE * self.zoom / 2.0
+        half_h = TILE_H_BASE * self.zoom / 2.0
+        c = math.cos(self.angle)
+        s = math.sin(self.angle)
+
+        rx = wx - self.focus_wx
+        ry = wy - self.focus_wy
+        rot_x = rx * c - ry * s
+        rot_y = rx * s + ry * c
+
+        sx = (rot_x - rot_y) * half_w + (self.w / 2.0 + self.shake_offset_x)
+        sy = (rot_x + rot_y) * half_h + (self.h / 2.0 + self.shake_offset_y)
+        return sx, sy
+
     def screen_to_world(self, sx, sy):
         tile_w = TILE_W_BASE * self.zoom
         tile_h = TILE_H_BASE * self.zoom
@@ -6,6 +6,34 @@
 SCREEN_W, SCREEN_H = 1280, 720
 FPS = 120
 
+# Internal render resolution (fraction of the window). The world, lighting and
+# effects render at this scale and are stretched up once per frame; the HUD
+# always draws at full resolution. F6 cycles through RENDER_SCALES in game.
+RENDER_SCALE = 1.0
+RENDER_SCALES = (1.0, 0.75, 0.5)
+
+# Floor rebuilds and the fog/light pass run on a background thread while the
+# main thread draws entities (render_worker.py). Ignored on single-core machines.
+# Off until `python render_worker.py bench` shows a gain on 4+ core machines
+RENDER_WORKER = False
+
+# Snapshot written on every wave transition (F5 quicksaves, F9 loads it)
+AUTOSAVE_FILE = "autosave.sqs"
+
+# Resolved fonts and baked textures, relative to the game folder (startup_cache.py)
+CACHE_DIR = ".cache"
+
+# JSON-lines metrics stream (GC pauses, frame spikes). None = in memory only
+METRICS_FILE = None
+
+# tracemalloc snapshots around every wave, reported as "mem_wave" metrics
+# (memtrace.py). Slows the game down; $SQUARE_UP_MEMTRACE=1 also turns it on
+MEMTRACE = False
+
+# Walls only shadow lights out to this fraction of the light's radius; the
+# gradient is too dim past it to matter (occlusion.py)
+OCCLUSION_REACH = 0.85
+
 # World Settings
 TILE_W_BASE, TILE_H_BASE = 96, 48
 MAP_W, MAP_H = 40, 40
@@ -0,0 +1,29 @@
+# controls.py
+
+# ==========================================
+# PLAYER CONTROLS
+# ==========================================
+class Controls:
+    """One frame of player intent.
+
+    Filled from the keyboard/mouse by Game.read_controls, or by a bot for
+    headless runs. Movement is already in world space (camera rotation applied).
+    """
+
+    def __init__(self):
+        self.move_x = 0
+        self.move_y = 0
+        self.dash = False
+        self.fire = False
+        self.aim_wx = 0.0
+        self.aim_wy = 0.0
+        self.ultimate = False
+        self.grenade_target = None  # (wx, wy) to throw at this frame
+
+    def held(self):
+        """A copy without the one-shot actions, for the extra sub-steps of a frame."""
+        c = Controls()
+        c.__dict__.update(self.__dict__)
+        c.ultimate = False
+        c.grenade_target = None
+        return c
@@ -0,0 +1,285 @@
+# ecs.py
+import weakref
+import numpy as np
+from config import *
+from utils import grid_array, grid_blocked
+
+# ==========================================
+# ARCHETYPE COMPONENT STORE
+# ==========================================
+# Per-entity numeric state (position, knockback, health, timers...) lives in
+# contiguous arrays instead of instance dicts. Every distinct set of
+# components is an archetype with its own table: one float64 column per
+# field, live rows packed at the front, removal by swapping the last row in.
+#
+# The gameplay classes stay as they were, but declare their components and
+# read/write them through Column descriptors, so `enemy.wx += 1` still works
+# and code can move onto whole-array systems one piece at a time:
+#
+#   physics_system     knockback movement + wall collision + friction
+#   timer_system       hit flash and lifetime countdowns
+#   project_system     screen position of everything with a render component
+#
+# A row belongs to its object until the object is garbage collected
+# (weakref.finalize), so nothing has to remember to unregister entities.
+# Collected rows are only queued there and removed when a system next asks
+# for the table (or the next spawn into it), so rows never move while a
+# system is working on them.
+#
+# Spawning also issues the entity's uid from the store's HandleTable: an
+# (index, generation) pair packed into one int. Freeing a slot bumps its
+# generation, so a uid kept after its entity died (a bullet owner, a pierce
+# hit) never matches the next entity that reuses the slot, unlike the id()
+# values used before.
+#
+# Each Game owns one EntityStore (a fresh one per reset_game / load) and
+# passes it to the systems. Entity constructors have no game to ask, so they
+# spawn into the active store: the Game activates its own before it builds
+# or steps the world, and rows of an older store are never stepped again.
+
+COMPONENTS = {
+    "position": ("wx", "wy", "z"),
+    "body": ("radius",),
+    "knockback": ("knockback_x", "knockback_y"),
+    "health": ("health", "max_health"),
+    "flash": ("flash_timer",),
+    "lifetime": ("lifetime",),
+    "render": ("render_kind", "sx", "sy"),  # sx/sy are written by project_system
+}
+RENDER_KINDS = ("wall", "orb", "enemy", "player")
+
+INDEX_BITS = 32
+INDEX_MASK = (1 << INDEX_BITS) - 1
+
+KNOCKBACK_FRICTION = 5.0
+KNOCKBACK_REST = 0.1  # Knockback below this snaps to zero
+WALL_SKIN = 0.05  # Collision box is radius - WALL_SKIN, as in Entity.check_wall_collision
+MAP_CLAMP = 1.1
+
+
+class Handle:
+    """An object's row in its archetype table."""
+    __slots__ = ("table", "cols", "row")
+
+    def __init__(self, table, row):
+        self.table = table
+        self.cols = table.cols
+        self.row = row
+
+
+class Column:
+    """Descriptor that exposes one store column as a plain attribute."""
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, obj, objtype=None):
+        if obj is None: return self
+        h = obj._ecs
+        try:
+            return h.cols[self.name].item(h.row)
+        except KeyError:
+            raise AttributeError(f"{type(obj).__name__} has no {self.name} component") from None
+
+    def __set__(self, obj, value):
+        h = obj._ecs
+        try:
+            h.cols[self.name][h.row] = value
+        except KeyError:
+            raise AttributeError(f"{type(obj).__name__} has no {self.name} component") from None
+
+
+class HandleTable:
+    """Issues (index, generation) uids and resolves them back to live objects in O(1)."""
+
+    def __init__(self):
+        self.refs = [None]  # Slot 0 is never issued, so uid 0 always means "nobody"
+        self.generations = [0]
+        self.free = []
+
+    def __len__(self):
+        return len(self.refs) - 1 - len(self.free)
+
+    def issue(self, obj):
+        if self.free:
+            i = self.free.pop()
+        else:
+            i = len(self.refs)
+            self.refs.append(None)
+            self.generations.append(1)
+        self.refs[i] = weakref.ref(obj)
+        return self.generations[i] << INDEX_BITS | i
+
+    def valid(self, uid):
+        i = uid & INDEX_MASK
+        return 0 < i < len(self.refs) and self.generations[i] == uid >> INDEX_BITS
+
+    def resolve(self, uid):
+        """The object behind `uid`, or None if it was released (or never issued)."""
+        if not self.valid(uid): return None
+        return self.refs[uid & INDEX_MASK]()
+
+    def release(self, uid):
+        if not self.valid(uid): return
+        i = uid & INDEX_MASK
+        self.refs[i] = None
+        self.generations[i] += 1
+        self.free.append(i)
+
+
+class Archetype:
+    def __init__(self, components):
+        self.components = frozenset(components)
+        self.fields = [f for c in COMPONENTS if c in self.components for f in COMPONENTS[c]]
+        self.cols = {f: np.zeros(0) for f in self.fields}
+        self.handles = []  # Row -> Handle
+        self.dead = []  # Handles of collected objects, removed by flush()
+        self.count = 0
+        self.capacity = 0
+        self._grow(64)
+
+    def __len__(self):
+        return self.count
+
+    def has(self, *components):
+        return self.components.issuperset(components)
+
+    def _grow(self, needed):
+        new_cap = max(needed, self.capacity * 2)
+        for name, old in self.cols.items():
+            arr = np.zeros(new_cap)
+            arr[:self.count] = old[:self.count]
+            self.cols[name] = arr
+        self.capacity = new_cap
+
+    def add(self):
+        if self.count == self.capacity: self._grow(self.count + 1)
+        row = self.count
+        self.count += 1
+        for arr in self.cols.values(): arr[row] = 0.0
+        h = Handle(self, row)
+        self.handles.append(h)
+        return h
+
+    def release(self, h):
+        # Called from a finalizer, possibly in the middle of a system: only queue it
+        self.dead.append(h)
+
+    def flush(self):
+        while self.dead: self.remove(self.dead.pop())
+
+    def remove(self, h):
+        last = self.count - 1
+        if h.row != last:
+            moved = self.handles[last]
+            for arr in self.cols.values(): arr[h.row] = arr[last]
+            moved.row = h.row
+            self.handles[h.row] = moved
+        self.handles.pop()
+        self.count = last
+        h.row = -1
+
+    def view(self, *fields):
+        """Live slices of these columns (writes go straight to the store)."""
+        return [self.cols[f][:self.count] for f in fields]
+
+
+class EntityStore:
+    def __init__(self, handles=None):
+        self.handles = HandleTable() if handles is None else handles
+        self.archetypes = {}  # frozenset(components) -> Archetype
+
+    def __len__(self):
+        return sum(a.count - len(a.dead) for a in self.archetypes.values())
+
+    def spawn(self, obj, components):
+        """Gives `obj` a uid and a row in the archetype for `components`; both freed when obj is collected."""
+        key = frozenset(components)
+        table = self.archetypes.get(key)
+        if table is None: table = self.archetypes[key] = Archetype(key)
+        table.flush()  # Tables no system visits (walls when nothing renders) are reclaimed here
+        h = table.add()
+        obj._ecs = h
+        obj.uid = self.handles.issue(obj)
+        weakref.finalize(obj, self._release, table, h, obj.uid)
+        return h
+
+    def _release(self, table, h, uid):
+        table.release(h)
+        self.handles.release(uid)
+
+    def tables(self, *components):
+        """Tables holding all of these components, with dead rows flushed."""
+        out = []
+        for a in self.archetypes.values():
+            if not a.has(*components): continue
+            a.flush()
+            if a.count: out.append(a)
+        return out
+
+    def counts(self):
+        """Live rows per archetype, keyed by its sorted component names."""
+        return {"+".join(sorted(a.components)): a.count - len(a.dead) for a in self.archetypes.values()}
+
+    def activate(self):
+        """Makes this the store that new entities spawn into. Returns self."""
+        _ACTIVE[0] = self
+        return self
+
+
+_ACTIVE = [None]
+
+
+def spawn(obj, components):
+    """EntityStore.spawn on the active store (a private one if no Game has activated any yet)."""
+    store = _ACTIVE[0]
+    if store is None: store = EntityStore().activate()
+    return store.spawn(obj, components)
+
+
+# ==========================================
+# SYSTEMS
+# ==========================================
+def physics_system(dt, grid, store):
+    """Knockback movement, wall collision and friction for every entity with knockback, one table at a time."""
+    solid = grid_array(grid)
+    for table in store.tables("position", "body", "knockback"):
+        wx, wy, radius, kx, ky = table.view("wx", "wy", "radius", "knockback_x", "knockback_y")
+        idx = np.flatnonzero((kx != 0) | (ky != 0))
+        if not len(idx): continue
+        x, y, m = wx[idx], wy[idx], radius[idx] - WALL_SKIN
+        bx, by = kx[idx], ky[idx]
+
+        # X then Y, each undone (and its knockback cancelled) if it lands in a wall
+        nx = x + bx * dt
+        stop = (bx != 0) & grid_blocked(solid, nx, y, m)
+        x = np.where(stop, x, nx)
+        bx[stop] = 0
+        ny = y + by * dt
+        stop = (by != 0) & grid_blocked(solid, x, ny, m)
+        y = np.where(stop, y, ny)
+        by[stop] = 0
+
+        wx[idx] = np.clip(x, MAP_CLAMP, MAP_W - MAP_CLAMP)
+        wy[idx] = np.clip(y, MAP_CLAMP, MAP_H - MAP_CLAMP)
+        bx -= bx * KNOCKBACK_FRICTION * dt
+        by -= by * KNOCKBACK_FRICTION * dt
+        bx[np.abs(bx) < KNOCKBACK_REST] = 0
+        by[np.abs(by) < KNOCKBACK_REST] = 0
+        kx[idx], ky[idx] = bx, by
+
+
+def timer_system(dt, store):
+    for table in store.tables("flash"):
+        (flash,) = table.view("flash_timer")
+        np.subtract(flash, dt, out=flash, where=flash > 0)
+    for table in store.tables("lifetime"):
+        (life,) = table.view("lifetime")
+        life -= dt
+
+
+def project_system(cam, store):
+    """Fills sx/sy (cam.world_to_screen) for everything with a render component."""
+    for table in store.tables("position", "render"):
+        wx, wy, sx, sy = table.view("wx", "wy", "sx", "sy")
+        sx[:], sy[:] = cam.world_to_screen_array(wx, wy)
@@ -3,104 +3,33 @@ import math
 import random
 import pygame
 from config import *
-from utils import clamp, check_grid_collision, has_line_of_sight, get_path_bfs, distance
-
-
-# --- BULLET CLASS ---
-class Bullet:
-    def __init__(self, wx, wy, vx, vy, speed, damage, pierce_count, color, owner_id):
-        self.wx = wx
-        self.wy = wy
-        l = math.hypot(vx, vy)
-        if l == 0: l = 1
-        self.vx = (vx / l) * speed
-        self.vy = (vy / l) * speed
-        self.damage = damage
-        self.pierce = pierce_count
-        self.lifetime = 3.0
-        self.radius = 5
-        self.hit_list = []
-        self.color = color
-        self.owner_id = owner_id
-
-    def update(self, dt):
-        self.wx += self.vx * dt
-        self.wy += self.vy * dt
-        self.lifetime -= dt
-
-    def draw(self, surf, cam):
-        sx, sy = cam.world_to_screen(self.wx, self.wy)
-        r = self.radius * cam.zoom
-        pygame.draw.circle(surf, (255, 200, 50), (sx, sy), r + 2, 1)
-        pygame.draw.circle(surf, self.color, (sx, sy), r)
-
-
-# --- GRENADE CLASS ---
-class Grenade:
-    def __init__(self, start_x, start_y, target_x, target_y):
-        self.x = start_x
-        self.y = start_y
-        self.z = 15
-        max_throw = 6.0
-        dist = distance(start_x, start_y, target_x, target_y)
-        if dist > max_throw:
-            angle = math.atan2(target_y - start_y, target_x - start_x)
-            target_x = start_x + math.cos(angle) * max_throw
-            target_y = start_y + math.sin(angle) * max_throw
-            dist = max_throw
-        speed_xy = 8.0
-        angle = math.atan2(target_y - start_y, target_x - start_x)
-        self.vx = math.cos(angle) * speed_xy
-        self.vy = math.sin(angle) * speed_xy
-        self.vz = 20 + (dist * 2.0)
-        self.timer = 2.0
-        self.exploded = False
-        self.radius = 4.0
-
-    def update(self, dt, grid):
-        if self.exploded: return
-        next_x = self.x + self.vx * dt
-        next_y = self.y + self.vy * dt
-        if check_grid_collision(next_x, self.y, grid):
-            self.vx = -self.vx * 0.6
-        else:
-            self.x = next_x
-        if check_grid_collision(self.x, next_y, grid):
-            self.vy = -self.vy * 0.6
-        else:
-            self.y = next_y
-        self.z += self.vz * dt
-        self.vz -= GRAVITY * 2 * dt
-        if self.z < 0:
-            self.z = 0
-            self.vz = -self.vz * 0.5
-            self.vx *= 0.4
-            self.vy *= 0.4
-            if abs(self.vx) < 0.1: self.vx = 0
-            if abs(self.vy) < 0.1: self.vy = 0
-        self.timer -= dt
-        if self.timer <= 0: self.exploded = True
-
-    def draw(self, surf, cam):
-        sx, sy = cam.world_to_screen(self.x, self.y)
-        pygame.draw.circle(surf, (0, 0, 0), (sx, sy), 5 * cam.zoom)
-        z_offset = self.z * TILE_H_BASE / 2 * cam.zoom
-        pygame.draw.circle(surf, COL_GRENADE, (sx, sy - z_offset), 6 * cam.zoom)
-        if self.timer < 0.5 and (int(self.timer * 20) % 2 == 0):
-            pygame.draw.circle(surf, (255, 255, 255), (sx, sy - z_offset), 6 * cam.zoom)
+from utils import clamp, has_line_of_sight, get_path_bfs, distance
+from patterns import pick_pattern
+from weapons import weapon_mode
+from sprites import SHAPES
+from surfaces import SURFACES
+import ecs
+from ecs import Column, RENDER_KINDS
 
 
 # --- BASE ENTITY ---
 class Entity:
+    # Numeric state lives in the component store (ecs.py); these attributes are views into it
+    COMPONENTS = ("position", "body", "knockback", "render")
+    RENDER_KIND = "enemy"
+    wx, wy, z, radius = Column(), Column(), Column(), Column()
+    knockback_x, knockback_y = Column(), Column()
+    render_kind, sx, sy = Column(), Column(), Column()
+
     def __init__(self, wx, wy):
+        ecs.spawn(self, self.COMPONENTS)  # Store rows start zeroed, so knockback starts at rest
+        self.render_kind = RENDER_KINDS.index(self.RENDER_KIND)
         self.wx = wx
         self.wy = wy
         self.z = 0
         self.radius = 0.4
-        self.dead = False
-        self.uid = id(self)
-        self.knockback_x = 0
-        self.knockback_y = 0
+        self.dead = False  # self.uid is issued by ecs.spawn
+        self.casts_shadow = True
 
     def get_sort_y(self):
         return self.wx + self.wy
@@ -109,21 +38,6 @@ class Entity:
         self.knockback_x += kx
         self.knockback_y += ky
 
-    def physics_update(self, dt, grid=None):
-        if grid:
-            kx_step = self.knockback_x * dt
-            ky_step = self.knockback_y * dt
-            self.check_wall_collision(kx_step, ky_step, grid)
-        else:
-            self.wx += self.knockback_x * dt
-            self.wy += self.knockback_y * dt
-
-        fric = 5.0
-        self.knockback_x -= self.knockback_x * fric * dt
-        self.knockback_y -= self.knockback_y * fric * dt
-        if abs(self.knockback_x) < 0.1: self.knockback_x = 0
-        if abs(self.knockback_y) < 0.1: self.knockback_y = 0
-
     def check_area_collision(self, min_x, max_x, min_y, max_y, grid):
         start_x = int(math.floor(min_x))
         end_x = int(math.ceil(max_x))
@@ -157,9 +71,7 @@ class Entity:
 
     def draw_shadow(self, surf, cam):
         sx, sy = cam.world_to_screen(self.wx, self.wy)
-        shadow_w = 30 * cam.zoom
-        shadow_h = 10 * cam.zoom
-        pygame.draw.ellipse(surf, (0, 0, 0, 100), (sx - shadow_w // 2, sy + shadow_h // 2, shadow_w, shadow_h))
+        SHAPES.blit(surf, "shadow", sx, sy, cam.zoom)
 
     def draw(self, surf, cam):
         pass
@@ -167,6 +79,10 @@ class Entity:
 
 # --- ENERGY ORB ---
 class EnergyOrb(Entity):
+    COMPONENTS = Entity.COMPONENTS + ("lifetime",)
+    RENDER_KIND = "orb"
+    lifetime = Column()
+
     def __init__(self, wx, wy):
         super().__init__(wx, wy)
         self.radius = 0.3
@@ -175,7 +91,7 @@ class EnergyOrb(Entity):
         self.color = COL_ENERGY
 
     def update(self, dt):
-        self.lifetime -= dt
+        # lifetime counts down in timer_system
         self.bob_offset += dt * 5
 
     def draw(self, surf, cam):
@@ -184,7 +100,8 @@ class EnergyOrb(Entity):
         for i in range(3):
             alpha = 100 - (i * 30)
             r = (8 + i * 4) * cam.zoom
-            s = pygame.Surface((r * 2, r * 2), pygame.SRCALPHA)
+            s = SURFACES.acquire(r * 2, r * 2, pygame.SRCALPHA)
+            s.fill((0, 0, 0, 0))
             pygame.draw.circle(s, (*self.color, alpha), (r, r), r)
             surf.blit(s, (sx - r, sy - r - 10 - bob))
         pygame.draw.circle(surf, (255, 255, 255), (sx, sy - 10 - bob), 4 * cam.zoom)
@@ -192,17 +109,27 @@ class EnergyOrb(Entity):
 
 # --- WALL BLOCK ---
 class WallBlock(Entity):
+    COMPONENTS = ("position", "body", "render")  # Walls never get knocked back
+    RENDER_KIND = "wall"
+
     def __init__(self, wx, wy, color_top, color_side):
         super().__init__(wx, wy)
         self.color_top = color_top
         self.color_side = color_side
         self.wx = wx + 0.5
         self.wy = wy + 0.5
+        self.casts_shadow = False
 
     def draw_shadow(self, surf, cam):
         pass
 
     def draw(self, surf, cam):
+        if cam.at_rest():
+            # sx/sy were filled in by project_system for this frame
+            SHAPES.blit(surf, "wall", self.sx, self.sy, cam.zoom, self.color_top, self.color_side)
+            return
+
+        # Mid-rotation / zoom: build the block from its corners
         x1, y1 = self.wx - 0.5, self.wy - 0.5
         x2, y2 = self.wx + 0.5, self.wy - 0.5
         x3, y3 = self.wx + 0.5, self.wy + 0.5
@@ -244,6 +171,9 @@ class WallBlock(Entity):
 
 # --- BASE ENEMY ---
 class Enemy(Entity):
+    COMPONENTS = Entity.COMPONENTS + ("health", "flash")
+    health, max_health, flash_timer = Column(), Column(), Column()
+
     def __init__(self, wx, wy, level, vm):
         super().__init__(wx, wy)
         self.vm = vm
@@ -267,11 +197,7 @@ class Enemy(Entity):
             self.vm.add_debris(self.wx, self.wy, self.debris_type, self.color)
 
     def update(self, dt, player, grid, bullets, cam):
-        self.physics_update(dt, grid)
-
-        if self.flash_timer > 0:
-            self.flash_timer -= dt
-
+        # Knockback (physics_system) and the hit flash (timer_system) run batched before this
         if abs(self.knockback_x) + abs(self.knockback_y) < 2.0:
             dist_to_player = distance(self.wx, self.wy, player.wx, player.wy)
 
@@ -343,10 +269,8 @@ class OrbEnemy(Enemy):
     def draw(self, surf, cam):
         sx, sy = cam.world_to_screen(self.wx, self.wy)
         col = (255, 255, 255) if self.flash_timer > 0 else self.color
-        r = 18 * cam.zoom
-        pygame.draw.circle(surf, col, (sx, sy - r), r)
-        pygame.draw.circle(surf, (255, 100, 100), (sx - 5 * cam.zoom, sy - 20 * cam.zoom), 5 * cam.zoom)
-        self.draw_hp(surf, sx, sy - r * 2.5, cam.zoom)
+        SHAPES.blit(surf, "orb", sx, sy, cam.zoom, col)
+        self.draw_hp(surf, sx, sy - 18 * cam.zoom * 2.5, cam.zoom)
 
 
 # --- BLOCK ENEMY ---
@@ -371,8 +295,6 @@ class BlockEnemy(Enemy):
         self.z = 0
 
     def update(self, dt, player, grid, bullets, cam):
-        self.physics_update(dt, grid)
-        if self.flash_timer > 0: self.flash_timer -= dt
 
         dist_to_player = distance(self.wx, self.wy, player.wx, player.wy)
 
@@ -387,8 +309,7 @@ class BlockEnemy(Enemy):
             if t >= 1.0:
                 self.is_jumping = False
                 self.z = 0
-                sx, sy = cam.world_to_screen(self.wx, self.wy)
-                self.vm.add_explosion(sx, sy, (100, 150, 255))
+                self.vm.add_explosion(self.wx, self.wy, (100, 150, 255))
                 cam.add_shake(15)
 
                 impact_range = 2.5
@@ -396,6 +317,7 @@ class BlockEnemy(Enemy):
                     player.health -= 15
                     angle = math.atan2(player.wy - self.wy, player.wx - self.wx)
                     player.apply_knockback(math.cos(angle) * 10, math.sin(angle) * 10)
+                    sx, sy = cam.world_to_screen(self.wx, self.wy)
                     self.vm.add_text(sx, sy - 50, "SMASH!", (255, 50, 50), 1.0, 30)
 
                 self.jump_cooldown = random.uniform(3.0, 5.0)
@@ -419,10 +341,7 @@ class BlockEnemy(Enemy):
             col = (255, 50, 50)
         s = 40 * cam.zoom
         draw_y = sy - (self.z * 15 * cam.zoom)
-        rect = pygame.Rect(0, 0, s, s)
-        rect.center = (sx, draw_y - s // 2)
-        pygame.draw.rect(surf, col, rect)
-        pygame.draw.rect(surf, (20, 20, 50), rect, int(2 * cam.zoom))
+        SHAPES.blit(surf, "block", sx, draw_y, cam.zoom, col)
         self.draw_hp(surf, sx, draw_y - s - 10, cam.zoom)
 
 
@@ -473,8 +392,8 @@ class SpikeEnemy(Enemy):
                 self.ghost_timer = 0.05
 
             # Wind Particles
-            sx, sy = cam.world_to_screen(self.wx, self.wy)
-            self.vm.add_particle(sx + random.randint(-10, 10), sy + random.randint(-10, 10), (200, 255, 255))
+            self.vm.add_particle(self.wx + random.uniform(-0.15, 0.15), self.wy + random.uniform(-0.15, 0.15),
+                                 (200, 255, 255))
 
             if self.dash_timer <= 0:
                 self.dash_active = False
@@ -489,11 +408,9 @@ class SpikeEnemy(Enemy):
             vx = self.move_dir[0] * self.speed * dt
             vy = self.move_dir[1] * self.speed * dt
             self.check_wall_collision(vx, vy, grid)
-            self.physics_update(dt, grid)
         else:
             # Normal movement
             self.move_towards(0, 0, 0, dt, grid)
-            self.physics_update(dt, grid)
 
     def move_towards(self, dx, dy, dist, dt, grid):
         self.move_timer -= dt
@@ -511,13 +428,8 @@ class SpikeEnemy(Enemy):
         col = (255, 255, 255) if self.flash_timer > 0 else self.color
         if self.dash_active: col = (255, 255, 200)
 
-        h = 40 * cam.zoom
-        w = 15 * cam.zoom
-        p1 = (sx, sy - h)
-        p2 = (sx - w, sy)
-        p3 = (sx + w, sy)
-        pygame.draw.polygon(surf, col, [p1, p2, p3])
-        self.draw_hp(surf, sx, sy - h - 10, cam.zoom)
+        SHAPES.blit(surf, "spike", sx, sy, cam.zoom, col)
+        self.draw_hp(surf, sx, sy - 40 * cam.zoom - 10, cam.zoom)
 
 
 # --- BOSS - FIX APPLIED HERE ---
@@ -534,10 +446,10 @@ class HexBoss(Enemy):
         self.debris_type = "scorch"
 
         self.shoot_timer = 2.0
-        self.burst_count = 0
-        self.pattern_timer = 0
         self.current_stage = 1
         self.phase = "IDLE"
+        self.pattern = None
+        self.volley = 0
 
     def update(self, dt, player, grid, bullets, cam):
         super().update(dt, player, grid, bullets, cam)
@@ -557,77 +469,32 @@ class HexBoss(Enemy):
 
         # FIX: ONLY PICK NEW PATTERN IF IDLE
         if self.phase == "IDLE" and self.shoot_timer <= 0:
-            # Pick a pattern
-            if random.random() < 0.6:
-                self.phase = "RAPID"
-                self.shoot_timer = 0.1
-                self.burst_count = 10
-            else:
-                self.phase = "NOVA"
-                self.shoot_timer = 2.0
-
-        if self.phase == "RAPID":
-            if self.shoot_timer <= 0:
-                self.shoot_timer = 0.15
-                self.burst_count -= 1
-
-                dx = player.wx - self.wx
-                dy = player.wy - self.wy
-                angle = math.atan2(dy, dx) + random.uniform(-0.2, 0.2)
-                bx = math.cos(angle)
-                by = math.sin(angle)
-
-                b = Bullet(self.wx, self.wy, bx, by, 7.0, 15, 0, (255, 0, 255), self.uid)
-                b.radius = 8
-                bullets.append(b)
-
-                if self.burst_count <= 0:
-                    self.phase = "IDLE"
-                    self.shoot_timer = 3.0
-
-        elif self.phase == "NOVA":
-            if self.shoot_timer <= 0:
+            self.pattern = pick_pattern(self.current_stage)
+            self.phase = self.pattern.name
+            self.shoot_timer = self.pattern.windup
+            self.volley = 0
+
+        if self.pattern and self.phase != "IDLE" and self.shoot_timer <= 0:
+            aim = math.atan2(player.wy - self.wy, player.wx - self.wx)
+            self.pattern.fire(bullets, self.wx, self.wy, aim, self.volley, self.uid)
+            self.volley += 1
+            if self.volley >= self.pattern.volleys:
                 self.phase = "IDLE"
-                self.shoot_timer = 2.5
-                for i in range(12):
-                    angle = (6.28 / 12) * i
-                    bx = math.cos(angle)
-                    by = math.sin(angle)
-                    b = Bullet(self.wx, self.wy, bx, by, 5.0, 20, 0, (200, 100, 255), self.uid)
-                    b.radius = 6
-                    bullets.append(b)
-
-    def fire_spread(self, bullets, player, count, spread):
-        dx = player.wx - self.wx
-        dy = player.wy - self.wy
-        base_ang = math.atan2(dy, dx)
-
-        for _ in range(count):
-            ang = base_ang + random.uniform(-spread, spread)
-            bx = math.cos(ang)
-            by = math.sin(ang)
-            b = Bullet(self.wx, self.wy, bx, by, 8.0, 15, 0, (255, 50, 255), self.uid)
-            bullets.append(b)
+                self.shoot_timer = self.pattern.recover
+            else:
+                self.shoot_timer = self.pattern.interval
 
     def draw(self, surf, cam):
         sx, sy = cam.world_to_screen(self.wx, self.wy)
         col = (255, 255, 255) if self.flash_timer > 0 else self.color
 
-        if self.phase == "NOVA" and int(pygame.time.get_ticks() / 100) % 2 == 0:
+        telegraph = self.pattern and self.pattern.telegraph and self.phase != "IDLE" and self.volley == 0
+        if telegraph and int(pygame.time.get_ticks() / 100) % 2 == 0:
             col = (255, 200, 255)
 
-        pts = []
-        radius = 40 * cam.zoom
         spin_speed = 0.1 * self.current_stage
-
-        for i in range(6):
-            ang = math.radians(i * 60 + pygame.time.get_ticks() * spin_speed)
-            px = sx + math.cos(ang) * radius
-            py = (sy - 20 * cam.zoom) + math.sin(ang) * radius * 0.7
-            pts.append((px, py))
-
-        pygame.draw.polygon(surf, col, pts)
-        pygame.draw.polygon(surf, (255, 255, 255), pts, int(3 * cam.zoom))
+        phase = SHAPES.hex_phase(pygame.time.get_ticks() * spin_speed)
+        SHAPES.blit(surf, "hex", sx, sy, cam.zoom, col, phase)
         self.draw_hp(surf, sx, sy - 80 * cam.zoom, cam.zoom)
 
 
@@ -663,8 +530,7 @@ class Drone:
                 self.last_shot = 0
                 dx = closest.wx - self.wx
                 dy = closest.wy - self.wy
-                b = Bullet(self.wx, self.wy, dx, dy, 10.0, self.damage, 0, (100, 255, 100), self.player.uid)
-                bullet_list.append(b)
+                bullet_list.spawn(self.wx, self.wy, dx, dy, 10.0, self.damage, 0, (100, 255, 100), self.player.uid)
 
     def draw(self, surf, cam):
         sx, sy = cam.world_to_screen(self.wx, self.wy)
@@ -681,6 +547,7 @@ class Player(Entity):
         self.vy = 0
         self.weapon_type = "pistol"
         self.grenade_count = PLAYER_START_GRENADES
+        self.grenade_type = "grenade"  # props.GRENADE_TYPES
         self.dash_cooldown = 0
         self.is_dashing = False
         self.dash_timer = 0
@@ -726,7 +593,6 @@ class Player(Entity):
         return False
 
     def update(self, dt, enemies, bullets, grid, vm):
-        self.physics_update(dt, grid)
         if self.dash_cooldown > 0: self.dash_cooldown -= dt
         if self.ultimate_active:
             self.ultimate_timer -= dt
@@ -764,96 +630,26 @@ class Player(Entity):
             return True
         return False
 
-    def shoot(self, target_wx, target_wy, vm):
-        fire_rate = self.stats["fire_rate"]
-        cooldown_mod = 1.0
-        recoil_force = 0.0
-        if self.ultimate_active:
-            if self.weapon_type == "pistol":
-                fire_rate *= 4.0
-                cooldown_mod = 0.2
-                recoil_force = 0
-            elif self.weapon_type == "shotgun":
-                fire_rate *= 2.5
-                cooldown_mod = 0.4
-                recoil_force = 0
-            elif self.weapon_type == "sniper":
-                fire_rate *= 2.0
-                cooldown_mod = 0.5
-                recoil_force = 0
-        else:
-            if self.weapon_type == "shotgun":
-                cooldown_mod = 1.5
-                recoil_force = 3.0
-            if self.weapon_type == "sniper":
-                cooldown_mod = 2.5
-                recoil_force = 6.0
-
-        if self.last_shot < (1.0 / fire_rate): return []
-        self.last_shot = 0 - (1.0 / fire_rate) * (cooldown_mod - 1.0)
-        bullets = []
-        dx = target_wx - self.wx
-        dy = target_wy - self.wy
-        base_angle = math.atan2(dy, dx)
-        if recoil_force > 0:
-            self.apply_knockback(-math.cos(base_angle) * recoil_force, -math.sin(base_angle) * recoil_force)
-
-        if self.weapon_type == "shotgun":
-            pellets = 5
-            spread = 0.3
-            color = (255, 100, 100)
-            if self.ultimate_active:
-                pellets = 7
-                spread = 0.6
-                color = (255, 50, 0)
-            for _ in range(pellets):
-                angle = base_angle + random.uniform(-spread, spread)
-                bx = math.cos(angle)
-                by = math.sin(angle)
-                spd = self.stats["bullet_speed"] * random.uniform(0.8, 1.1)
-                dmg = self.stats["damage"] * 0.6
-                b = Bullet(self.wx, self.wy, bx, by, spd, dmg, 0, color, self.uid)
-                b.lifetime = 0.6
-                bullets.append(b)
-        elif self.weapon_type == "sniper":
-            bx = math.cos(base_angle)
-            by = math.sin(base_angle)
-            dmg = self.stats["damage"] * 4.0
-            pierce = self.stats["pierce"] + 10
-            spd = self.stats["bullet_speed"] * 2.0
-            col = (100, 255, 255)
-            if self.ultimate_active:
-                pierce = 999
-                dmg *= 2.0
-                spd *= 1.5
-                col = (0, 255, 255)
-            b = Bullet(self.wx, self.wy, bx, by, spd, dmg, pierce, col, self.uid)
-            bullets.append(b)
-        else:
-            angle = base_angle + random.uniform(-self.stats["spread"], self.stats["spread"])
-            if self.ultimate_active: angle = random.uniform(0, 6.28)
-            bx = math.cos(angle)
-            by = math.sin(angle)
-            b = Bullet(self.wx, self.wy, bx, by, self.stats["bullet_speed"], self.stats["damage"],
-                       int(self.stats["pierce"]), (255, 255, 150), self.uid)
-            bullets.append(b)
-        return bullets
+    def shoot(self, pool, target_wx, target_wy):
+        """Fires the current weapon into `pool` if it is ready. Returns its WeaponMode, or None."""
+        mode = weapon_mode(self.weapon_type, self.ultimate_active)
+        interval = mode.interval(self.stats)
+        if self.last_shot < interval: return None
+        self.last_shot = 0 - interval * (mode.cooldown - 1.0)
+        base_angle = math.atan2(target_wy - self.wy, target_wx - self.wx)
+        if mode.recoil > 0:
+            self.apply_knockback(-math.cos(base_angle) * mode.recoil, -math.sin(base_angle) * mode.recoil)
+        mode.fire(pool, self.wx, self.wy, base_angle, self.stats, self.uid)
+        return mode
 
     def draw(self, surf, cam):
         sx, sy = cam.world_to_screen(self.wx, self.wy)
         bob = math.sin(self.anim_timer) * 3
         center_y = sy - (15 * cam.zoom) + bob
         col = self.color_body
-        if self.ultimate_active:
-            col = (0, 255, 255)
-            pygame.draw.circle(surf, (0, 255, 255), (sx, center_y), 18 * cam.zoom, 2)
+        if self.ultimate_active: col = (0, 255, 255)
         if self.is_dashing: col = (200, 200, 255)
-        pygame.draw.circle(surf, col, (sx, center_y), 14 * cam.zoom)
-        if self.weapon_type == "shotgun":
-            pygame.draw.circle(surf, (255, 50, 50), (sx + 10 * cam.zoom, center_y), 5 * cam.zoom)
-        elif self.weapon_type == "sniper":
-            pygame.draw.line(surf, (50, 255, 50), (sx, center_y), (sx + 15 * cam.zoom, center_y), int(3 * cam.zoom))
-        pygame.draw.circle(surf, (150, 200, 255), (sx - 4 * cam.zoom, center_y - 4 * cam.zoom), 5 * cam.zoom)
+        SHAPES.blit(surf, "player", sx, center_y, cam.zoom, col, self.weapon_type, self.ultimate_active)
         for d in self.drones: d.draw(surf, cam)
         w = 40 * cam.zoom
         h = 6 * cam.zoom
@@ -0,0 +1,152 @@
+# floor.py
+import math
+import pygame
+from config import *
+from map_gen import floor_colors
+
+# ==========================================
+# CACHED FLOOR + DECAL LAYER
+# ==========================================
+# The floor is baked once per level into a top-down world texture
+# (PIXELS_PER_TILE pixels per world unit). Cracks, blood and debris are
+# stamped into that same texture when they happen, so they cost nothing
+# per frame afterwards.
+#
+# To draw, the visible part of the texture is rotated and squashed into the
+# isometric view once and cached. The cache is only rebuilt when the zoom or
+# rotation changes or the view moves into a new chunk; panning inside the
+# chunk is just a blit at a new offset.
+
+PIXELS_PER_TILE = 32
+CHUNK = 4  # Tiles of margin / snapping around the visible area
+COLORKEY = (255, 0, 255)
+
+
+class FloorLayer:
+    def __init__(self, w, h, level):
+        self.w = w
+        self.h = h
+        self.show_lines = True
+        self.texture = pygame.Surface((w * PIXELS_PER_TILE, h * PIXELS_PER_TILE))
+        self.texture.set_colorkey(COLORKEY)
+        self.decals = pygame.Surface(self.texture.get_size(), pygame.SRCALPHA)
+        self.cache = None
+        self.cache_key = None
+        self.cache_origin = (0, 0)
+        self.set_level(level)
+
+    # --- BAKING ---
+    def set_level(self, level):
+        """New level: new colours, decals wiped."""
+        self.level = level
+        self.decals.fill((0, 0, 0, 0))
+        self.rebake()
+
+    def set_show_lines(self, show):
+        if show != self.show_lines:
+            self.show_lines = show
+            self.rebake()
+
+    def rebake(self):
+        col_floor, col_line = floor_colors(self.level)
+        self.texture.fill(col_floor)
+        if self.show_lines:
+            size = PIXELS_PER_TILE
+            tw, th = self.texture.get_size()
+            for x in range(self.w + 1):
+                pygame.draw.line(self.texture, col_line, (x * size, 0), (x * size, th))
+            for y in range(self.h + 1):
+                pygame.draw.line(self.texture, col_line, (0, y * size), (tw, y * size))
+        self.texture.blit(self.decals, (0, 0))
+        self.cache_key = None
+
+    # --- PROJECTION ---
+    @staticmethod
+    def _linear(angle, zoom, wx, wy):
+        """world_to_screen without the focus/screen translation."""
+        c, s = math.cos(angle), math.sin(angle)
+        rot_x = wx * c - wy * s
+        rot_y = wx * s + wy * c
+        return ((rot_x - rot_y) * (TILE_W_BASE * zoom / 2.0),
+                (rot_x + rot_y) * (TILE_H_BASE * zoom / 2.0))
+
+    def _visible_bounds(self, cam):
+        corners = [cam.screen_to_world(x, y) for x, y in ((0, 0), (cam.w, 0), (0, cam.h), (cam.w, cam.h))]
+        xs = [c[0] for c in corners]
+        ys = [c[1] for c in corners]
+        x0 = max(0, int(math.floor(min(xs) / CHUNK) - 1) * CHUNK)
+        y0 = max(0, int(math.floor(min(ys) / CHUNK) - 1) * CHUNK)
+        x1 = min(self.w, int(math.ceil(max(xs) / CHUNK) + 1) * CHUNK)
+        y1 = min(self.h, int(math.ceil(max(ys) / CHUNK) + 1) * CHUNK)
+        return x0, y0, x1, y1
+
+    def _rebuild(self, angle, zoom, bounds):
+        x0, y0, x1, y1 = bounds
+        size = PIXELS_PER_TILE
+        sub = self.texture.subsurface((x0 * size, y0 * size, (x1 - x0) * size, (y1 - y0) * size))
+
+        # Iso projection = rotate by (angle + 45deg), then scale each axis.
+        # pygame rotates counter-clockwise on screen, hence the minus.
+        rotated = pygame.transform.rotate(sub, -(math.degrees(angle) + 45.0))
+        fx = TILE_W_BASE * zoom / math.sqrt(2) / size
+        fy = TILE_H_BASE * zoom / math.sqrt(2) / size
+        out_w = max(1, int(round(rotated.get_width() * fx)))
+        out_h = max(1, int(round(rotated.get_height() * fy)))
+        self.cache = pygame.transform.scale(rotated, (out_w, out_h))
+        self.cache.set_colorkey(COLORKEY)
+
+        pts = [self._linear(angle, zoom, x, y) for x, y in ((x0, y0), (x1, y0), (x0, y1), (x1, y1))]
+        self.cache_origin = (min(p[0] for p in pts), min(p[1] for p in pts))
+
+    def refresh(self, cam):
+        """Rebuilds the projected cache if the view left it. Returns False when no floor is visible.
+
+        Touches nothing but the cache, so it can run on the render worker.
+        """
+        bounds = self._visible_bounds(cam)
+        if bounds[0] >= bounds[2] or bounds[1] >= bounds[3]: return False
+        key = (cam.angle, cam.zoom, bounds)
+        if key != self.cache_key:
+            self._rebuild(cam.angle, cam.zoom, bounds)
+            self.cache_key = key
+        return True
+
+    def draw(self, surf, cam):
+        if not self.refresh(cam): return
+        ox, oy = cam.world_to_screen(0, 0)
+        surf.blit(self.cache, (ox + self.cache_origin[0], oy + self.cache_origin[1]))
+
+    # --- DECAL STAMPING ---
+    # Decal geometry is given in world units. Each stamp is drawn into the
+    # decal layer (survives rebakes), the texture, and the live cache, so the
+    # cache never needs a rebuild just because something was stamped.
+    def _targets(self):
+        """Yields (surface, world->pixel function, pixels per world unit)."""
+        size = PIXELS_PER_TILE
+        to_tex = lambda x, y: (x * size, y * size)
+        yield self.decals, to_tex, size
+        yield self.texture, to_tex, size
+        if self.cache_key is not None:
+            angle, zoom, _ = self.cache_key
+            ox, oy = self.cache_origin
+
+            def to_cache(x, y):
+                px, py = self._linear(angle, zoom, x, y)
+                return px - ox, py - oy
+
+            yield self.cache, to_cache, TILE_W_BASE * zoom / math.sqrt(2)
+
+    def stamp_lines(self, points, color, width=0.05):
+        if len(points) < 2: return
+        for target, to_px, scale in self._targets():
+            pygame.draw.lines(target, color, False, [to_px(x, y) for x, y in points], max(1, int(width * scale)))
+
+    def stamp_polygon(self, points, color):
+        if len(points) < 3: return
+        for target, to_px, _ in self._targets():
+            pygame.draw.polygon(target, color, [to_px(x, y) for x, y in points])
+
+    def stamp_circle(self, wx, wy, radius, color, sides=12):
+        pts = [(wx + math.cos(i * math.tau / sides) * radius, wy + math.sin(i * math.tau / sides) * radius)
+               for i in range(sides)]
+        self.stamp_polygon(pts, color)
@@ -0,0 +1,103 @@
+# gc_policy.py
+import gc
+import time
+from metrics import METRICS
+
+# ==========================================
+# FRAME-SCHEDULED GARBAGE COLLECTION
+# ==========================================
+# Particles, texts and the per-frame entity lists churn a lot of short-lived
+# objects, so the automatic collector runs often and now and then lands a
+# full (gen 2) pass in the middle of a fight. Instead:
+#
+#   level load   gc.freeze() everything alive (map, walls, floor, fonts...)
+#                so later passes never rescan it
+#   wave         automatic GC off; young generations are collected at the
+#                end of a frame only when there is slack left in the budget
+#                (or the backlog gets too large)
+#   shop / idle  automatic GC back on; the frozen set is released and one
+#                full collection runs, so the next freeze starts clean
+#
+# Every pause is timed through gc.callbacks and sent to the metrics stream.
+
+WAVE_YOUNG_LIMIT = 5000  # Gen 0 backlog before an idle-time collect during a wave
+FORCE_YOUNG_LIMIT = 50000  # ... collected even without slack past this
+GEN1_EVERY = 10  # Gen 0 passes per gen 1 pass during waves
+IDLE_SLACK_MS = 1.5  # Spare frame budget needed for a scheduled collect
+
+
+class GCScheduler:
+    def __init__(self, metrics=METRICS, enabled=True):
+        self.metrics = metrics
+        self.enabled = enabled
+        self.mode = "default"
+        self.default_threshold = gc.get_threshold()
+        self.frame_pause_ms = 0.0  # Automatic GC time inside the current frame
+        self.pending_full = False
+        self._scheduled = False
+        self._t0 = None
+        if enabled: gc.callbacks.append(self._on_gc)
+
+    def _on_gc(self, phase, info):
+        if phase == "start":
+            self._t0 = time.perf_counter()
+            return
+        if self._t0 is None: return
+        ms = (time.perf_counter() - self._t0) * 1000.0
+        self._t0 = None
+        if not self._scheduled: self.frame_pause_ms += ms
+        self.metrics.emit("gc", gen=info["generation"], ms=round(ms, 3), collected=info["collected"],
+                          mode=self.mode, scheduled=self._scheduled)
+
+    def _collect(self, gen):
+        self._scheduled = True
+        try:
+            gc.collect(gen)
+        finally:
+            self._scheduled = False
+
+    def close(self):
+        """Unhooks the pause timer and hands collection back to the automatic GC."""
+        if not self.enabled: return
+        self.enabled = False
+        gc.callbacks.remove(self._on_gc)
+        gc.enable()
+
+    # --- GAME EVENTS ---
+    def level_loaded(self):
+        """Level data is long-lived: freeze it. The full collect already ran in the shop."""
+        if not self.enabled: return
+        gc.freeze()
+        self.metrics.emit("gc_freeze", frozen=gc.get_freeze_count())
+
+    def wave_started(self):
+        if not self.enabled: return
+        self.mode = "wave"
+        gc.disable()
+
+    def wave_ended(self):
+        if not self.enabled: return
+        self.mode = "idle"
+        gc.set_threshold(*self.default_threshold)
+        gc.enable()
+        self.pending_full = True
+
+    # --- PER FRAME ---
+    def end_frame(self, frame_ms, budget_ms):
+        """Call after the frame's work, before the clock sleeps. Returns in-frame GC ms."""
+        pause = self.frame_pause_ms
+        self.frame_pause_ms = 0.0
+        if not self.enabled: return pause
+
+        young, mid, _ = gc.get_count()
+        if self.mode == "wave":
+            slack = budget_ms - frame_ms
+            if young > FORCE_YOUNG_LIMIT or (young > WAVE_YOUNG_LIMIT and slack > IDLE_SLACK_MS):
+                self._collect(1 if mid >= GEN1_EVERY else 0)
+        elif self.mode == "idle" and self.pending_full:
+            # Nothing is moving in the shop, a full pass here is invisible.
+            # Unfreeze first: the last level's objects may be garbage now
+            self.pending_full = False
+            gc.unfreeze()
+            self._collect(2)
+        return pause
@@ -0,0 +1,192 @@
+# hud.py
+import pygame
+from config import *
+from utils import clamp
+
+# ==========================================
+# RETAINED HUD
+# ==========================================
+# The HUD is a list of widgets. Each widget has a key function returning the
+# values it shows (health as an int, the bar fill in whole pixels, the money
+# count...) and keeps the surface it last rendered for that key. A frame
+# only re-renders the widgets whose key changed, then all visible widgets go
+# onto the screen in one blits() call. On a frame where nothing changed the
+# HUD costs the key lookups plus that single composite.
+#
+# Text is its own widget (font.render's output is blitted as-is), so a
+# cached label looks exactly like one rendered every frame.
+
+
+class Widget:
+    def __init__(self, key_fn, render_fn, visible_fn=None):
+        self.key_fn = key_fn
+        self.render_fn = render_fn  # key -> (surface, (x, y))
+        self.visible_fn = visible_fn
+        self.key = None
+        self.surface = None
+        self.pos = (0, 0)
+
+    def refresh(self):
+        """Re-renders if the bound values changed. Returns True when it did."""
+        key = self.key_fn()
+        if self.surface is not None and key == self.key: return False
+        self.key = key
+        self.surface, self.pos = self.render_fn(key)
+        return True
+
+
+class Hud:
+    def __init__(self):
+        self.widgets = []
+        self.redraws = 0  # Widgets re-rendered by the last draw()
+
+    def add(self, widget):
+        self.widgets.append(widget)
+        return widget
+
+    def label(self, font, color, text_fn, place, visible_fn=None):
+        """Text widget; `place(w, h)` gives the top-left corner for a w x h label."""
+        def render(text):
+            surf = font.render(text, True, color)
+            return surf, place(*surf.get_size())
+        return self.add(Widget(text_fn, render, visible_fn))
+
+    def draw(self, surf):
+        self.redraws = 0
+        batch = []
+        for w in self.widgets:
+            if w.visible_fn and not w.visible_fn(): continue
+            if w.refresh(): self.redraws += 1
+            batch.append((w.surface, w.pos))
+        surf.blits(batch, doreturn=False)
+        return self.redraws
+
+
+# ==========================================
+# GAME HUD LAYOUT
+# ==========================================
+def game_hud(game):
+    """The in-game HUD bound to `game`. Rebuild it when game.buttons changes."""
+    hud = Hud()
+    in_shop = lambda: not game.wave_active
+    bar_w, bar_h = 200, 25
+    bar_x, bar_y = 20, 20
+
+    # --- HEALTH ---
+    def hp_fill():
+        p = game.player
+        return int((bar_w - 4) * clamp(p.health / p.stats["hp_max"], 0, 1))
+
+    def render_hp(fill):
+        s = pygame.Surface((bar_w, bar_h))
+        s.fill((30, 30, 30))
+        pygame.draw.rect(s, (200, 50, 50), (2, 2, fill, bar_h - 4))
+        return s, (bar_x, bar_y)
+
+    hud.add(Widget(hp_fill, render_hp))
+    hud.label(game.font_ui, (255, 255, 255),
+              lambda: f"{int(game.player.health)} / {int(game.player.stats['hp_max'])}",
+              lambda w, h: (bar_x + bar_w // 2 - w // 2, bar_y + 4))
+
+    # --- ULTIMATE ---
+    ult_w, ult_h = 200, 15
+    ult_y = bar_y + bar_h + 2
+
+    def ult_state():
+        p = game.player
+        pct = clamp(p.energy / p.max_energy, 0, 1)
+        col = (100, 100, 100)
+        if p.ultimate_active:
+            col = (0, 255, 255)
+            pct = p.ultimate_timer / p.ultimate_duration
+        elif p.energy >= p.max_energy:
+            col = (255, 255, 0)
+        return col, int((ult_w - 2) * pct)
+
+    def render_ult(key):
+        col, fill = key
+        s = pygame.Surface((ult_w, ult_h))
+        s.fill((20, 20, 40))
+        pygame.draw.rect(s, col, (1, 1, fill, ult_h - 2))
+        return s, (bar_x, ult_y)
+
+    def ult_msg():
+        p = game.player
+        if p.ultimate_active: return "ACTIVE!"
+        if p.energy < p.max_energy: return f"{int(p.energy)}%"
+        return "Q: ULTIMATE"
+
+    hud.add(Widget(ult_state, render_ult))
+    hud.label(game.font_ui, (0, 0, 0), ult_msg, lambda w, h: (bar_x + ult_w // 2 - w // 2, ult_y - 2))
+
+    # --- LEVEL / MONEY ---
+    lvl_w, lvl_h = 100, 15
+    lvl_y = ult_y + ult_h + 5
+    level_bar = pygame.Surface((lvl_w, lvl_h))
+    level_bar.fill((30, 30, 30))
+    pygame.draw.rect(level_bar, (50, 200, 50), (2, 2, lvl_w - 4, lvl_h - 4))
+    hud.add(Widget(lambda: 0, lambda _: (level_bar, (bar_x, lvl_y))))
+    hud.label(game.font_ui, (255, 255, 255), lambda: f"LV. {game.level}", lambda w, h: (bar_x + 5, lvl_y - 2))
+
+    coin_y = lvl_y + lvl_h + 10
+    coin = pygame.Surface((20, 20), pygame.SRCALPHA)
+    pygame.draw.circle(coin, COL_MONEY, (10, 10), 10)
+    hud.add(Widget(lambda: 0, lambda _: (coin, (bar_x, coin_y))))
+    hud.label(game.font_big, COL_MONEY, lambda: f"{int(game.player.money)}", lambda w, h: (bar_x + 25, coin_y))
+
+    # --- WAVE ---
+    cx = SCREEN_W // 2
+    hud.label(game.font_wave, (255, 255, 255), lambda: f"WAVE {game.level}", lambda w, h: (cx - w // 2, 20))
+
+    def remaining():
+        if not game.wave_active: return "0"
+        return f"{(game.enemies_to_spawn - game.enemies_spawned) + len(game.enemies)}"
+
+    hud.label(game.font_enemy_count, (255, 50, 50), remaining, lambda w, h: (cx - w // 2, 55))
+
+    # --- DASH ---
+    dash_x, dash_y = bar_x + bar_w + 10, bar_y
+    dash_size = 30
+    max_cd = 1.2
+
+    def dash_fill():
+        cd = game.player.dash_cooldown
+        return -1 if cd <= 0 else int(dash_size * cd / max_cd)
+
+    def render_dash(fill):
+        s = pygame.Surface((dash_size, dash_size))
+        s.fill((50, 50, 50))
+        pygame.draw.rect(s, (200, 200, 200), (0, 0, dash_size, dash_size), 2)
+        boot_col = (100, 200, 255) if fill < 0 else (100, 100, 100)
+        pygame.draw.rect(s, boot_col, (5, 10, 20, 15))
+        pygame.draw.rect(s, boot_col, (5, 5, 8, 10))
+        if fill > 0:
+            shade = pygame.Surface((dash_size, fill))
+            shade.set_alpha(150)
+            shade.fill((0, 0, 0))
+            s.blit(shade, (0, dash_size - fill))
+        return s, (dash_x, dash_y)
+
+    hud.add(Widget(dash_fill, render_dash))
+
+    # --- SHOP ---
+    overlay = pygame.Surface((SCREEN_W, 250))
+    overlay.fill((0, 0, 0))
+    overlay.set_alpha(180)
+    hud.add(Widget(lambda: 0, lambda _: (overlay, (0, SCREEN_H - 250)), in_shop))
+    hud.label(game.shop_font, (100, 255, 100), lambda: "SHOP OPEN - Press ENTER",
+              lambda w, h: (SCREEN_W // 2 - w // 2, SCREEN_H - 290), in_shop)
+
+    for b in game.buttons:
+        def button_state(b=b):
+            cost = b.cost_fn()
+            return cost, game.player.money >= cost[0], b.condition_fn() if b.condition_fn else True
+
+        def render_button(_, b=b):
+            s = pygame.Surface(b.rect.size)
+            b.draw(s, game.font_ui, game.player.money, s.get_rect())
+            return s, b.rect.topleft
+
+        hud.add(Widget(button_state, render_button, in_shop))
+
+    return hud
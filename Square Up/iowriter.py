@@ -0,0 +1,167 @@
+# iowriter.py
+import os
+import gzip
+import time
+import atexit
+import threading
+import collections
+
+# ==========================================
+# BACKGROUND FILE WRITER
+# ==========================================
+# Disk writes never happen on the frame loop. Callers queue a job and
+# return at once; one writer thread drains the queue:
+#
+#   write_file(path, data)   whole-file replace through an fsynced temp
+#                            file + os.replace, so a crash never leaves
+#                            half a file (saves)
+#   append(path, text)       appended records (telemetry). All queued
+#                            appends to one path go out as one write; a
+#                            ".gz" path gets each batch as one gzip member
+#                            (gzip readers concatenate members)
+#
+# The writer takes up to BATCH_MAX jobs at a time. When several whole-file
+# writes to one path are waiting, only the newest is written.
+#
+# The queue is bounded (QUEUE_MAX). When it is full, a LOW priority job is
+# dropped instead of queued. A HIGH priority job evicts the oldest queued
+# LOW job, and only waits if everything queued is HIGH (which in practice
+# means the disk has stopped). Drops, queue depth and submit-to-disk
+# latency are kept for the profiler.
+#
+# flush() waits until everything queued is on disk (before reading a file
+# back, at exit, at the end of a balance run).
+
+HIGH, LOW = 0, 1
+QUEUE_MAX = 256
+BATCH_MAX = 512
+FLUSH_TIMEOUT = 2.0  # Longest the frame loop waits in flush() before giving up
+
+
+def write_atomic(path, data):
+    """Temp file, fsync, rename: after a crash `path` holds either the old or the new data, never a torn file."""
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    if hasattr(os, "O_DIRECTORY"):  # POSIX: make the rename itself durable
+        fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+
+class IOWriter:
+    def __init__(self, maxlen=QUEUE_MAX):
+        self.maxlen = maxlen
+        self.queue = collections.deque()  # (submit time, priority, kind, path, data)
+        self.cond = threading.Condition()
+        self.thread = None
+        self.busy = 0  # Jobs taken off the queue but not written yet
+        # --- STATS ---
+        self.max_depth = 0
+        self.dropped = 0
+        self.written = 0
+        self.bytes = 0
+        self.latencies = collections.deque(maxlen=120)  # ms from submit to on disk
+        self.last_error = None
+
+    def __len__(self):
+        return len(self.queue) + self.busy
+
+    # --- SUBMITTING ---
+    def write_file(self, path, data, priority=HIGH):
+        """Queues an atomic replace of `path` with `data` (bytes)."""
+        return self._submit(priority, "file", path, data)
+
+    def append(self, path, text, priority=LOW):
+        """Queues `text` to be appended to `path`. Returns False if it was dropped."""
+        return self._submit(priority, "append", path, text)
+
+    def _submit(self, priority, kind, path, data):
+        with self.cond:
+            if len(self.queue) >= self.maxlen:
+                if priority == LOW:
+                    self.dropped += 1
+                    return False
+                for i, job in enumerate(self.queue):
+                    if job[1] == LOW:
+                        del self.queue[i]
+                        self.dropped += 1
+                        break
+                else:
+                    while len(self.queue) >= self.maxlen: self.cond.wait()
+            self.queue.append((time.perf_counter(), priority, kind, path, data))
+            self.max_depth = max(self.max_depth, len(self.queue))
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._run, name="io-writer", daemon=True)
+                self.thread.start()
+            self.cond.notify_all()
+        return True
+
+    def flush(self, timeout=None):
+        """Blocks until every queued job is on disk. Returns False on timeout."""
+        with self.cond:
+            return self.cond.wait_for(lambda: not self.queue and not self.busy, timeout)
+
+    # --- WRITER THREAD ---
+    def _run(self):
+        while True:
+            with self.cond:
+                self.cond.wait_for(lambda: self.queue)
+                batch = [self.queue.popleft() for _ in range(min(len(self.queue), BATCH_MAX))]
+                self.busy = len(batch)
+                self.cond.notify_all()
+            self._write_batch(batch)
+            with self.cond:
+                self.busy = 0
+                self.cond.notify_all()
+
+    def _write_batch(self, batch):
+        files = {}  # path -> newest data
+        appends = {}  # path -> [text] in submit order
+        for _, _, kind, path, data in batch:
+            if kind == "file": files[path] = data
+            else: appends.setdefault(path, []).append(data)
+
+        size = 0
+        for path, data in files.items():
+            try:
+                write_atomic(path, data)
+                size += len(data)
+            except OSError as err:
+                self.last_error = f"{path}: {err}"
+        for path, parts in appends.items():
+            blob = "".join(parts).encode()
+            if path.endswith(".gz"): blob = gzip.compress(blob, compresslevel=6)
+            try:
+                with open(path, "ab") as f:
+                    f.write(blob)
+                size += len(blob)
+            except OSError as err:
+                self.last_error = f"{path}: {err}"
+
+        now = time.perf_counter()
+        self.latencies.extend((now - job[0]) * 1000.0 for job in batch)
+        self.written += len(batch)
+        self.bytes += size
+
+    # --- REPORTING ---
+    def stats(self):
+        lat = list(self.latencies)
+        return {"depth": len(self), "max_depth": self.max_depth, "dropped": self.dropped, "written": self.written,
+                "bytes": self.bytes, "latency_ms": sum(lat) / len(lat) if lat else 0.0,
+                "max_latency_ms": max(lat, default=0.0), "error": self.last_error}
+
+    def describe(self):
+        s = self.stats()
+        text = (f"{s['depth']} queued (max {s['max_depth']}), {s['latency_ms']:.1f} ms avg / "
+                f"{s['max_latency_ms']:.1f} max to disk, {s['dropped']} dropped")
+        return text + (f", ERROR {s['error']}" if s["error"] else "")
+
+
+IO = IOWriter()
+atexit.register(IO.flush, 5.0)
@@ -9,47 +9,106 @@ CHANGELOG:
 - Bullets and Explosions cast smooth light
 """
 
+import os
+import sys
+import time
 import math
 import random
+from operator import attrgetter
+import numpy as np
 import pygame
 from pygame.locals import *
 
 # Module Imports
 from config import *
-from utils import check_grid_collision, distance, clamp
+from utils import distance, grid_array, segment_grid_hits, swept_circle_hits
 from camera import Camera
 from visuals import VisualManager
-from entities import Player, Grenade, HexBoss, SpikeEnemy, BlockEnemy, OrbEnemy, EnergyOrb
-from map_gen import generate_map, create_wall_entities, draw_floor_grid
+from entities import Player, HexBoss, SpikeEnemy, BlockEnemy, OrbEnemy, EnergyOrb
+from map_gen import generate_map, create_wall_entities
+from occlusion import LightOccluder
+from lightmap import ColorLightMap
+from minimap import Minimap
+from floor import FloorLayer
+from sprites import SHAPES
+from profiler import FrameProfiler
+from quality import QualityGovernor
+from controls import Controls
 from ui import Button
+from hud import game_hud
+from bullets import BulletPool
+from props import PropPool, PROP_KINDS, PROP_NAMES, GRENADE_TYPES, CONTACT_RADIUS
+from spatial import SpatialIndex
+from startup_cache import CACHE
+from surfaces import SURFACES
+from gc_policy import GCScheduler
+from memtrace import MemoryTracker
+from render_worker import RenderWorker
+from iowriter import IO, FLUSH_TIMEOUT
+from ecs import EntityStore, physics_system, timer_system, project_system
+from metrics import METRICS
+from simclock import SimClock
+import save
 
 
 class Game:
-    def __init__(self):
+    def __init__(self, headless=False):
+        # Headless games (balance runs, tests) never open a window; the world
+        # still renders into off-screen surfaces if anyone asks it to
+        self.headless = headless
+        if headless:
+            os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+            os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
         pygame.init()
-        self.screen = pygame.display.set_mode((SCREEN_W, SCREEN_H))
-        pygame.display.set_caption("Square Up - v8.1 Smooth Lighting")
+        if headless:
+            self.screen = pygame.Surface((SCREEN_W, SCREEN_H))
+        else:
+            self.screen = pygame.display.set_mode((SCREEN_W, SCREEN_H))
+            pygame.display.set_caption("Square Up - v8.1 Smooth Lighting")
 
         self.clock = pygame.time.Clock()
+        self.sim_clock = SimClock()  # Time scale / pause for the simulation (F7-F8, F10-F11)
 
         # --- FONTS ---
-        self.font_ui = pygame.font.SysFont("Verdana", 14, bold=True)
-        self.font_big = pygame.font.SysFont("Verdana", 24, bold=True)
-        self.font_wave = pygame.font.SysFont("Verdana", 30, bold=True)
-        self.font_enemy_count = pygame.font.SysFont("Verdana", 40, bold=True)
-        self.intro_font = pygame.font.SysFont("Impact", 80)
-        self.intro_sub_font = pygame.font.SysFont("Verdana", 30, bold=True)
-        self.shop_font = pygame.font.SysFont("Verdana", 30, bold=True)
+        # Font lookups and baked textures come from the startup cache when warm
+        CACHE.load_sprites(SHAPES)
+        self.font_ui = CACHE.font("Verdana", 14, bold=True)
+        self.font_big = CACHE.font("Verdana", 24, bold=True)
+        self.font_wave = CACHE.font("Verdana", 30, bold=True)
+        self.font_enemy_count = CACHE.font("Verdana", 40, bold=True)
+        self.intro_font = CACHE.font("Impact", 80)
+        self.intro_sub_font = CACHE.font("Verdana", 30, bold=True)
+        self.shop_font = CACHE.font("Verdana", 30, bold=True)
 
         # --- LIGHTING SURFACE ---
         # We create a smooth radial gradient "Texture" once to reuse
         self.light_radius = 700
-        self.light_surf = self.generate_light_texture(self.light_radius)
+        self.light_surf = CACHE.texture(f"light_r{self.light_radius}", (self.light_radius * 2, self.light_radius * 2),
+                                        lambda: self.generate_light_texture(self.light_radius))
 
         # The darkness layer (No alpha needed for BLEND_MULT)
-        self.fog = pygame.Surface((SCREEN_W, SCREEN_H))
+        # Lights are drawn into `fog` at light_scale resolution, then stretched into fog_full
+        self.light_scale = 1.0
+
+        # --- INTERNAL RENDER TARGET ---
+        # The world renders into `scene` (render_scale x window size), which is
+        # stretched onto the window once per frame before the HUD is drawn.
+        self.set_render_scale(RENDER_SCALE)
+        # Coloured lights (bullets, orbs, fire) are accumulated here and added to the fog in one go
+        self.lightmap = ColorLightMap(self.fog.get_size())
+
+        # --- PERFORMANCE ---
+        self.render_worker = RenderWorker(RENDER_WORKER)
+        self.profiler = FrameProfiler()
+        self.governor = QualityGovernor(1000.0 / FPS)
+        self.font_debug = CACHE.font("Consolas", 14)
 
         self.damage_alpha = 0.0
+        self.show_minimap = True
+        self.autosave_path = None if headless else AUTOSAVE_FILE
+        # Headless sims never reach the frame loop that schedules collections
+        self.gc_policy = GCScheduler(enabled=not headless)
+        self.memtrace = MemoryTracker()
         self.reset_game()
 
     def generate_light_texture(self, radius):
@@ -67,21 +126,53 @@ class Game:
             pygame.draw.circle(surf, (intensity, intensity, intensity), center, r)
         return surf
 
+    def set_render_scale(self, scale):
+        self.render_scale = scale
+        if scale == 1.0:
+            self.scene = self.screen
+        else:
+            self.scene = pygame.Surface((int(SCREEN_W * scale), int(SCREEN_H * scale)))
+        self.fog_full = pygame.Surface(self.scene.get_size())
+        self.alloc_light_buffer()
+        if hasattr(self, "cam"):
+            self.cam.set_render_scale(self.scene.get_width(), self.scene.get_height(), scale)
+            self.vm.pixel_scale = scale
+
+    def set_render_worker(self, enabled):
+        """Switches the floor/fog passes between the background thread and inline."""
+        self.render_worker.close()
+        self.render_worker = RenderWorker(enabled)
+
+    def alloc_light_buffer(self):
+        if self.light_scale == 1.0:
+            self.fog = self.fog_full
+        else:
+            w, h = self.fog_full.get_size()
+            self.fog = pygame.Surface((int(w * self.light_scale), int(h * self.light_scale)))
+
+    def present_scene(self):
+        """Stretches the internal render target onto the window."""
+        if self.scene is not self.screen:
+            pygame.transform.smoothscale(self.scene, (SCREEN_W, SCREEN_H), self.screen)
+
     def reset_game(self):
+        self.store = EntityStore().activate()  # The previous game's rows are dropped with its store
         self.level = 1
         self.player = Player()
-        self.cam = Camera(SCREEN_W, SCREEN_H)
+        self.cam = Camera(self.scene.get_width(), self.scene.get_height(), self.render_scale)
         self.cam.set_target(self.player.wx, self.player.wy)
         self.cam.focus_wx = self.player.wx
         self.cam.focus_wy = self.player.wy
 
-        self.vm = VisualManager()
-        self.map_grid = generate_map(MAP_W, MAP_H, self.level)
-        self.walls = create_wall_entities(self.map_grid, self.level)
+        self.floor = FloorLayer(MAP_W, MAP_H, self.level)
+        self.vm = VisualManager(self.floor)
+        self.vm.pixel_scale = self.render_scale
+        self.map_seed = self.level
+        self.build_map()
 
-        self.bullets = []
+        self.bullets = BulletPool()
         self.enemies = []
-        self.grenades = []
+        self.props = PropPool()  # Grenades, bomblets, shrapnel
         self.orbs = []
 
         self.wave_active = True
@@ -91,6 +182,7 @@ class Game:
         self.spawn_timer = 0
 
         self.init_shop()
+        self.hud = game_hud(self)
         self.game_over = False
 
         self.intro_active = True
@@ -102,12 +194,39 @@ class Game:
 
         self.intro_text_x = 400.0
         self.intro_text_alpha = 0.0
+        self.apply_quality()
+        self.gc_policy.level_loaded()
+        self.gc_policy.wave_started()
+        self.memtrace.wave_started(self)
+
+    def build_map(self):
+        """The map of self.map_seed and everything derived from it (walls, light occluder, minimap)."""
+        self.map_grid = generate_map(MAP_W, MAP_H, self.map_seed)
+        self.walls = create_wall_entities(self.map_grid, self.level)
+        self.occluder = LightOccluder(self.map_grid)
+        self.minimap = Minimap(self.map_grid, self.level)
+
+    def apply_quality(self):
+        """Pushes the governor's current tier into every system it controls."""
+        q = self.governor.settings
+        self.vm.max_particles = q["max_particles"]
+        self.vm.max_casings = q["max_casings"]
+        self.vm.max_ghosts = q["max_ghosts"]
+        self.vm.text_effects = q["text_effects"]
+        self.floor.set_show_lines(q["floor_lines"])
+        self.max_lights = q["max_lights"]
+        self.show_shadows = q["shadows"]
+        self.occlusion_ms = q["occlusion_ms"]
+        self.colored_lights = q["colored_lights"]
+        if q["light_scale"] != self.light_scale:
+            self.light_scale = q["light_scale"]
+            self.alloc_light_buffer()
 
     def init_shop(self):
         self.buttons = []
         w, h = 220, 50
         x1, y = 20, SCREEN_H - 240
-        x2, x3, x4 = 250, 480, 710
+        x2, x3, x4, x5 = 250, 480, 710, 940
 
         def up_dmg(p): p.stats["damage"] *= 1.2
 
@@ -148,6 +267,23 @@ class Game:
 
         def cost_pistol(): return 0, "Basic Gun"
 
+        def buy_minigun(p): p.weapon_type = "minigun"
+
+        def cost_minigun(): return 1200, "Bullet Hose"
+
+        def buy_flamer(p): p.weapon_type = "flamethrower"
+
+        def cost_flamer(): return 1500, "Short Range Burn"
+
+        def next_nade_type():
+            return GRENADE_TYPES[(GRENADE_TYPES.index(self.player.grenade_type) + 1) % len(GRENADE_TYPES)]
+
+        def swap_nade(p): p.grenade_type = next_nade_type()
+
+        def cost_swap_nade():
+            cost = {"grenade": 0, "cluster": 600, "frag": 500}[next_nade_type()]
+            return cost, f"Now: {self.player.grenade_type.title()}"
+
         def buy_drone(p): p.add_drone()
 
         def cost_drone(): return 300 * (len(self.player.drones) + 1), f"Count: {len(self.player.drones)}"
@@ -179,7 +315,12 @@ class Game:
         self.buttons.append(Button((x4, y + 60, w, h), "BUY GRENADES x3", buy_nade, cost_nade))
         self.buttons.append(Button((x4, y + 120, w, h), "UPGRADE DASH", up_dash, cost_dash))
 
+        self.buttons.append(Button((x5, y, w, h), "BUY MINIGUN", buy_minigun, cost_minigun))
+        self.buttons.append(Button((x5, y + 60, w, h), "BUY FLAMETHROWER", buy_flamer, cost_flamer))
+        self.buttons.append(Button((x5, y + 120, w, h), "SWAP NADE TYPE", swap_nade, cost_swap_nade))
+
     def start_next_level(self):
+        self.store.activate()
         self.level += 1
         self.wave_active = True
         self.enemies_spawned = 0
@@ -187,8 +328,9 @@ class Game:
         self.enemies_to_spawn = 10 + int(self.level * 2.5)
         self.orbs = []
 
-        self.map_grid = generate_map(MAP_W, MAP_H, self.level)
-        self.walls = create_wall_entities(self.map_grid, self.level)
+        self.map_seed = self.level
+        self.build_map()
+        self.floor.set_level(self.level)
 
         margin = self.player.radius
         if self.player.check_area_collision(self.player.wx - margin, self.player.wx + margin, self.player.wy - margin,
@@ -208,8 +350,44 @@ class Game:
                 if found_safe: break
             if not found_safe: self.player.wx, self.player.wy = MAP_W / 2, MAP_H / 2
 
-        self.vm.add_text(SCREEN_W / 2, SCREEN_H / 2 - 100, f"LEVEL {self.level} STARTED", (255, 255, 100), 2.0, size=30)
+        self.vm.add_text(self.cam.w / 2, self.cam.h / 2 - 100 * self.render_scale, f"LEVEL {self.level} STARTED", (255, 255, 100), 2.0, size=30)
         self.cam.add_shake(10)
+        self.gc_policy.level_loaded()
+        self.gc_policy.wave_started()
+        self.memtrace.wave_started(self)
+        self.autosave()
+
+    # --- SAVE / LOAD ---
+    def autosave(self):
+        if self.autosave_path: self.save_game(self.autosave_path)
+
+    def save_game(self, path):
+        """Serializes now; the writer thread puts it on disk (atomically) off the frame."""
+        t0 = time.perf_counter()
+        data = save.snapshot(self)
+        IO.write_file(path, data)
+        self.profiler.set_status("save", f"{len(data)} B in {(time.perf_counter() - t0) * 1000:.2f} ms, queued")
+
+    def load_game(self, path):
+        # A save still queued for this path has to land first; a stalled disk must not hang the frame loop
+        if not IO.flush(FLUSH_TIMEOUT):
+            self.vm.add_text(self.cam.w // 2, self.cam.h // 2, f"LOAD FAILED: save still writing ({IO.describe()})",
+                             (255, 80, 80), 2.0, 20)
+            return False
+        try:
+            save.load_file(self, path)
+        except (OSError, ValueError) as err:
+            self.vm.add_text(self.cam.w // 2, self.cam.h // 2, f"LOAD FAILED: {err}", (255, 80, 80), 2.0, 20)
+            return False
+        self.vm.add_text(self.cam.w // 2, self.cam.h // 2 - 100 * self.render_scale, f"LOADED LEVEL {self.level}",
+                         (255, 255, 100), 2.0, size=30)
+        self.gc_policy.level_loaded()
+        if self.wave_active:
+            self.gc_policy.wave_started()
+            self.memtrace.wave_started(self)
+        else:
+            self.gc_policy.wave_ended()
+        return True
 
     def spawn_enemy(self):
         attempts = 0
@@ -237,139 +415,264 @@ class Game:
                 return
             attempts += 1
 
-    def handle_explosion(self, gx, gy, damage, radius_world):
+    def handle_explosion(self, gx, gy, damage, radius_world, index=None, targets=None):
+        """Damages every enemy within radius_world. index/targets: a SpatialIndex over targets, shared per frame."""
         self.cam.add_shake(15)
-        sx, sy = self.cam.world_to_screen(gx, gy)
-        self.vm.add_explosion(sx, sy)
-        for e in self.enemies:
-            if distance(gx, gy, e.wx, e.wy) < radius_world:
-                e.take_damage(damage)
+        self.vm.add_explosion(gx, gy)
+        if index is None:
+            targets = [e for e in self.enemies if not e.dead]
+            index = SpatialIndex([e.wx for e in targets], [e.wy for e in targets])
+        for i in index.query(gx, gy, radius_world).tolist():
+            if not targets[i].dead: targets[i].take_damage(damage)
+
+    def resolve_props(self, dt):
+        """Steps the prop pool, then applies its blasts and shrapnel hits through one spatial index of the enemies."""
+        kinds, xs, ys, _ = self.props.update(dt, self.map_grid)
+        hot = self.props.contact_rows()
+        if not len(kinds) and not len(hot): return
+        targets = [e for e in self.enemies if not e.dead]
+        index = SpatialIndex([e.wx for e in targets], [e.wy for e in targets])
+        for k, x, y in zip(kinds.tolist(), xs.tolist(), ys.tolist()):
+            blast = PROP_KINDS[PROP_NAMES[k]].get("blast")
+            if blast: self.handle_explosion(x, y, blast[0], blast[1], index, targets)
+        if not len(hot) or not targets: return
+
+        # Each fragment hits the first enemy it touches (lowest index) and is used up
+        rows, hits = index.pairs(self.props.x[hot], self.props.y[hot], CONTACT_RADIUS)
+        if not len(rows): return
+        rows, first = np.unique(rows, return_index=True)
+        hot = hot[rows]
+        for j, dmg in zip(hits[first].tolist(), self.props.contact_damage(hot).tolist()):
+            if not targets[j].dead: targets[j].take_damage(dmg)
+        self.props.kill(hot)
+
+    def resolve_bullet_hits(self):
+        """Swept bullet collision.
+
+        Each bullet's path this frame is tested against the tile grid, the player
+        and every enemy, and hits are applied in the order they occur along the
+        path, so the result does not depend on how long the frame was.
+
+        The wall and circle tests run over the whole pool at once; only bullets
+        that actually reach the player or an enemy before the wall get a Python
+        iteration.
+        """
+        pool = self.bullets
+        n = pool.count
+        if n == 0: return
+
+        x0, y0 = pool.px[:n], pool.py[:n]
+        x1, y1 = pool.wx[:n], pool.wy[:n]
+        t_wall = segment_grid_hits(x0, y0, x1, y1, grid_array(self.map_grid))
+        t_end = np.minimum(t_wall, 1.0)
+        live = pool.lifetime[:n] > 0
+        t_player = swept_circle_hits(x0, y0, x1, y1, np.array([self.player.wx]), np.array([self.player.wy]), 0.6)[:, 0]
+        hit_player = live & (pool.owner[:n] != self.player.uid) & (t_player <= t_end)
+        if self.enemies:
+            ex = np.array([e.wx for e in self.enemies])
+            ey = np.array([e.wy for e in self.enemies])
+            t_enemy = swept_circle_hits(x0, y0, x1, y1, ex, ey, 0.8)
+            hit_enemy = live & (t_enemy <= t_end[:, None]).any(axis=1)
+        else:
+            hit_enemy = np.zeros(n, dtype=bool)
+
+        for i in np.flatnonzero(hit_player | hit_enemy).tolist():
+            owner = int(pool.owner[i])
+
+            # Everything this bullet touches before the wall, earliest first
+            events = []
+            if hit_player[i]:
+                events.append((float(t_player[i]), -1))
+            if hit_enemy[i]:
+                row = t_enemy[i]
+                for j in np.flatnonzero(row <= t_end[i]).tolist():
+                    events.append((float(row[j]), j))
+            events.sort()
+
+            for t, j in events:
+                if j < 0:
+                    self.player.health -= float(pool.damage[i])
+                    self.damage_alpha = 150.0  # Trigger red flash
+                    pool.lifetime[i] = 0  # Destroy bullet
+
+                    # Add blood effect
+                    self.vm.add_particle(self.player.wx, self.player.wy, (255, 0, 0))
+                    break
+
+                e = self.enemies[j]
+                if e.uid == owner: continue
+                if pool.has_hit(i, e.uid): continue
+                dmg = float(pool.damage[i])
+                e.take_damage(dmg)
+                pool.add_hit(i, e.uid)
+                sx, sy = self.cam.world_to_screen(e.wx, e.wy)
+                self.vm.add_particle(e.wx, e.wy, e.color)
+                self.vm.add_text(sx, sy - 40, str(int(dmg)), (255, 255, 255))
+                e.apply_knockback(float(pool.vx[i]) * 0.2, float(pool.vy[i]) * 0.2)
+                if pool.pierce[i] <= 0:
+                    pool.lifetime[i] = 0
+                    break
+                else:
+                    pool.pierce[i] -= 1
+
+        # Bullets still flying stop on the wall face, so they are drawn at the impact point
+        walled = np.flatnonzero(np.isfinite(t_wall) & (pool.lifetime[:n] > 0))
+        if len(walled):
+            t = t_wall[walled]
+            hx = x0[walled] + (x1[walled] - x0[walled]) * t
+            hy = y0[walled] + (y1[walled] - y0[walled]) * t
+            pool.wx[walled], pool.wy[walled] = hx, hy
+            pool.lifetime[walled] = 0
+            self.vm.add_particles(hx, hy, (200, 200, 200))
 
     # --- SMOOTH LIGHTING SYSTEM ---
-    def draw_vignette(self):
-        if self.intro_active: return
+    def gather_lights(self):
+        """This frame's lights as (sx, sy, scale, occlusion origin or None, colour or None = white).
 
-        # 1. Fill the fog layer with DARKNESS (Ambient Light)
+        Taken on the main thread right after the simulation; build_fog only ever sees this snapshot.
+        """
+        # Player Flashlight first so it survives the light cap
+        px, py = self.cam.world_to_screen(self.player.wx + 0.5, self.player.wy + 0.5)
+        lights = [(px, py, self.cam.zoom * 1.0, (self.player.wx, self.player.wy), None)]  # 1.0 = Normal flashlight size
+
+        # Lights for Bullets (Glowing trails!)
+        n = self.bullets.count
+        if n:
+            wxs, wys = self.bullets.wx[:n], self.bullets.wy[:n]
+            bxs, bys = self.cam.world_to_screen_array(wxs, wys)
+            glow = self.cam.zoom * 0.15  # Small glow for bullets
+            # Boss projectiles are the other lights that get shadows
+            owners = self.bullets.owner[:n]
+            boss_uids = [o for o in np.unique(owners).tolist() if isinstance(self.store.handles.resolve(o), HexBoss)]
+            from_boss = np.isin(owners, boss_uids).tolist() if boss_uids else [False] * n
+            lights.extend((bx, by, glow, (wx, wy) if boss else None, col) for bx, by, wx, wy, boss, col in
+                          zip(bxs.tolist(), bys.tolist(), wxs.tolist(), wys.tolist(), from_boss,
+                              self.bullets.color[:n].tolist()))
+
+        # Lights for Orbs
+        for o in self.orbs:
+            ox, oy = self.cam.world_to_screen(o.wx, o.wy)
+            lights.append((ox, oy, self.cam.zoom * 0.2, None, COL_ENERGY))
+
+        # Lights for Explosions/Fire, tinted by the particle when coloured lighting is on
+        pxs, pys, prs, pcols = self.vm.particles.project(self.cam, min_size=5.0)
+        lights.extend((x, y, r / 50.0, None, col) for x, y, r, col in
+                      zip(pxs.tolist(), pys.tolist(), prs.tolist(), pcols.tolist()))
+        self.profiler.count("lights", min(len(lights), self.max_lights))
+        return lights[:self.max_lights]
+
+    def build_fog(self, lights):
+        """Renders a gather_lights() snapshot into fog_full. Returns (coloured, occluded) light counts.
+
+        Runs on the render worker: it only touches the fog layers, the light map and the occluder.
+        """
+        # DARKNESS (Ambient Light) is filled in by the light map composite, together with the coloured lights
         # Use (5, 5, 10) for extremely dark, tactical feel
-        self.fog.fill((5, 5, 12))
+        ambient = (5, 5, 12)
+        ls = self.light_scale
+
+        fog_rect = self.fog.get_rect()
+        occlusion_left = self.occlusion_ms / 1000.0
+        occluded = 0
+        # Screen px per world unit along the squashed axis: world reach of a light never exceeds r_px / this
+        px_per_unit = TILE_H_BASE * self.cam.zoom / math.sqrt(2)
 
         # Helper to blit light cleanly
-        def draw_light(sx, sy, scale):
+        def draw_light(sx, sy, scale, origin=None):
+            nonlocal occlusion_left, occluded
             # Scale the pre-generated smooth gradient
-            size = int(self.light_radius * 2 * scale)
+            size = int(self.light_radius * 2 * scale * ls)
             if size <= 0: return
 
-            # Optimization: Only scale if size changed (simple cache could go here)
-            # For now, transform.scale is fast enough for low object counts
-            scaled_light = pygame.transform.scale(self.light_surf, (size, size))
+            # Scaled copies are cached per (rounded) size, so repeated sizes cost nothing
+            scaled_light = SURFACES.scaled(self.light_surf, size, size)
+            size = scaled_light.get_width()
+            pos = (sx * ls - size // 2, sy * ls - size // 2)
+
+            # Walls cast shadows for the significant lights, as long as the frame's occlusion budget lasts
+            if origin is not None and occlusion_left > 0:
+                t0 = time.perf_counter()
+                drawn = self.draw_occluded_light(scaled_light, pos, origin,
+                                                 self.light_radius * scale * OCCLUSION_REACH / px_per_unit, fog_rect)
+                occlusion_left -= time.perf_counter() - t0
+                if drawn:
+                    occluded += 1
+                    return
 
             # Blit using ADD: This ADDS light to the darkness
             # Center the light on the coordinate
-            self.fog.blit(scaled_light, (sx - size // 2, sy - size // 2), special_flags=pygame.BLEND_ADD)
+            self.fog.blit(scaled_light, pos, special_flags=pygame.BLEND_ADD)
 
-        # 2. Draw Player Flashlight
-        px, py = self.cam.world_to_screen(self.player.wx + 0.5, self.player.wy + 0.5)
-        draw_light(px, py, self.cam.zoom * 1.0)  # 1.0 = Normal flashlight size
-
-        # 3. Draw Lights for Bullets (Glowing trails!)
-        for b in self.bullets:
-            bx, by = self.cam.world_to_screen(b.wx, b.wy)
-            draw_light(bx, by, self.cam.zoom * 0.15)  # Small glow for bullets
-
-        # 4. Draw Lights for Orbs
-        for o in self.orbs:
-            ox, oy = self.cam.world_to_screen(o.wx, o.wy)
-            draw_light(ox, oy, self.cam.zoom * 0.2)
-
-        # 5. Draw Lights for Explosions/Fire
-        for p in self.vm.particles:
-            if p.size > 5:
-                # Use particle color to tint the light?
-                # For simplicity in this blend mode, white light reveals the color underneath best.
-                draw_light(p.x, p.y, (p.size / 50.0))
+        glows, blits = [], []
+        for light in lights:
+            sx, sy, scale, origin, color = light
+            if self.colored_lights and origin is None and color is not None:
+                glows.append((sx * ls, sy * ls, self.light_radius * scale * ls, tuple(color)[:3]))
+            else:
+                blits.append(light)
+        if glows:
+            self.lightmap.add_many(*zip(*glows))
+        # Writes ambient + coloured lights over the whole fog layer, white lights add on top
+        self.lightmap.composite(self.fog, ambient)
+        for sx, sy, scale, origin, _ in blits:
+            draw_light(sx, sy, scale, origin)
+
+        if self.fog is not self.fog_full:
+            pygame.transform.smoothscale(self.fog, self.fog_full.get_size(), self.fog_full)
+        return len(glows), occluded
 
-        # 6. Apply to Screen using MULTIPLY
+    def draw_vignette(self):
+        """Waits for the fog job and multiplies it over the scene."""
+        result = self.render_worker.join("fog")
+        if result is None: return
+        coloured, occluded = result
+        self.profiler.count("coloured lights", coloured)
+        if occluded: self.profiler.count("occluded lights", occluded)
+        self.profiler.set_status("occlusion", f"{self.occluder.hits} hit / {self.occluder.misses} miss, "
+                                              f"{len(self.occluder.segments)} edges")
+
+        # Apply to Screen using MULTIPLY
         # Darkness (Low RGB) * Screen = Dark
         # Light (High RGB) * Screen = Lit
-        self.screen.blit(self.fog, (0, 0), special_flags=pygame.BLEND_MULT)
+        self.scene.blit(self.fog_full, (0, 0), special_flags=pygame.BLEND_MULT)
+
+    def draw_occluded_light(self, light, pos, origin, reach, fog_rect):
+        """Adds `light` at `pos` to the fog, dark wherever walls hide it from `origin`.
+
+        Returns False when nothing blocks the light (the caller then draws it plainly).
+        """
+        poly = self.occluder.polygon(origin[0], origin[1], reach)
+        if poly is None: return False
+        # Only the on-screen part of the light is worth touching
+        area = pygame.Rect(pos, light.get_size()).clip(fog_rect)
+        if not area.w or not area.h: return True
+
+        lit = SURFACES.acquire(area.w, area.h, like=light)
+        lit.blit(light, (0, 0), area.move(-pos[0], -pos[1]))
+
+        ls = self.light_scale
+        sx, sy = self.cam.world_to_screen_array(poly[:, 0], poly[:, 1])
+        pts = list(zip((sx * ls - area.x).tolist(), (sy * ls - area.y).tolist()))
+        # Black out everything outside the polygon in one fill: the surface outline,
+        # then a zero-width bridge into the polygon and around it (a keyhole shape)
+        w, h = area.w, area.h
+        outside = [(0, 0), (w, 0), (w, h), (0, h), (0, 0)] + pts + [pts[0], (0, 0)]
+        pygame.draw.polygon(lit, (0, 0, 0), outside)
+        self.fog.blit(lit, area.topleft, special_flags=pygame.BLEND_ADD)
+        return True
 
     def draw_hud(self):
         if self.intro_active: return
-        bar_w, bar_h = 200, 25
-        bar_x, bar_y = 20, 20
-        pygame.draw.rect(self.screen, (30, 30, 30), (bar_x, bar_y, bar_w, bar_h))
-        pct = clamp(self.player.health / self.player.stats["hp_max"], 0, 1)
-        pygame.draw.rect(self.screen, (200, 50, 50), (bar_x + 2, bar_y + 2, (bar_w - 4) * pct, bar_h - 4))
-        hp_text = f"{int(self.player.health)} / {int(self.player.stats['hp_max'])}"
-        txt_surf = self.font_ui.render(hp_text, True, (255, 255, 255))
-        self.screen.blit(txt_surf, (bar_x + bar_w // 2 - txt_surf.get_width() // 2, bar_y + 4))
-
-        ult_w, ult_h = 200, 15
-        ult_y = bar_y + bar_h + 2
-        pygame.draw.rect(self.screen, (20, 20, 40), (bar_x, ult_y, ult_w, ult_h))
-        ult_pct = clamp(self.player.energy / self.player.max_energy, 0, 1)
-        u_col = (100, 100, 100)
-        if self.player.ultimate_active:
-            u_col = (0, 255, 255)
-            ult_pct = self.player.ultimate_timer / self.player.ultimate_duration
-        elif self.player.energy >= self.player.max_energy:
-            u_col = (255, 255, 0)
-        pygame.draw.rect(self.screen, u_col, (bar_x + 1, ult_y + 1, (ult_w - 2) * ult_pct, ult_h - 2))
-        msg = "Q: ULTIMATE"
-        if self.player.ultimate_active:
-            msg = "ACTIVE!"
-        elif self.player.energy < self.player.max_energy:
-            msg = f"{int(self.player.energy)}%"
-        u_txt = self.font_ui.render(msg, True, (0, 0, 0))
-        self.screen.blit(u_txt, (bar_x + ult_w // 2 - u_txt.get_width() // 2, ult_y - 2))
-
-        lvl_w, lvl_h = 100, 15
-        lvl_y = ult_y + ult_h + 5
-        pygame.draw.rect(self.screen, (30, 30, 30), (bar_x, lvl_y, lvl_w, lvl_h))
-        pygame.draw.rect(self.screen, (50, 200, 50), (bar_x + 2, lvl_y + 2, lvl_w - 4, lvl_h - 4))
-        lvl_txt = self.font_ui.render(f"LV. {self.level}", True, (255, 255, 255))
-        self.screen.blit(lvl_txt, (bar_x + 5, lvl_y - 2))
-
-        coin_y = lvl_y + lvl_h + 10
-        pygame.draw.circle(self.screen, COL_MONEY, (bar_x + 10, coin_y + 10), 10)
-        money_txt = self.font_big.render(f"{int(self.player.money)}", True, COL_MONEY)
-        self.screen.blit(money_txt, (bar_x + 25, coin_y))
-
-        cx = SCREEN_W // 2
-        wave_txt = self.font_wave.render(f"WAVE {self.level}", True, (255, 255, 255))
-        self.screen.blit(wave_txt, (cx - wave_txt.get_width() // 2, 20))
-
-        remaining_real = (self.enemies_to_spawn - self.enemies_spawned) + len(self.enemies)
-        if not self.wave_active: remaining_real = 0
-        enemy_txt = self.font_enemy_count.render(f"{remaining_real}", True, (255, 50, 50))
-        self.screen.blit(enemy_txt, (cx - enemy_txt.get_width() // 2, 55))
-
-        dash_x = bar_x + bar_w + 10
-        dash_y = bar_y
-        dash_size = 30
-        pygame.draw.rect(self.screen, (50, 50, 50), (dash_x, dash_y, dash_size, dash_size))
-        pygame.draw.rect(self.screen, (200, 200, 200), (dash_x, dash_y, dash_size, dash_size), 2)
-        boot_col = (100, 200, 255)
-        if self.player.dash_cooldown > 0: boot_col = (100, 100, 100)
-        pygame.draw.rect(self.screen, boot_col, (dash_x + 5, dash_y + 10, 20, 15))
-        pygame.draw.rect(self.screen, boot_col, (dash_x + 5, dash_y + 5, 8, 10))
-        if self.player.dash_cooldown > 0:
-            max_cd = 1.2
-            ratio = self.player.dash_cooldown / max_cd
-            fill_h = int(dash_size * ratio)
-            s = pygame.Surface((dash_size, fill_h))
-            s.set_alpha(150)
-            s.fill((0, 0, 0))
-            self.screen.blit(s, (dash_x, dash_y + (dash_size - fill_h)))
-
-        if not self.wave_active:
-            overlay = pygame.Surface((SCREEN_W, 250))
-            overlay.fill((0, 0, 0))
-            overlay.set_alpha(180)
-            self.screen.blit(overlay, (0, SCREEN_H - 250))
-            msg = self.shop_font.render("SHOP OPEN - Press ENTER", True, (100, 255, 100))
-            self.screen.blit(msg, (SCREEN_W // 2 - msg.get_width() // 2, SCREEN_H - 290))
-            for b in self.buttons: b.draw(self.screen, self.font_ui, self.player.money)
+        self.profiler.count("hud redraws", self.hud.draw(self.screen))
+        if self.show_minimap and self.wave_active: self.draw_minimap()
+
+    def draw_minimap(self):
+        kinds = ["boss" if isinstance(e, HexBoss) else "enemy" for e in self.enemies] + ["orb"] * len(self.orbs)
+        positions = np.array([(e.wx, e.wy) for e in self.enemies] + [(o.wx, o.wy) for o in self.orbs],
+                             dtype=np.float64).reshape(-1, 2)
+        m = self.minimap.surface
+        self.minimap.draw(self.screen, SCREEN_W - m.get_width() - 15, SCREEN_H - m.get_height() - 15,
+                          positions, kinds, (self.player.wx, self.player.wy))
 
     def draw_game_over(self):
         self.screen.fill((20, 0, 0))
@@ -416,7 +719,8 @@ class Game:
 
         for i in range(3):
             r = 25 + i * 5
-            s = pygame.Surface((r * 2, r * 2), pygame.SRCALPHA)
+            s = SURFACES.acquire(r * 2, r * 2, pygame.SRCALPHA)
+            s.fill((0, 0, 0, 0))
             pygame.draw.circle(s, (60, 150, 255, 50), (r, r), r)
             self.screen.blit(s, (ball_x - r, ball_y - r))
 
@@ -438,239 +742,318 @@ class Game:
             sub_y = ball_y + 45
             self.screen.blit(sub_txt, (sub_x, sub_y))
 
+    # --- INPUT ---
+    def handle_events(self, controls):
+        """Processes the pygame event queue. Returns False when the game should quit."""
+        running = True
+        mx, my = pygame.mouse.get_pos()
+        for event in pygame.event.get():
+            if event.type == QUIT:
+                running = False
+            elif event.type == MOUSEWHEEL:
+                if event.y > 0: self.cam.zoom_in()
+                if event.y < 0: self.cam.zoom_out()
+            elif event.type == KEYDOWN:
+                if event.key == K_ESCAPE: running = False
+                if event.key == K_F3: self.profiler.toggle()
+                if event.key == K_m: self.show_minimap = not self.show_minimap
+                if event.key == K_F5 and not self.intro_active and not self.game_over: self.save_game(AUTOSAVE_FILE)
+                if event.key == K_F9: self.load_game(AUTOSAVE_FILE)
+                if event.key == K_F7: self.sim_clock.slower()
+                if event.key == K_F8: self.sim_clock.faster()
+                if event.key == K_F10: self.sim_clock.toggle_pause()
+                if event.key == K_F11: self.sim_clock.step()
+                if event.key == K_F6:
+                    i = RENDER_SCALES.index(self.render_scale) if self.render_scale in RENDER_SCALES else -1
+                    self.set_render_scale(RENDER_SCALES[(i + 1) % len(RENDER_SCALES)])
+                if event.key == K_SPACE: self.cam.rotate_view()
+                if event.key == K_RETURN and not self.wave_active: self.start_next_level()
+                if event.key == K_r and self.game_over: self.reset_game()
+                if event.key == K_q: controls.ultimate = True
+
+            elif event.type == MOUSEBUTTONDOWN:
+                if not self.intro_active and not self.game_over and event.button == 1:
+                    if not self.wave_active:
+                        for b in self.buttons: b.click(mx, my, self.player)
+                elif not self.intro_active and event.button == 3:
+                    controls.grenade_target = self.cam.screen_to_world(mx * self.render_scale, my * self.render_scale)
+        return running
+
+    def read_controls(self, controls):
+        """Fills in held keys / mouse state. Movement is turned into world space here."""
+        keys = pygame.key.get_pressed()
+        controls.dash = bool(keys[K_LSHIFT])
+        input_x, input_y = 0, 0
+        if keys[K_w] or keys[K_UP]: input_y = -1
+        if keys[K_s] or keys[K_DOWN]: input_y = 1
+        if keys[K_a] or keys[K_LEFT]: input_x = -1
+        if keys[K_d] or keys[K_RIGHT]: input_x = 1
+
+        idx = self.cam.rotation_index % 4
+        vx, vy = 0, 0
+        if idx == 0:
+            vx, vy = input_x, input_y
+        elif idx == 1:
+            vx, vy = input_y, -input_x
+        elif idx == 2:
+            vx, vy = -input_x, -input_y
+        elif idx == 3:
+            vx, vy = -input_y, input_x
+        controls.move_x, controls.move_y = vx, vy
+
+        mx, my = pygame.mouse.get_pos()
+        if pygame.mouse.get_pressed()[0]:
+            if self.wave_active or (my < SCREEN_H - 250):
+                controls.fire = True
+                controls.aim_wx, controls.aim_wy = self.cam.screen_to_world(mx * self.render_scale,
+                                                                            my * self.render_scale)
+        return controls
+
+    # --- SIMULATION ---
+    def update_intro(self, dt):
+        self.intro_vz += 2000.0 * dt
+        self.intro_z -= self.intro_vz * dt
+        # FIX 4: Reduce shake drastically (divide by 2000 instead of 500)
+        self.intro_cam_shake = int(self.intro_vz / 2000.0)
+
+        if self.intro_z < 6000:
+            self.intro_text_x += (0 - self.intro_text_x) * 3.0 * dt
+            self.intro_text_alpha = min(255, self.intro_text_alpha + 300 * dt)
+
+        if self.intro_z <= 0:
+            self.land()
+
+    def land(self):
+        """End of the intro drop: the player hits the floor and the wave starts."""
+        self.intro_z = 0
+        self.intro_active = False
+        self.cam.add_shake(60)
+        sx, sy = self.cam.world_to_screen(self.player.wx, self.player.wy)
+        for _ in range(10): self.vm.add_crack(self.player.wx, self.player.wy, (200, 200, 200))
+        self.vm.add_explosion(self.player.wx, self.player.wy, (255, 255, 255))
+        self.vm.add_text(sx, sy - 100 * self.render_scale, "BEGIN!", (255, 50, 50), 2.0, 30)
+
+    def update(self, dt, controls):
+        """Advances the game by dt seconds using one frame of Controls (keyboard or bot)."""
+        self.store.activate()
+        if controls.ultimate:
+            if self.player.activate_ultimate():
+                self.vm.add_text(self.cam.w // 2, self.cam.h // 2 - 200 * self.render_scale,
+                                 "ULTIMATE ACTIVATED!", (0, 255, 255), 2.0, 30)
+                self.cam.add_shake(20)
+
+        if controls.grenade_target and self.player.grenade_count > 0:
+            g_wx, g_wy = controls.grenade_target
+            self.props.throw(self.player.grenade_type, self.player.wx, self.player.wy, g_wx, g_wy)
+            self.player.grenade_count -= 1
+
+        if controls.dash: self.player.attempt_dash()
+        vx, vy = controls.move_x, controls.move_y
+
+        if vx != 0 or vy != 0:
+            l = math.hypot(vx, vy)
+            vx /= l
+            vy /= l
+            speed = self.player.stats["speed"]
+            if self.player.is_dashing: speed *= 3.0
+            self.player.vx = vx * speed
+            self.player.vy = vy * speed
+        else:
+            if not self.player.is_dashing: self.player.vx, self.player.vy = 0, 0
+
+        # Knockback + wall collision and the flash / lifetime timers, batched over the store
+        physics_system(dt, self.map_grid, self.store)
+        timer_system(dt, self.store)
+        self.player.update(dt, self.enemies, self.bullets, self.map_grid, self.vm)
+        self.minimap.reveal(self.player.wx, self.player.wy)
+
+        for orb in self.orbs:
+            orb.update(dt)
+            if distance(self.player.wx, self.player.wy, orb.wx, orb.wy) < 1.0:
+                orb.lifetime = 0
+                self.player.energy = min(self.player.max_energy, self.player.energy + 10)
+                self.vm.add_particle(orb.wx, orb.wy, (0, 255, 255))
+        self.orbs = [o for o in self.orbs if o.lifetime > 0]
+
+        if controls.fire:
+            shot = self.player.shoot(self.bullets, controls.aim_wx, controls.aim_wy)
+            if shot and shot.casing: self.vm.add_casing(self.player.wx, self.player.wy)
+
+        self.cam.set_target(self.player.wx, self.player.wy)
+        self.cam.update(dt)
+
+        if self.wave_active:
+            if self.enemies_spawned < self.enemies_to_spawn:
+                self.spawn_timer -= dt
+                if self.spawn_timer <= 0:
+                    self.spawn_enemy()
+                    self.spawn_timer = max(0.5, 2.0 - self.level * 0.1)
+            elif len(self.enemies) == 0:
+                self.wave_active = False
+                self.player.money += 50 * self.level
+                self.gc_policy.wave_ended()
+                self.memtrace.wave_ended(self)
+                self.autosave()
+
+        self.bullets.update(dt)
+        self.resolve_props(dt)
+
+        for e in self.enemies:
+            # PASS SELF.CAM HERE for earthquakes
+            e.update(dt, self.player, self.map_grid, self.bullets, self.cam)
+
+            if not self.player.is_dashing:
+                if distance(self.player.wx, self.player.wy, e.wx, e.wy) < 0.8:
+                    self.player.health -= e.damage_to_player * dt
+                    self.damage_alpha = 150.0
+
+        if self.player.health <= 0:
+            self.game_over = True
+            self.gc_policy.wave_ended()
+            self.memtrace.wave_ended(self)
+            self.vm.add_explosion(self.player.wx, self.player.wy, (255, 0, 0))
+
+        self.resolve_bullet_hits()
+
+        survivors = []
+        for e in self.enemies:
+            if e.dead:
+                self.player.money += e.money_value
+                self.enemies_killed_in_wave += 1
+                self.cam.add_shake(3.0)
+                sx, sy = self.cam.world_to_screen(e.wx, e.wy)
+                self.vm.add_text(sx, sy - 60, f"+${e.money_value}", COL_MONEY)
+                for _ in range(8): self.vm.add_particle(e.wx, e.wy, e.color)
+
+                if random.random() < 1:
+                    self.orbs.append(EnergyOrb(e.wx, e.wy))
+            else:
+                survivors.append(e)
+        self.enemies = survivors
+
+        self.vm.update(dt)
+
+    # --- RENDERING ---
+    def advance(self, real_dt, controls):
+        """Runs the sim clock's steps for a real_dt frame (the headless entry point for scaled time).
+
+        Returns the number of steps taken: 0 while paused, ceil(scale) when fast-forwarding.
+        """
+        steps = self.sim_clock.steps(real_dt)
+        for i, dt in enumerate(steps):
+            self.update(dt, controls if i == 0 else controls.held())
+            if self.game_over: break
+        return len(steps)
+
+    def render(self, dt):
+        # Floor rebuild and fog go to the render worker; the scene itself is only drawn here
+        self.render_worker.submit("floor", self.floor.refresh, self.cam)
+        if not self.intro_active: self.render_worker.submit("fog", self.build_fog, self.gather_lights())
+
+        render_list = []
+        render_list.append(self.player)
+        render_list.extend(self.enemies)
+        render_list.extend(self.walls)
+        project_system(self.cam, self.store)
+        render_list.sort(key=attrgetter("sy"))
+
+        self.scene.fill(COL_BG)
+        self.render_worker.join("floor")
+        self.floor.draw(self.scene, self.cam)
+        self.profiler.mark("floor")
+        self.vm.draw_ghosts(self.scene, self.cam)
+
+        for orb in self.orbs: orb.draw(self.scene, self.cam)
+
+        # DRAW SHADOWS FIRST (so they are under the bodies)
+        if self.show_shadows:
+            SHAPES.draw_shadows(self.scene, self.cam, render_list)
+
+        for entity in render_list:
+            entity.draw(self.scene, self.cam)
+
+        self.bullets.draw(self.scene, self.cam)
+        self.props.draw(self.scene, self.cam)
+
+        self.profiler.mark("entities")
+        self.vm.draw_top(self.scene, self.cam)
+        self.profiler.mark("effects")
+        self.draw_vignette()
+        self.present_scene()
+        self.profiler.mark("lighting")
+
+        if self.damage_alpha > 0:
+            flash_surf = SURFACES.acquire(SCREEN_W, SCREEN_H)
+            flash_surf.fill((255, 0, 0))
+            flash_surf.set_alpha(int(self.damage_alpha))
+            self.screen.blit(flash_surf, (0, 0))
+            self.damage_alpha = max(0, self.damage_alpha - 300 * dt)
+
+        # Floating text stays sharp: drawn on the window, not the scaled scene
+        self.vm.draw_texts(self.screen, self.render_scale)
+        self.draw_hud()
+        self.profiler.draw(self.screen, self.font_debug)
+        self.profiler.mark("hud")
+        if not self.headless: pygame.display.flip()
+
     def run(self):
         running = True
         while running:
             dt_ms = self.clock.tick(FPS)
             dt = dt_ms / 1000.0
-            mx, my = pygame.mouse.get_pos()
-
-            for event in pygame.event.get():
-                if event.type == QUIT:
-                    running = False
-                elif event.type == MOUSEWHEEL:
-                    if event.y > 0: self.cam.zoom_in()
-                    if event.y < 0: self.cam.zoom_out()
-                elif event.type == KEYDOWN:
-                    if event.key == K_ESCAPE: running = False
-                    if event.key == K_SPACE: self.cam.rotate_view()
-                    if event.key == K_RETURN and not self.wave_active: self.start_next_level()
-                    if event.key == K_r and self.game_over: self.reset_game()
-                    if event.key == K_q:
-                        if self.player.activate_ultimate():
-                            self.vm.add_text(SCREEN_W // 2, SCREEN_H // 2 - 200, "ULTIMATE ACTIVATED!", (0, 255, 255),
-                                             2.0, 30)
-                            self.cam.add_shake(20)
-
-                elif event.type == MOUSEBUTTONDOWN:
-                    if not self.intro_active and not self.game_over and event.button == 1:
-                        if not self.wave_active:
-                            for b in self.buttons: b.click(mx, my, self.player)
-                    elif not self.intro_active and event.button == 3:
-                        if self.player.grenade_count > 0:
-                            m_wx, m_wy = self.cam.screen_to_world(mx, my)
-                            self.grenades.append(Grenade(self.player.wx, self.player.wy, m_wx, m_wy))
-                            self.player.grenade_count -= 1
+            self.profiler.begin_frame()
+            SURFACES.begin_frame()
+
+            controls = Controls()
+            running = self.handle_events(controls)
 
             if self.game_over:
                 self.draw_game_over()
+                self.gc_policy.end_frame(0.0, self.governor.budget_ms)
                 continue
 
             if self.intro_active:
-                self.intro_vz += 2000.0 * dt
-                self.intro_z -= self.intro_vz * dt
-                # FIX 4: Reduce shake drastically (divide by 2000 instead of 500)
-                self.intro_cam_shake = int(self.intro_vz / 2000.0)
-
-                if self.intro_z < 6000:
-                    self.intro_text_x += (0 - self.intro_text_x) * 3.0 * dt
-                    self.intro_text_alpha = min(255, self.intro_text_alpha + 300 * dt)
-
-                if self.intro_z <= 0:
-                    self.intro_z = 0
-                    self.intro_active = False
-                    self.cam.add_shake(60)
-                    sx, sy = self.cam.world_to_screen(self.player.wx, self.player.wy)
-                    for _ in range(10): self.vm.add_crack(self.player.wx, self.player.wy, (200, 200, 200))
-                    self.vm.add_explosion(sx, sy, (255, 255, 255))
-                    self.vm.add_text(sx, sy - 100, "BEGIN!", (255, 50, 50), 2.0, 30)
-
+                for step in self.sim_clock.steps(dt):
+                    if self.intro_active: self.update_intro(step)
                 self.draw_intro()
                 pygame.display.flip()
+                self.gc_policy.end_frame(0.0, self.governor.budget_ms)
                 continue
 
-            keys = pygame.key.get_pressed()
-            if keys[K_LSHIFT]: self.player.attempt_dash()
-            input_x, input_y = 0, 0
-            if keys[K_w] or keys[K_UP]: input_y = -1
-            if keys[K_s] or keys[K_DOWN]: input_y = 1
-            if keys[K_a] or keys[K_LEFT]: input_x = -1
-            if keys[K_d] or keys[K_RIGHT]: input_x = 1
-
-            idx = self.cam.rotation_index % 4
-            vx, vy = 0, 0
-            if idx == 0:
-                vx, vy = input_x, input_y
-            elif idx == 1:
-                vx, vy = input_y, -input_x
-            elif idx == 2:
-                vx, vy = -input_x, -input_y
-            elif idx == 3:
-                vx, vy = -input_y, input_x
-
-            if vx != 0 or vy != 0:
-                l = math.hypot(vx, vy)
-                vx /= l
-                vy /= l
-                speed = self.player.stats["speed"]
-                if self.player.is_dashing: speed *= 3.0
-                self.player.vx = vx * speed
-                self.player.vy = vy * speed
-            else:
-                if not self.player.is_dashing: self.player.vx, self.player.vy = 0, 0
-
-            self.player.update(dt, self.enemies, self.bullets, self.map_grid, self.vm)
-
-            for orb in self.orbs:
-                orb.update(dt)
-                if distance(self.player.wx, self.player.wy, orb.wx, orb.wy) < 1.0:
-                    orb.lifetime = 0
-                    self.player.energy = min(self.player.max_energy, self.player.energy + 10)
-                    sx, sy = self.cam.world_to_screen(orb.wx, orb.wy)
-                    self.vm.add_particle(sx, sy, (0, 255, 255))
-            self.orbs = [o for o in self.orbs if o.lifetime > 0]
-
-            if pygame.mouse.get_pressed()[0]:
-                if self.wave_active or (my < SCREEN_H - 250):
-                    m_wx, m_wy = self.cam.screen_to_world(mx, my)
-                    new_bullets = self.player.shoot(m_wx, m_wy, self.vm)
-                    if new_bullets:
-                        self.bullets.extend(new_bullets)
-                        if not self.player.ultimate_active:
-                            self.vm.add_casing(self.player.wx, self.player.wy)
-
-            self.cam.set_target(self.player.wx, self.player.wy)
-            self.cam.update(dt)
-
-            if self.wave_active:
-                if self.enemies_spawned < self.enemies_to_spawn:
-                    self.spawn_timer -= dt
-                    if self.spawn_timer <= 0:
-                        self.spawn_enemy()
-                        self.spawn_timer = max(0.5, 2.0 - self.level * 0.1)
-                elif len(self.enemies) == 0:
-                    self.wave_active = False
-                    self.player.money += 50 * self.level
-
-            for b in self.bullets: b.update(dt)
-            self.bullets = [b for b in self.bullets if b.lifetime > 0]
-            for g in self.grenades:
-                g.update(dt, self.map_grid)
-                if g.exploded: self.handle_explosion(g.x, g.y, 80.0, 4.0)
-            self.grenades = [g for g in self.grenades if not g.exploded]
-
-            for e in self.enemies:
-                # PASS SELF.CAM HERE for earthquakes
-                e.update(dt, self.player, self.map_grid, self.bullets, self.cam)
-
-                if not self.player.is_dashing:
-                    if distance(self.player.wx, self.player.wy, e.wx, e.wy) < 0.8:
-                        self.player.health -= e.damage_to_player * dt
-                        self.damage_alpha = 150.0
-
-            if self.player.health <= 0:
-                self.game_over = True
-                sx, sy = self.cam.world_to_screen(self.player.wx, self.player.wy)
-                self.vm.add_explosion(sx, sy, (255, 0, 0))
-
-            for b in self.bullets:
-                if check_grid_collision(b.wx, b.wy, self.map_grid):
-
-                    b.lifetime = 0
-                    sx, sy = self.cam.world_to_screen(b.wx, b.wy)
-                    self.vm.add_particle(sx, sy, (200, 200, 200))
-
-                if b.owner_id != self.player.uid:
-                    if distance(self.player.wx, self.player.wy, b.wx, b.wy) < 0.6:
-                        self.player.health -= b.damage
-                        self.damage_alpha = 150.0  # Trigger red flash
-                        b.lifetime = 0  # Destroy bullet
-
-                        # Add blood effect
-                        sx, sy = self.cam.world_to_screen(self.player.wx, self.player.wy)
-                        self.vm.add_particle(sx, sy, (255, 0, 0))
-
-                for e in self.enemies:
-                    if e.uid == b.owner_id: continue
-                    if e.uid in b.hit_list: continue
-                    if distance(e.wx, e.wy, b.wx, b.wy) < 0.8:
-                        e.take_damage(b.damage)
-                        b.hit_list.append(e.uid)
-                        sx, sy = self.cam.world_to_screen(e.wx, e.wy)
-                        self.vm.add_particle(sx, sy, e.color)
-                        self.vm.add_text(sx, sy - 40, str(int(b.damage)), (255, 255, 255))
-                        e.apply_knockback(b.vx * 0.2, b.vy * 0.2)
-                        if b.pierce <= 0:
-                            b.lifetime = 0
-                            break
-                        else:
-                            b.pierce -= 1
-
-            survivors = []
-            for e in self.enemies:
-                if e.dead:
-                    self.player.money += e.money_value
-                    self.enemies_killed_in_wave += 1
-                    self.cam.add_shake(3.0)
-                    sx, sy = self.cam.world_to_screen(e.wx, e.wy)
-                    self.vm.add_text(sx, sy - 60, f"+${e.money_value}", COL_MONEY)
-                    for _ in range(8): self.vm.add_particle(sx, sy, e.color)
-
-                    if random.random() < 1:
-                        self.orbs.append(EnergyOrb(e.wx, e.wy))
-                else:
-                    survivors.append(e)
-            self.enemies = survivors
-
-            self.vm.update(dt)
-
-            self.screen.fill(COL_BG)
-            draw_floor_grid(self.screen, self.cam, MAP_W, MAP_H, self.level)
-            self.vm.draw_floor(self.screen, self.cam)
-            self.vm.draw_ghosts(self.screen, self.cam)
-
-            for orb in self.orbs: orb.draw(self.screen, self.cam)
-
-            render_list = []
-            render_list.append(self.player)
-            render_list.extend(self.enemies)
-            render_list.extend(self.walls)
-            render_list.sort(key=lambda x: self.cam.world_to_screen(x.wx, x.wy)[1])
-
-            # DRAW SHADOWS FIRST (so they are under the bodies)
-            for entity in render_list:
-                entity.draw_shadow(self.screen, self.cam)
-
-            for entity in render_list:
-                entity.draw(self.screen, self.cam)
-
-            for b in self.bullets: b.draw(self.screen, self.cam)
-            for g in self.grenades: g.draw(self.screen, self.cam)
-
-            self.vm.draw_top(self.screen, self.cam)
-            self.draw_vignette()
-
-            if self.damage_alpha > 0:
-                flash_surf = pygame.Surface((SCREEN_W, SCREEN_H))
-                flash_surf.fill((255, 0, 0))
-                flash_surf.set_alpha(int(self.damage_alpha))
-                self.screen.blit(flash_surf, (0, 0))
-                self.damage_alpha = max(0, self.damage_alpha - 300 * dt)
-
-            self.draw_hud()
-            pygame.display.flip()
+            steps = self.advance(dt, self.read_controls(controls))
+            self.profiler.mark("sim")
+            self.render(dt)
+            wait_ms = self.render_worker.end_frame()
+
+            self.profiler.count("sim steps", steps)
+            self.profiler.count("io queue", len(IO))
+            self.profiler.count("particles", len(self.vm.particles))
+            self.profiler.count("store rows", len(self.store))
+            self.profiler.count("bullets", self.bullets.count)
+            self.profiler.count("surf alloc", SURFACES.allocated)
+            self.profiler.count("surf reuse", SURFACES.reused)
+            frame_ms = self.profiler.end_frame()
+            gc_ms = self.gc_policy.end_frame(frame_ms, self.governor.budget_ms)
+            if frame_ms > 2 * self.governor.budget_ms:
+                METRICS.emit("spike", ms=round(frame_ms, 3), gc_ms=round(gc_ms, 3))
+            if self.governor.update(frame_ms, dt):
+                self.apply_quality()
+            self.profiler.set_status("quality", self.governor.describe())
+            self.profiler.set_status("gc", f"{self.gc_policy.mode}, {gc_ms:.2f} ms in frame")
+            self.profiler.set_status("time", self.sim_clock.describe())
+            self.profiler.set_status("io", IO.describe())
+            self.profiler.set_status("render worker", f"{'on' if self.render_worker.enabled else 'off'}, "
+                                                      f"waited {wait_ms:.2f} ms")
+        self.render_worker.close()
+        self.gc_policy.close()
+        CACHE.save_sprites(SHAPES)
+        IO.flush()
         pygame.quit()
 
 
 if __name__ == "__main__":
-    Game().run()
\ No newline at end of file
+    game = Game()
+    # python main.py --load <snapshot>  (e.g. one written by `save.py boss`)
+    if "--load" in sys.argv:
+        game.load_game(sys.argv[sys.argv.index("--load") + 1])
+    game.run()
\ No newline at end of file
@@ -0,0 +1,107 @@
+# memtrace.py
+import os
+import gc
+import tracemalloc
+from config import *
+from metrics import METRICS
+
+# ==========================================
+# PER-WAVE MEMORY TRACKING
+# ==========================================
+# Optional (MEMTRACE in config.py, or $SQUARE_UP_MEMTRACE=1, or
+# balance.py --memtrace). When on, tracemalloc runs for the whole session
+# and every wave is bracketed by two snapshots. At the end of a wave one
+# "mem_wave" event goes to the metrics stream with:
+#
+#   traced_kb / peak_kb    what tracemalloc currently holds / its high mark
+#   wave_kb / session_kb   growth since this wave started / since the first wave
+#   top                    the allocation sites that grew most over the wave
+#   objects / objects_delta  live instances per game class (Enemy subclasses,
+#                          FloatingText, Debris, WallBlock...) and their change
+#   containers             lengths of the VisualManager lists and pool sizes
+#
+# A leak shows up as session_kb climbing wave after wave with the same
+# sites in `top` and a class whose count never comes back down.
+#
+# tracemalloc slows allocation down noticeably, so leave this off for
+# performance measurements.
+
+GAME_MODULES = ("entities", "visuals", "bullets", "props", "ecs", "hud", "ui", "patterns", "floor", "minimap")
+TOP_SITES = 10
+
+
+def _enabled_by_default():
+    env = os.environ.get("SQUARE_UP_MEMTRACE")
+    return MEMTRACE if env is None else env not in ("", "0")
+
+
+def count_objects():
+    """Live instances per game class, {"OrbEnemy": 12, ...}.
+
+    gc.get_objects() skips frozen objects (gc_policy freezes each level), so
+    the frozen set is released for the count and frozen again afterwards.
+    """
+    frozen = gc.get_freeze_count()
+    if frozen: gc.unfreeze()
+    counts = {}
+    for o in gc.get_objects():
+        t = type(o)
+        if t.__module__ in GAME_MODULES:
+            counts[t.__name__] = counts.get(t.__name__, 0) + 1
+    if frozen: gc.freeze()
+    return counts
+
+
+def container_sizes(game):
+    """Lengths of the lists that hold per-wave garbage, plus the pooled stores."""
+    sizes = {f"vm.{k}": len(v) for k, v in vars(game.vm).items() if isinstance(v, list)}
+    sizes.update({"particles": len(game.vm.particles), "vm.props": len(game.vm.props), "props": len(game.props),
+                  "bullets": game.bullets.count, "store_rows": len(game.store), "handles": len(game.store.handles),
+                  "walls": len(game.walls), "enemies": len(game.enemies)})
+    return sizes
+
+
+class MemoryTracker:
+    def __init__(self, metrics=METRICS, enabled=None, top=TOP_SITES):
+        self.metrics = metrics
+        self.enabled = _enabled_by_default() if enabled is None else enabled
+        self.top = top
+        self.filters = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__),
+                        tracemalloc.Filter(False, "<frozen importlib._bootstrap>")]
+        self.first_kb = None
+        self.wave_level = None
+        self._start = None  # (snapshot, object counts) at wave start
+        if self.enabled and not tracemalloc.is_tracing(): tracemalloc.start()
+
+    def traced_kb(self):
+        return tracemalloc.get_traced_memory()[0] / 1024.0
+
+    def _snapshot(self):
+        return tracemalloc.take_snapshot().filter_traces(self.filters)
+
+    # --- GAME EVENTS ---
+    def wave_started(self, game):
+        if not self.enabled: return
+        if self.first_kb is None: self.first_kb = self.traced_kb()
+        self.wave_level = game.level
+        self._start = (self._snapshot(), count_objects())
+
+    def wave_ended(self, game):
+        """Compares against the wave-start snapshot and emits one mem_wave event."""
+        if not self.enabled or self._start is None: return None
+        snap0, objects0 = self._start
+        self._start = None
+        snap1, objects1 = self._snapshot(), count_objects()
+
+        stats = snap1.compare_to(snap0, "lineno")
+        top = [{"site": f"{os.path.basename(s.traceback[0].filename)}:{s.traceback[0].lineno}",
+                "kb": round(s.size_diff / 1024.0, 1), "count": s.count_diff}
+               for s in stats[:self.top] if s.size_diff > 0]
+        wave_kb = sum(s.size_diff for s in stats) / 1024.0
+        traced, peak = tracemalloc.get_traced_memory()
+        delta = {k: objects1.get(k, 0) - objects0.get(k, 0) for k in objects0.keys() | objects1.keys()}
+        return self.metrics.emit("mem_wave", level=self.wave_level, traced_kb=round(traced / 1024.0, 1),
+                                 peak_kb=round(peak / 1024.0, 1), wave_kb=round(wave_kb, 1),
+                                 session_kb=round(traced / 1024.0 - self.first_kb, 1), top=top,
+                                 objects=objects1, objects_delta={k: v for k, v in delta.items() if v},
+                                 containers=container_sizes(game))
@@ -0,0 +1,42 @@
+# metrics.py
+import os
+import json
+import time
+import collections
+from config import *
+from iowriter import IO, LOW
+
+# ==========================================
+# METRICS STREAM
+# ==========================================
+# Timestamped events (GC pauses, frame spikes, ...) for offline analysis.
+# The last `keep` events are always held in memory; when a path is set
+# (METRICS_FILE, or $SQUARE_UP_METRICS) every event is also appended to it
+# as one JSON object per line. The file writes go through the background
+# writer as low priority jobs (dropped, never waited for, if the disk falls
+# behind); a path ending in .gz is written gzip-compressed.
+
+
+class MetricsStream:
+    def __init__(self, path=None, keep=2000):
+        self.path = path
+        self.recent = collections.deque(maxlen=keep)
+        self.t0 = time.perf_counter()
+
+    def emit(self, kind, **fields):
+        rec = {"t": round(time.perf_counter() - self.t0, 4), "kind": kind}
+        rec.update(fields)
+        self.recent.append(rec)
+        if self.path:
+            IO.append(self.path, json.dumps(rec) + "\n", LOW)
+        return rec
+
+    def events(self, kind):
+        return [r for r in self.recent if r["kind"] == kind]
+
+    def close(self):
+        """Waits until every emitted event is on disk."""
+        IO.flush()
+
+
+METRICS = MetricsStream(os.environ.get("SQUARE_UP_METRICS") or METRICS_FILE)
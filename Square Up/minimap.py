@@ -0,0 +1,83 @@
+# minimap.py
+import math
+import numpy as np
+import pygame
+from config import *
+from map_gen import floor_colors, wall_colors
+
+# ==========================================
+# MINIMAP
+# ==========================================
+# The tile layout never changes during a level, so it is drawn once into
+# `base` when the level is built. `surface` is what is shown: it starts out
+# black and explored tiles are copied into it from `base` as the player
+# walks, only the tiles that were not explored yet, and only when the player
+# enters a new tile. Per frame the minimap is then one blit plus a dot for
+# every enemy / orb on explored ground and the player.
+
+MINIMAP_TILE = 4  # Pixels per tile
+REVEAL_RADIUS = 7.0  # Tiles around the player that count as explored
+COL_MINIMAP_FOG = (0, 0, 0)
+COL_MINIMAP_BORDER = (80, 80, 100)
+DOT_COLORS = {"enemy": (255, 60, 60), "boss": (220, 80, 255), "orb": COL_ENERGY, "player": (255, 255, 255)}
+
+
+class Minimap:
+    def __init__(self, grid, level):
+        self.h, self.w = len(grid), len(grid[0])
+        t = MINIMAP_TILE
+        col_floor, _ = floor_colors(level)
+        col_wall, _ = wall_colors(level)
+        self.base = pygame.Surface((self.w * t, self.h * t))
+        self.base.fill(col_floor)
+        for y, row in enumerate(grid):
+            for x, cell in enumerate(row):
+                if cell == 1: self.base.fill(col_wall, (x * t, y * t, t, t))
+
+        self.surface = pygame.Surface(self.base.get_size())
+        self.surface.fill(COL_MINIMAP_FOG)
+        self.explored = np.zeros((self.h, self.w), dtype=bool)
+
+        # Tile offsets inside the reveal circle, so reveal() is a lookup
+        r = int(math.ceil(REVEAL_RADIUS))
+        dy, dx = np.mgrid[-r:r + 1, -r:r + 1]
+        inside = dx * dx + dy * dy <= REVEAL_RADIUS * REVEAL_RADIUS
+        self.reveal_dx, self.reveal_dy = dx[inside], dy[inside]
+        self.last_tile = None
+
+    def reveal(self, wx, wy):
+        """Explores the tiles around (wx, wy). Returns how many tiles were new."""
+        tile = (int(wx), int(wy))
+        if tile == self.last_tile: return 0
+        self.last_tile = tile
+
+        xs, ys = tile[0] + self.reveal_dx, tile[1] + self.reveal_dy
+        on_map = (xs >= 0) & (xs < self.w) & (ys >= 0) & (ys < self.h)
+        xs, ys = xs[on_map], ys[on_map]
+        new = ~self.explored[ys, xs]
+        xs, ys = xs[new], ys[new]
+        self.explored[ys, xs] = True
+
+        t = MINIMAP_TILE
+        for x, y in zip(xs.tolist(), ys.tolist()):
+            self.surface.blit(self.base, (x * t, y * t), (x * t, y * t, t, t))
+        return len(xs)
+
+    def draw(self, surf, x, y, positions, kinds, player_pos):
+        """positions: (N, 2) world array, kinds: matching DOT_COLORS keys."""
+        surf.blit(self.surface, (x, y))
+        pygame.draw.rect(surf, COL_MINIMAP_BORDER, (x - 1, y - 1, self.surface.get_width() + 2,
+                                                    self.surface.get_height() + 2), 1)
+        t = MINIMAP_TILE
+        if len(positions):
+            tx = np.clip(positions[:, 0].astype(np.int32), 0, self.w - 1)
+            ty = np.clip(positions[:, 1].astype(np.int32), 0, self.h - 1)
+            # Nothing shows on ground the player has not seen
+            seen = self.explored[ty, tx]
+            px = (x + positions[:, 0] * t).astype(np.int32)[seen].tolist()
+            py = (y + positions[:, 1] * t).astype(np.int32)[seen].tolist()
+            for sx, sy, kind in zip(px, py, [k for k, s in zip(kinds, seen.tolist()) if s]):
+                size = 5 if kind == "boss" else 3
+                surf.fill(DOT_COLORS[kind], (sx - size // 2, sy - size // 2, size, size))
+        sx, sy = int(x + player_pos[0] * t), int(y + player_pos[1] * t)
+        surf.fill(DOT_COLORS["player"], (sx - 2, sy - 2, 4, 4))
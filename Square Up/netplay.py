@@ -0,0 +1,703 @@
+# netplay.py
+import os
+import time
+import zlib
+import types
+import select
+import socket
+import struct
+import argparse
+import collections
+import multiprocessing
+import numpy as np
+from config import *
+from controls import Controls
+from metrics import METRICS
+from save import ENEMY_KINDS, WEAPONS
+
+# ==========================================
+# LOOPBACK CLIENT / SERVER
+# ==========================================
+# Runs the simulation as an authoritative server process and the pygame
+# window as a thin client, so the two get a core each:
+#
+#   server   a headless Game stepped at a fixed TICK. After every tick it
+#            captures what the client needs to draw and sends it, delta
+#            compressed against the last snapshot the client acknowledged
+#   client   a normal Game that never calls update(). It sends its Controls
+#            (plus shop / restart commands) every frame, keeps the recent
+#            snapshots and renders INTERP_DELAY behind the newest one,
+#            interpolating positions between the two around that time
+#
+# Snapshot sections:
+#   game, player         tiny fixed records, always sent whole
+#   enemies, orbs        rows keyed by a net id; only new / changed rows and
+#                        the ids that disappeared are sent
+#   props, bullets       everything moves every tick, so these are sent whole
+#                        with quantised positions (bullets carry their
+#                        velocity, the client extrapolates them)
+# The body is zlib'd. Positions are int16 in 1/POS_Q tiles, so an enemy that
+# stands still really is byte-identical from tick to tick.
+#
+# Particles, floating texts and other effects the simulation spawns are not
+# sent; the client only shows the damage flash and its own local effects.
+#
+#   python netplay.py local            server process + window
+#   python netplay.py server | client  the two halves separately
+#   python netplay.py bench            headless loopback run with the bot,
+#                                      prints bandwidth and latency
+
+DEFAULT_PORT = 5151
+TICK = 1.0 / 60.0
+HISTORY = 128  # Snapshots kept on both sides as possible delta bases
+INTERP_DELAY = 0.05  # Seconds the client renders behind the newest snapshot
+POS_Q = 256.0  # Position quantum: 1/256 tile, int16 covers the whole map
+VEL_Q = 64.0
+
+# --- WIRE FORMAT ---
+# Every message is a u32 length prefix + payload; the first payload byte is the type
+FRAME = struct.Struct("<I")
+MSG_SNAPSHOT, MSG_INPUT, MSG_BYE = 1, 2, 3
+SNAP_HEADER = struct.Struct("<BIIdI")  # type, tick, base tick (0 = full), echoed client time, full size
+INPUT_MSG = struct.Struct("<BIdff???ff?ffbB")
+CMD_NEXT_LEVEL, CMD_RESTART = 1, 2
+
+GAME_NET = struct.Struct("<HqBBHHH")  # level, map seed, wave active, game over, to spawn, spawned, killed
+PLAYER_NET = struct.Struct("<hhfffffif?fHf?fBB")
+U16 = struct.Struct("<H")
+
+ENEMY_DT = np.dtype([("id", "<u4"), ("kind", "u1"), ("flags", "u1"), ("stage", "u1"), ("wx", "<i2"),
+                     ("wy", "<i2"), ("z", "<f4"), ("health", "<f4"), ("max_health", "<f4")])
+ORB_DT = np.dtype([("id", "<u4"), ("wx", "<i2"), ("wy", "<i2")])
+PROP_DT = np.dtype([("x", "<i2"), ("y", "<i2"), ("z", "<f4"), ("fuse", "<f4"), ("kind", "u1")])
+BULLET_DT = np.dtype([("wx", "<i2"), ("wy", "<i2"), ("vx", "<i2"), ("vy", "<i2"), ("radius", "u1"),
+                      ("color", "u1", (3,))])
+KEYED = (("enemies", ENEMY_DT), ("orbs", ORB_DT))
+WHOLE = (("props", PROP_DT), ("bullets", BULLET_DT))
+
+# Enemy flag bits
+F_FLASH = 1
+F_STATE = 2  # Block: jumping, Spike: dashing, Boss: telegraphing
+F_BLINK = 4  # Block: about to jump
+
+
+def _q(v, scale=POS_Q):
+    return np.clip(np.rint(np.asarray(v, dtype=np.float64) * scale), -32768, 32767).astype(np.int16)
+
+
+# ==========================================
+# SNAPSHOTS
+# ==========================================
+class NetIds:
+    """Small wire ids for live objects (uids are packed 64 bit handles)."""
+
+    def __init__(self):
+        self.ids = {}
+        self.next_id = 1
+
+    def get(self, key):
+        nid = self.ids.get(key)
+        if nid is None:
+            nid = self.ids[key] = self.next_id
+            self.next_id += 1
+        return nid
+
+    def keep_only(self, keys):
+        self.ids = {k: v for k, v in self.ids.items() if k in keys}
+
+
+def capture(game, net_ids):
+    """The render-relevant state of `game` as {section: bytes or record array}."""
+    from entities import BlockEnemy, SpikeEnemy, HexBoss
+    p = game.player
+    state = {
+        "game": GAME_NET.pack(game.level, game.map_seed, game.wave_active, game.game_over, game.enemies_to_spawn,
+                              game.enemies_spawned, game.enemies_killed_in_wave),
+        "player": PLAYER_NET.pack(*_q([p.wx, p.wy]).tolist(), p.vx, p.vy, p.health, p.stats["hp_max"], p.energy,
+                                  int(p.money), p.max_energy, p.ultimate_active, p.ultimate_timer, p.grenade_count,
+                                  p.dash_cooldown, p.is_dashing, p.anim_timer, WEAPONS.index(p.weapon_type),
+                                  len(p.drones))
+                  + np.array([d.angle_offset for d in p.drones], dtype="<f4").tobytes(),
+    }
+
+    enemies = np.zeros(len(game.enemies), dtype=ENEMY_DT)
+    for i, e in enumerate(game.enemies):
+        flags = F_FLASH if e.flash_timer > 0 else 0
+        if isinstance(e, BlockEnemy):
+            if e.is_jumping: flags |= F_STATE
+            if not e.is_jumping and e.jump_cooldown < 0.5 and int(e.jump_cooldown * 10) % 2 == 0: flags |= F_BLINK
+        elif isinstance(e, SpikeEnemy):
+            if e.dash_active: flags |= F_STATE
+        elif isinstance(e, HexBoss):
+            if e.pattern and e.pattern.telegraph and e.phase != "IDLE" and e.volley == 0: flags |= F_STATE
+        enemies[i] = (net_ids.get(e.uid), ENEMY_KINDS.index(type(e)), flags, getattr(e, "current_stage", 0),
+                      0, 0, e.z, e.health, e.max_health)
+    if len(game.enemies):
+        enemies["wx"] = _q([e.wx for e in game.enemies])
+        enemies["wy"] = _q([e.wy for e in game.enemies])
+
+    orbs = np.zeros(len(game.orbs), dtype=ORB_DT)
+    if len(game.orbs):
+        orbs["id"] = [net_ids.get(o.uid) for o in game.orbs]
+        orbs["wx"] = _q([o.wx for o in game.orbs])
+        orbs["wy"] = _q([o.wy for o in game.orbs])
+    net_ids.keep_only({e.uid for e in game.enemies} | {o.uid for o in game.orbs})
+
+    pr, m = game.props, game.props.count
+    props = np.zeros(m, dtype=PROP_DT)
+    props["x"], props["y"] = _q(pr.x[:m]), _q(pr.y[:m])
+    props["z"], props["fuse"], props["kind"] = pr.z[:m], pr.fuse[:m], pr.kind[:m]
+
+    pool, n = game.bullets, game.bullets.count
+    bullets = np.zeros(n, dtype=BULLET_DT)
+    bullets["wx"], bullets["wy"] = _q(pool.wx[:n]), _q(pool.wy[:n])
+    bullets["vx"], bullets["vy"] = _q(pool.vx[:n], VEL_Q), _q(pool.vy[:n], VEL_Q)
+    bullets["radius"] = np.clip(pool.radius[:n], 0, 255)
+    bullets["color"] = pool.color[:n]
+
+    # Keyed sections are sorted by id so deltas can be matched with searchsorted
+    state["enemies"] = np.sort(enemies, order="id")
+    state["orbs"] = np.sort(orbs, order="id")
+    state["props"] = props
+    state["bullets"] = bullets
+    return state
+
+
+def full_size(state):
+    return len(state["game"]) + len(state["player"]) + sum(state[k].nbytes + 2 for k, _ in KEYED + WHOLE)
+
+
+def _rows(arr):
+    return arr.view(np.dtype((np.void, arr.dtype.itemsize)))
+
+
+def _encode_keyed(cur, base):
+    if base is None or not len(base):
+        removed = np.zeros(0, dtype="<u4")
+        changed = cur
+    else:
+        removed = base["id"][~np.isin(base["id"], cur["id"])]
+        idx = np.minimum(np.searchsorted(base["id"], cur["id"]), len(base) - 1)
+        same = base["id"][idx] == cur["id"]
+        same[same] = _rows(cur)[same] == _rows(base)[idx[same]]
+        changed = cur[~same]
+    return (U16.pack(len(removed)) + removed.astype("<u4").tobytes()
+            + U16.pack(len(changed)) + changed.tobytes())
+
+
+def _decode_keyed(data, pos, base, dtype):
+    (n_removed,) = U16.unpack_from(data, pos)
+    pos += 2
+    removed = np.frombuffer(data, dtype="<u4", count=n_removed, offset=pos)
+    pos += 4 * n_removed
+    (n_changed,) = U16.unpack_from(data, pos)
+    pos += 2
+    changed = np.frombuffer(data, dtype=dtype, count=n_changed, offset=pos)
+    pos += dtype.itemsize * n_changed
+    if base is None:
+        return np.sort(changed, order="id"), pos
+    kept = base[~np.isin(base["id"], removed) & ~np.isin(base["id"], changed["id"])]
+    return np.sort(np.concatenate((kept, changed)), order="id"), pos
+
+
+def encode(state, base, tick, base_tick, echo):
+    """Snapshot message for `state`, as a delta against `base` (None = full)."""
+    body = [state["game"], U16.pack(len(state["player"])), state["player"]]
+    for name, _ in KEYED:
+        body.append(_encode_keyed(state[name], base[name] if base else None))
+    for name, _ in WHOLE:
+        body.append(U16.pack(len(state[name])) + state[name].tobytes())
+    header = SNAP_HEADER.pack(MSG_SNAPSHOT, tick, base_tick if base else 0, echo, full_size(state))
+    return header + zlib.compress(b"".join(body), 1)
+
+
+def decode(msg, bases):
+    """(tick, echo, full size, state) from a snapshot message; `bases` maps tick -> decoded state."""
+    _, tick, base_tick, echo, full = SNAP_HEADER.unpack_from(msg)
+    data = zlib.decompress(msg[SNAP_HEADER.size:])
+    base = bases[base_tick] if base_tick else None
+
+    state = {"game": data[:GAME_NET.size]}
+    pos = GAME_NET.size
+    (n,) = U16.unpack_from(data, pos)
+    state["player"] = data[pos + 2:pos + 2 + n]
+    pos += 2 + n
+    for name, dtype in KEYED:
+        state[name], pos = _decode_keyed(data, pos, base[name] if base else None, dtype)
+    for name, dtype in WHOLE:
+        (n,) = U16.unpack_from(data, pos)
+        state[name] = np.frombuffer(data, dtype=dtype, count=n, offset=pos + 2)
+        pos += 2 + dtype.itemsize * n
+    return tick, echo, full, state
+
+
+# ==========================================
+# TRANSPORT
+# ==========================================
+class Channel:
+    """Length-prefixed messages over a TCP socket. send() blocks, poll() never does."""
+
+    def __init__(self, sock):
+        self.sock = sock
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.buf = bytearray()
+        self.closed = False
+        self.bytes_sent = 0
+        self.bytes_received = 0
+
+    def send(self, payload):
+        try:
+            self.sock.sendall(FRAME.pack(len(payload)) + payload)
+        except OSError:
+            self.closed = True
+            return
+        self.bytes_sent += FRAME.size + len(payload)
+
+    def poll(self, timeout=0.0):
+        """All complete messages that have arrived."""
+        while not self.closed and select.select([self.sock], [], [], timeout)[0]:
+            timeout = 0.0
+            try:
+                chunk = self.sock.recv(1 << 16)
+            except OSError:
+                chunk = b""
+            if not chunk:
+                self.closed = True
+                break
+            self.buf += chunk
+            self.bytes_received += len(chunk)
+        out = []
+        while len(self.buf) >= FRAME.size:
+            (n,) = FRAME.unpack_from(self.buf)
+            if len(self.buf) < FRAME.size + n: break
+            out.append(bytes(self.buf[FRAME.size:FRAME.size + n]))
+            del self.buf[:FRAME.size + n]
+        return out
+
+    def close(self):
+        self.closed = True
+        self.sock.close()
+
+
+def pack_input(ack, controls, buy=-1, command=0):
+    g = controls.grenade_target
+    return INPUT_MSG.pack(MSG_INPUT, ack, time.perf_counter(), controls.move_x, controls.move_y, controls.dash,
+                          controls.fire, controls.ultimate, controls.aim_wx, controls.aim_wy, g is not None,
+                          g[0] if g else 0.0, g[1] if g else 0.0, buy, command)
+
+
+# ==========================================
+# SERVER
+# ==========================================
+def serve(port=DEFAULT_PORT, tick=TICK, start=None, host="127.0.0.1"):
+    """Runs one authoritative game for one client until it disconnects."""
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    os.environ["SDL_NO_SIGNAL_HANDLERS"] = "1"
+    from main import Game
+    game = Game(headless=True)
+    if start: game.load_game(start)
+    else: game.land()
+
+    listener = socket.create_server((host, port))
+    conn, _ = listener.accept()
+    listener.close()
+    chan = Channel(conn)
+
+    net_ids = NetIds()
+    history = collections.OrderedDict()  # tick -> state
+    controls = Controls()
+    ack, echo, buy, command = 0, 0.0, -1, 0
+    n = 0
+    next_t = time.perf_counter()
+    while not chan.closed:
+        for msg in chan.poll():
+            if msg[0] == MSG_BYE:
+                chan.closed = True
+                break
+            (_, ack, echo, controls.move_x, controls.move_y, controls.dash, controls.fire, ultimate,
+             controls.aim_wx, controls.aim_wy, has_nade, gx, gy, b, cmd) = INPUT_MSG.unpack(msg)
+            # One-shot inputs stick until the next tick has used them
+            controls.ultimate = controls.ultimate or ultimate
+            if has_nade: controls.grenade_target = (gx, gy)
+            if b >= 0: buy = b
+            command |= cmd
+        if chan.closed: break
+
+        if command & CMD_RESTART and game.game_over:
+            game.reset_game()
+            game.land()
+        if command & CMD_NEXT_LEVEL and not game.wave_active and not game.game_over:
+            game.start_next_level()
+        if 0 <= buy < len(game.buttons) and not game.wave_active:
+            game.buttons[buy].buy(game.player)
+        buy, command = -1, 0
+        if not game.game_over:
+            game.update(tick, controls)
+        controls.ultimate = False
+        controls.grenade_target = None
+
+        n += 1
+        state = capture(game, net_ids)
+        history[n] = state
+        if len(history) > HISTORY: history.popitem(last=False)
+        chan.send(encode(state, history.get(ack), n, ack, echo))
+
+        next_t += tick
+        delay = next_t - time.perf_counter()
+        if delay > 0: time.sleep(delay)
+        else: next_t = time.perf_counter()  # Fell behind: don't try to catch up in a burst
+    chan.close()
+
+
+# ==========================================
+# CLIENT
+# ==========================================
+class NetClient:
+    def __init__(self, game, chan):
+        self.game = game
+        self.chan = chan
+        self.states = collections.OrderedDict()  # tick -> decoded state (delta bases)
+        self.timeline = collections.deque(maxlen=16)  # (server time, state) for interpolation
+        self.latest_tick = 0
+        self.clock_offset = None  # local time - server time, smoothed
+        self.enemies = {}  # net id -> enemy object
+        self.orbs = {}
+        self.map_key = None
+        self.extrapolated = 0  # Frames rendered past the newest snapshot
+        # Per-second network stats
+        self.window_t0 = time.perf_counter()
+        self.window = {"snaps": 0, "bytes": 0, "full": 0, "rtt": []}
+        self.report = {}
+
+    # --- RECEIVE ---
+    def receive(self):
+        now = time.perf_counter()
+        for msg in self.chan.poll():
+            if msg[0] != MSG_SNAPSHOT: continue
+            tick, echo, full, state = decode(msg, self.states)
+            self.states[tick] = state
+            if len(self.states) > HISTORY: self.states.popitem(last=False)
+            self.latest_tick = tick
+            server_t = tick * TICK
+            self.timeline.append((server_t, state))
+            offset = now - server_t
+            # Take new lows immediately (less queueing), drift up slowly
+            if self.clock_offset is None or offset < self.clock_offset: self.clock_offset = offset
+            else: self.clock_offset += (offset - self.clock_offset) * 0.01
+
+            w = self.window
+            w["snaps"] += 1
+            w["bytes"] += FRAME.size + len(msg)
+            w["full"] += full
+            if echo: w["rtt"].append((now - echo) * 1000.0)
+
+    def send_input(self, controls, buy=-1, command=0):
+        self.chan.send(pack_input(self.latest_tick, controls, buy, command))
+
+    # --- APPLY ---
+    def apply(self):
+        """Poses the local game at (now - INTERP_DELAY) on the server clock."""
+        if not self.timeline: return
+        self.game.store.activate()
+        t = time.perf_counter() - self.clock_offset - INTERP_DELAY
+        a = b = self.timeline[-1]
+        for i in range(len(self.timeline) - 1, 0, -1):
+            if self.timeline[i - 1][0] <= t:
+                a, b = self.timeline[i - 1], self.timeline[i]
+                break
+        else:
+            a = b = self.timeline[0]
+        if t > self.timeline[-1][0]: self.extrapolated += 1
+        span = b[0] - a[0]
+        f = min(1.0, max(0.0, (t - a[0]) / span)) if span > 0 else 1.0
+        self._apply_game(b[1])
+        self._apply_player(a[1], b[1], f)
+        self._apply_enemies(a[1]["enemies"], b[1]["enemies"], f)
+        self._apply_orbs(a[1]["orbs"], b[1]["orbs"], f)
+        self._apply_props(b[1], t - b[0])
+
+    def _apply_game(self, s):
+        g = self.game
+        level, seed, wave, over, to_spawn, spawned, killed = GAME_NET.unpack(s["game"])
+        if (level, seed) != self.map_key:
+            self.map_key = (level, seed)
+            g.level, g.map_seed = level, seed
+            g.build_map()
+            g.floor.set_level(level)
+        g.wave_active, g.game_over = wave, over
+        g.enemies_to_spawn, g.enemies_spawned, g.enemies_killed_in_wave = to_spawn, spawned, killed
+
+    def _apply_player(self, a, b, f):
+        p = self.game.player
+        ra = PLAYER_NET.unpack_from(a["player"])
+        rb = PLAYER_NET.unpack_from(b["player"])
+        (qx, qy, p.vx, p.vy, health, hp_max, p.energy, p.money, p.max_energy, p.ultimate_active,
+         p.ultimate_timer, p.grenade_count, p.dash_cooldown, p.is_dashing, p.anim_timer, weapon, n_drones) = rb
+        p.wx = (ra[0] + (qx - ra[0]) * f) / POS_Q
+        p.wy = (ra[1] + (qy - ra[1]) * f) / POS_Q
+        if health < p.health: self.game.damage_alpha = 150.0
+        p.health = health
+        p.stats["hp_max"] = hp_max
+        p.weapon_type = WEAPONS[weapon]
+        while len(p.drones) < n_drones: p.add_drone()
+        del p.drones[n_drones:]
+        angles = np.frombuffer(b["player"], dtype="<f4", count=n_drones, offset=PLAYER_NET.size).tolist()
+        for d, angle in zip(p.drones, angles):
+            d.angle_offset = angle
+            d.wx = p.wx + np.cos(angle) * d.dist
+            d.wy = p.wy + np.sin(angle) * d.dist
+
+    @staticmethod
+    def _lerp_rows(a, b, f):
+        """b's rows with wx/wy interpolated from a where the id exists in both (world units)."""
+        wx, wy = b["wx"].astype(np.float64), b["wy"].astype(np.float64)
+        if len(a) and len(b):
+            idx = np.minimum(np.searchsorted(a["id"], b["id"]), len(a) - 1)
+            both = a["id"][idx] == b["id"]
+            wx[both] = a["wx"][idx[both]] + (wx[both] - a["wx"][idx[both]]) * f
+            wy[both] = a["wy"][idx[both]] + (wy[both] - a["wy"][idx[both]]) * f
+        return wx / POS_Q, wy / POS_Q
+
+    def _apply_enemies(self, a, b, f):
+        g = self.game
+        wx, wy = self._lerp_rows(a, b, f)
+        live = {}
+        for row, x, y in zip(b.tolist(), wx.tolist(), wy.tolist()):
+            nid, kind, flags, stage, _, _, z, health, max_health = row
+            e = self.enemies.get(nid)
+            if e is None: e = ENEMY_KINDS[kind](x, y, g.level, g.vm)
+            live[nid] = e
+            e.wx, e.wy, e.z, e.health, e.max_health = x, y, z, health, max_health
+            e.flash_timer = 1.0 if flags & F_FLASH else 0.0
+            state = bool(flags & F_STATE)
+            if hasattr(e, "is_jumping"):
+                e.is_jumping = state
+                e.jump_cooldown = 0.0 if flags & F_BLINK else 1.0
+            elif hasattr(e, "dash_active"):
+                e.dash_active = state
+            elif hasattr(e, "current_stage"):
+                e.current_stage = stage
+                e.pattern = types.SimpleNamespace(telegraph=True) if state else None
+                e.phase, e.volley = ("FIRE", 0) if state else ("IDLE", e.volley)
+        self.enemies = live
+        g.enemies = list(live.values())
+
+    def _apply_orbs(self, a, b, f):
+        from entities import EnergyOrb
+        wx, wy = self._lerp_rows(a, b, f)
+        live = {}
+        for nid, x, y in zip(b["id"].tolist(), wx.tolist(), wy.tolist()):
+            o = self.orbs.get(nid) or EnergyOrb(x, y)
+            o.wx, o.wy = x, y
+            live[nid] = o
+        self.orbs = live
+        self.game.orbs = list(live.values())
+
+    def _apply_props(self, s, ahead):
+        from props import K_COLOR
+        g = self.game
+        pr = s["props"]
+        props = g.props
+        props.clear()
+        sl = props._reserve(len(pr))
+        props.x[sl], props.y[sl] = pr["x"] / POS_Q, pr["y"] / POS_Q
+        props.z[sl], props.fuse[sl], props.kind[sl] = pr["z"], pr["fuse"], pr["kind"]
+        props.color[sl] = K_COLOR[pr["kind"]]
+
+        # Bullets are not keyed: extrapolate the newest snapshot along each velocity
+        bl = s["bullets"]
+        pool = g.bullets
+        pool.clear()
+        n = len(bl)
+        if not n: return
+        sl = pool._reserve(n)
+        pool.vx[sl], pool.vy[sl] = bl["vx"] / VEL_Q, bl["vy"] / VEL_Q
+        pool.wx[sl] = pool.px[sl] = bl["wx"] / POS_Q + pool.vx[sl] * ahead
+        pool.wy[sl] = pool.py[sl] = bl["wy"] / POS_Q + pool.vy[sl] * ahead
+        pool.owner[sl] = 0
+        pool.radius[sl] = bl["radius"]
+        pool.color[sl] = bl["color"]
+        pool.lifetime[sl] = 1.0
+
+    # --- STATS ---
+    def update_stats(self):
+        """Rolls the per-second window; returns the latest report."""
+        now = time.perf_counter()
+        span = now - self.window_t0
+        if span < 1.0: return self.report
+        w = self.window
+        rtt = sorted(w["rtt"])
+        self.report = {
+            "snaps_per_s": w["snaps"] / span,
+            "kb_per_s": w["bytes"] / span / 1024.0,
+            "bytes_per_snap": w["bytes"] / max(1, w["snaps"]),
+            "full_bytes_per_snap": w["full"] / max(1, w["snaps"]),
+            "rtt_ms_p50": rtt[len(rtt) // 2] if rtt else 0.0,
+            "rtt_ms_p95": rtt[int(len(rtt) * 0.95)] if rtt else 0.0,
+            "extrapolated": self.extrapolated,
+        }
+        METRICS.emit("net", **{k: round(v, 3) for k, v in self.report.items()})
+        self.window_t0 = now
+        self.window = {"snaps": 0, "bytes": 0, "full": 0, "rtt": []}
+        self.extrapolated = 0
+        return self.report
+
+    def describe(self):
+        r = self.report
+        if not r: return "waiting"
+        return (f"{r['kb_per_s']:.1f} KB/s, {r['bytes_per_snap']:.0f} B/snap "
+                f"(full {r['full_bytes_per_snap']:.0f}), rtt {r['rtt_ms_p50']:.1f} ms")
+
+    # --- WINDOWED LOOP ---
+    def handle_events(self, controls):
+        """The client's version of Game.handle_events: returns (running, buy index, command)."""
+        import pygame
+        from pygame.locals import QUIT, MOUSEWHEEL, KEYDOWN, MOUSEBUTTONDOWN, K_ESCAPE, K_F3, K_m, K_SPACE, \
+            K_RETURN, K_r, K_q
+        g = self.game
+        running, buy, command = True, -1, 0
+        mx, my = pygame.mouse.get_pos()
+        for event in pygame.event.get():
+            if event.type == QUIT:
+                running = False
+            elif event.type == MOUSEWHEEL:
+                if event.y > 0: g.cam.zoom_in()
+                if event.y < 0: g.cam.zoom_out()
+            elif event.type == KEYDOWN:
+                if event.key == K_ESCAPE: running = False
+                if event.key == K_F3: g.profiler.toggle()
+                if event.key == K_m: g.show_minimap = not g.show_minimap
+                if event.key == K_SPACE: g.cam.rotate_view()
+                if event.key == K_RETURN: command |= CMD_NEXT_LEVEL
+                if event.key == K_r: command |= CMD_RESTART
+                if event.key == K_q: controls.ultimate = True
+            elif event.type == MOUSEBUTTONDOWN:
+                if event.button == 1 and not g.wave_active:
+                    for i, b in enumerate(g.buttons):
+                        if b.rect.collidepoint(mx, my): buy = i
+                elif event.button == 3:
+                    controls.grenade_target = g.cam.screen_to_world(mx * g.render_scale, my * g.render_scale)
+        return running, buy, command
+
+    def frame(self, dt, controls, buy=-1, command=0):
+        """One client frame: send input, take in snapshots, pose and draw the game."""
+        g = self.game
+        self.send_input(controls, buy, command)
+        self.receive()
+        self.apply()
+        g.cam.set_target(g.player.wx, g.player.wy)
+        g.cam.update(dt)
+        for o in g.orbs: o.bob_offset += dt * 5
+        g.minimap.reveal(g.player.wx, g.player.wy)
+        g.vm.update(dt)
+        if g.game_over: g.draw_game_over()
+        else: g.render(dt)
+        g.profiler.set_status("net", self.describe())
+        self.update_stats()
+
+    def run(self):
+        from surfaces import SURFACES
+        g = self.game
+        running = True
+        while running and not self.chan.closed:
+            dt = g.clock.tick(FPS) / 1000.0
+            g.profiler.begin_frame()
+            SURFACES.begin_frame()
+            controls = Controls()
+            running, buy, command = self.handle_events(controls)
+            self.frame(dt, g.read_controls(controls), buy, command)
+            g.profiler.end_frame()
+        self.chan.send(bytes([MSG_BYE]))
+        self.chan.close()
+
+
+def connect(host="127.0.0.1", port=DEFAULT_PORT, timeout=20.0):
+    """Connects, retrying while the server is still starting up."""
+    t0 = time.perf_counter()
+    while True:
+        try:
+            return Channel(socket.create_connection((host, port)))
+        except OSError:
+            if time.perf_counter() - t0 > timeout: raise
+            time.sleep(0.1)
+
+
+def _client_game(headless=False):
+    from main import Game
+    game = Game(headless=headless)
+    game.autosave_path = None  # The server owns the game state
+    game.land()
+    return game
+
+
+def _start_server(port, start=None):
+    proc = multiprocessing.Process(target=serve, args=(port, TICK, start), daemon=True)
+    proc.start()
+    return proc
+
+
+# ==========================================
+# LOOPBACK BENCHMARK
+# ==========================================
+def bench(seconds=10.0, port=DEFAULT_PORT, start=None):
+    """Server process + headless client played by the bot; prints what crossed the socket."""
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    from bot import ScriptedBot
+    from surfaces import SURFACES
+    proc = _start_server(port, start)
+    client = NetClient(_client_game(headless=True), connect(port=port))
+    bot = ScriptedBot(0)
+    g = client.game
+    reports, frame_ms = [], []
+    t_end = time.perf_counter() + seconds
+    while time.perf_counter() < t_end and not client.chan.closed:
+        dt = g.clock.tick(FPS) / 1000.0
+        t0 = time.perf_counter()
+        SURFACES.begin_frame()
+        command = 0 if g.wave_active else CMD_NEXT_LEVEL
+        if g.game_over: command = CMD_RESTART
+        client.frame(dt, bot.act(g, dt), command=command)
+        frame_ms.append((time.perf_counter() - t0) * 1000.0)
+        if client.report and (not reports or client.report is not reports[-1]): reports.append(client.report)
+    client.chan.send(bytes([MSG_BYE]))
+    client.chan.close()
+    proc.join(5)
+
+    if not reports:
+        print("no complete report window")
+        return
+    avg = lambda k: sum(r[k] for r in reports) / len(reports)
+    frame_ms.sort()
+    print(f"{seconds:.0f}s loopback, tick {1 / TICK:.0f} Hz, {len(reports)} report windows")
+    print(f"  snapshots    {avg('snaps_per_s'):.1f}/s")
+    print(f"  bandwidth    {avg('kb_per_s'):.1f} KB/s (peak {max(r['kb_per_s'] for r in reports):.1f})")
+    print(f"  snapshot     {avg('bytes_per_snap'):.0f} B on the wire vs {avg('full_bytes_per_snap'):.0f} B raw full "
+          f"({avg('full_bytes_per_snap') / max(1.0, avg('bytes_per_snap')):.1f}x)")
+    print(f"  rtt          p50 {avg('rtt_ms_p50'):.2f} ms, p95 {avg('rtt_ms_p95'):.2f} ms")
+    print(f"  client frame p50 {frame_ms[len(frame_ms) // 2]:.2f} ms, "
+          f"{sum(r['extrapolated'] for r in reports)} frames past the newest snapshot")
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Square Up loopback client/server")
+    ap.add_argument("mode", choices=("local", "server", "client", "bench"))
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=DEFAULT_PORT)
+    ap.add_argument("--start", help="Server starts from this snapshot (see save.py)")
+    ap.add_argument("--seconds", type=float, default=10.0, help="bench length")
+    args = ap.parse_args(argv)
+
+    if args.mode == "server":
+        serve(args.port, TICK, args.start, args.host)
+    elif args.mode == "bench":
+        bench(args.seconds, args.port, args.start)
+    else:
+        proc = _start_server(args.port, args.start) if args.mode == "local" else None
+        NetClient(_client_game(), connect(args.host, args.port)).run()
+        if proc: proc.join(5)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+# occlusion.py
+import math
+import collections
+import numpy as np
+from config import *
+from utils import check_grid_collision
+
+# ==========================================
+# LIGHT OCCLUSION
+# ==========================================
+# Walls block light. Per level, the boundary between wall and floor tiles is
+# turned into a short list of merged edge segments (a straight run of
+# blocks is one segment, not one per tile). For a significant light the
+# visibility polygon around it is found by casting rays at every segment
+# end point (slightly left and right of it) plus a ring of rays for the
+# open, radius-limited part, and keeping the nearest hit of each ray.
+#
+# Hits are pushed BLEED tiles into the wall, so the face and footprint of
+# the blocking tile are lit while whatever is behind it stays dark.
+#
+# Polygons are cached by (light position, radius); the cache belongs to one
+# map and is rebuilt with it, so "the walls moved" means a new LightOccluder.
+
+BLEED = 1.0
+RING_RAYS = 48
+EDGE_EPS = 1e-4  # Angle offset of the rays either side of a segment end
+MAX_CACHED = 64
+COLLINEAR_EPS = 1e-6
+
+
+def wall_segments(grid):
+    """Merged wall edges as (segments (N, 4) x0 y0 x1 y1, normals (N, 2)).
+
+    The normal points out of the wall, towards the floor side. Outside the map
+    counts as wall, so open border tiles get an edge too.
+    """
+    h, w = len(grid), len(grid[0])
+    solid = np.ones((h + 2, w + 2), dtype=bool)
+    solid[1:-1, 1:-1] = np.array(grid) != 0
+
+    segs, normals = [], []
+
+    def add_runs(line, start, facing, make):
+        # `facing` is +1/-1 where an edge exists on this line (sign = normal), else 0
+        i = 0
+        while i < len(facing):
+            f = facing[i]
+            if f == 0:
+                i += 1
+                continue
+            j = i
+            while j < len(facing) and facing[j] == f: j += 1
+            seg, normal = make(line, start + i, start + j, f)
+            segs.append(seg)
+            normals.append(normal)
+            i = j
+
+    # Horizontal edges on y = j, between rows j - 1 (padded j) and j (padded j + 1)
+    for j in range(h + 1):
+        above, below = solid[j, 1:-1], solid[j + 1, 1:-1]
+        facing = np.where(above & ~below, 1, np.where(below & ~above, -1, 0))
+        add_runs(j, 0, facing.tolist(), lambda y, x0, x1, f: ((x0, y, x1, y), (0, f)))
+
+    # Vertical edges on x = i, between columns i - 1 and i
+    for i in range(w + 1):
+        left, right = solid[1:-1, i], solid[1:-1, i + 1]
+        facing = np.where(left & ~right, 1, np.where(right & ~left, -1, 0))
+        add_runs(i, 0, facing.tolist(), lambda x, y0, y1, f: ((x, y0, x, y1), (f, 0)))
+
+    return np.array(segs, dtype=np.float64).reshape(-1, 4), np.array(normals, dtype=np.float64).reshape(-1, 2)
+
+
+class LightOccluder:
+    """Visibility polygons for one map."""
+
+    def __init__(self, grid):
+        self.grid = grid
+        self.segments, self.normals = wall_segments(grid)
+        s, n = self.segments, self.normals
+        # Same edges split by direction as (fixed coord, run start, run end, normal sign):
+        # horizontal edges are fixed in y and run along x, vertical ones the other way round
+        horiz = n[:, 0] == 0
+        self.edges = (np.column_stack((s[horiz, 1], s[horiz, 0], s[horiz, 2], n[horiz, 1])),
+                      np.column_stack((s[~horiz, 0], s[~horiz, 1], s[~horiz, 3], n[~horiz, 0])))
+        self.cache = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def polygon(self, lx, ly, radius):
+        """World-space visibility polygon (K, 2) around the light, or None if nothing blocks it."""
+        key = (round(lx, 4), round(ly, 4), round(radius, 2))
+        if key in self.cache:
+            self.cache.move_to_end(key)
+            self.hits += 1
+            return self.cache[key]
+        self.misses += 1
+        poly = self._compute(lx, ly, radius)
+        self.cache[key] = poly
+        if len(self.cache) > MAX_CACHED: self.cache.popitem(last=False)
+        return poly
+
+    @staticmethod
+    def _nearby(edges, fix, run, radius):
+        """Edges that face the light and come within `radius` of it."""
+        front = (fix - edges[:, 0]) * edges[:, 3] > 0  # Back faces are never the nearest hit
+        closest = np.clip(run, edges[:, 1], edges[:, 2])
+        near = (edges[:, 0] - fix) ** 2 + (closest - run) ** 2 < radius * radius
+        return edges[front & near]
+
+    def _compute(self, lx, ly, radius):
+        if check_grid_collision(lx, ly, self.grid): return None  # Light inside a wall: leave it alone
+        horiz = self._nearby(self.edges[0], ly, lx, radius)
+        vert = self._nearby(self.edges[1], lx, ly, radius)
+        if not len(horiz) and not len(vert): return None
+
+        # --- RAYS ---
+        ends = np.concatenate((horiz[:, [1, 0]], horiz[:, [2, 0]], vert[:, [0, 1]], vert[:, [0, 2]]))
+        ends = ends[(ends[:, 0] - lx) ** 2 + (ends[:, 1] - ly) ** 2 < radius * radius]
+        ends_a = np.arctan2(ends[:, 1] - ly, ends[:, 0] - lx)
+        ring = np.linspace(-math.pi, math.pi, RING_RAYS, endpoint=False)
+        angles = np.sort(np.concatenate((ends_a - EDGE_EPS, ends_a + EDGE_EPS, ring)))
+        dx, dy = np.cos(angles), np.sin(angles)
+
+        # --- NEAREST HIT PER RAY ---
+        # Edges are axis aligned: solve for the ray parameter on the edge's line,
+        # then check the other coordinate falls inside the edge
+        t = np.full(len(angles), radius)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            for edges, d_fix, d_run, fix, run in ((horiz, dy, dx, ly, lx), (vert, dx, dy, lx, ly)):
+                if not len(edges): continue
+                tt = (edges[:, 0] - fix) / d_fix[:, None]
+                at = run + tt * d_run[:, None]
+                tt = np.where((tt > 0) & (at >= edges[:, 1]) & (at <= edges[:, 2]), tt, np.inf)
+                t = np.minimum(t, tt.min(axis=1) + BLEED)
+
+        poly = np.column_stack((lx + dx * t, ly + dy * t))
+        # Rays either side of a corner that land on the same edge give runs of
+        # collinear points; drop them, fill cost grows with the vertex count
+        prev, nxt = np.roll(poly, 1, axis=0), np.roll(poly, -1, axis=0)
+        cross = (poly[:, 0] - prev[:, 0]) * (nxt[:, 1] - poly[:, 1]) - (poly[:, 1] - prev[:, 1]) * (nxt[:, 0] - poly[:, 0])
+        return poly[np.abs(cross) > COLLINEAR_EPS]
@@ -0,0 +1,127 @@
+# patterns.py
+import math
+import random
+import numpy as np
+
+# ==========================================
+# BULLET PATTERN DEFINITIONS
+# ==========================================
+# Patterns are plain data. Every pattern fires `volleys` times, `interval`
+# seconds apart, after a `windup`, then the shooter rests for `recover`.
+#
+# kind:
+#   "ring"   - `count` bullets evenly around the full circle
+#   "spiral" - a ring that turns by `step` radians every volley
+#   "aimed"  - `count` bullets fanned over +/- `spread` around the target
+#   "wave"   - an aimed fan whose centre sweeps by +/- `sweep` over the volleys
+#
+# `jitter` adds a random angle offset per bullet (radians).
+# `telegraph` makes the shooter flash while winding up.
+
+PATTERNS = {
+    "RAPID": {"kind": "aimed", "count": 1, "spread": 0.0, "jitter": 0.2,
+              "windup": 0.1, "volleys": 10, "interval": 0.15, "recover": 3.0,
+              "speed": 7.0, "damage": 15, "radius": 8, "color": (255, 0, 255)},
+    "NOVA": {"kind": "ring", "count": 12, "telegraph": True,
+             "windup": 2.0, "volleys": 1, "interval": 0.0, "recover": 2.5,
+             "speed": 5.0, "damage": 20, "radius": 6, "color": (200, 100, 255)},
+    "SPREAD": {"kind": "aimed", "count": 5, "spread": 0.0, "jitter": 0.4,
+               "windup": 0.3, "volleys": 3, "interval": 0.4, "recover": 2.5,
+               "speed": 8.0, "damage": 15, "radius": 5, "color": (255, 50, 255)},
+    "SPIRAL": {"kind": "spiral", "count": 4, "step": 0.26,
+               "windup": 0.5, "volleys": 30, "interval": 0.08, "recover": 3.0,
+               "speed": 5.5, "damage": 12, "radius": 6, "color": (255, 120, 200)},
+    "WAVE": {"kind": "wave", "count": 7, "spread": 0.5, "sweep": 0.6,
+             "windup": 0.4, "volleys": 12, "interval": 0.12, "recover": 3.0,
+             "speed": 6.0, "damage": 12, "radius": 6, "color": (180, 80, 255)},
+}
+
+# Weighted pattern choice per boss stage (HP thirds).
+BOSS_STAGE_PATTERNS = {
+    1: [("RAPID", 0.6), ("NOVA", 0.4)],
+    2: [("RAPID", 0.4), ("NOVA", 0.3), ("SPREAD", 0.3)],
+    3: [("RAPID", 0.2), ("NOVA", 0.2), ("SPREAD", 0.2), ("SPIRAL", 0.2), ("WAVE", 0.2)],
+}
+
+
+# ==========================================
+# COMPILED PATTERN
+# ==========================================
+class BulletPattern:
+    """A pattern definition baked into per-volley cos/sin tables."""
+
+    def __init__(self, name, spec):
+        self.name = name
+        self.kind = spec["kind"]
+        self.windup = spec.get("windup", 0.0)
+        self.volleys = max(1, spec.get("volleys", 1))
+        self.interval = spec.get("interval", 0.0)
+        self.recover = spec.get("recover", 1.0)
+        self.telegraph = spec.get("telegraph", False)
+        self.jitter = spec.get("jitter", 0.0)
+        self.aimed = self.kind in ("aimed", "wave")
+
+        self.speed = spec["speed"]
+        self.damage = spec["damage"]
+        self.radius = spec.get("radius", 5)
+        self.color = spec["color"]
+        self.lifetime = spec.get("lifetime", 3.0)
+
+        # Angle table: one row per volley, one column per bullet.
+        # Aimed kinds store offsets relative to the aim direction.
+        count = spec.get("count", 1)
+        spread = spec.get("spread", 0.0)
+        if self.kind in ("ring", "spiral"):
+            base = np.arange(count) * (math.tau / count)
+        elif count > 1:
+            base = np.linspace(-spread, spread, count)
+        else:
+            base = np.zeros(1)
+
+        rows = []
+        for v in range(self.volleys):
+            if self.kind == "spiral":
+                rows.append(base + v * spec.get("step", 0.0))
+            elif self.kind == "wave":
+                phase = math.tau * v / self.volleys
+                rows.append(base + math.sin(phase) * spec.get("sweep", 0.0))
+            else:
+                rows.append(base)
+        angles = np.array(rows)
+        self.cos_table = np.cos(angles)
+        self.sin_table = np.sin(angles)
+
+    def fire(self, pool, wx, wy, aim_angle, volley, owner_id):
+        """Emits one volley into a BulletPool."""
+        row = volley % self.volleys
+        c = self.cos_table[row]
+        s = self.sin_table[row]
+
+        if self.jitter > 0:
+            offs = np.random.uniform(-self.jitter, self.jitter, len(c))
+            jc, js = np.cos(offs), np.sin(offs)
+            c, s = c * jc - s * js, s * jc + c * js
+
+        if self.aimed:
+            ac, as_ = math.cos(aim_angle), math.sin(aim_angle)
+            c, s = c * ac - s * as_, s * ac + c * as_
+
+        pool.emit(wx, wy, c, s, self.speed, self.damage, 0, self.color, owner_id, self.lifetime, self.radius)
+
+
+def compile_patterns(specs):
+    return {name: BulletPattern(name, spec) for name, spec in specs.items()}
+
+
+COMPILED_PATTERNS = compile_patterns(PATTERNS)
+
+
+def pick_pattern(stage):
+    """Weighted random pattern for a boss stage."""
+    table = BOSS_STAGE_PATTERNS.get(stage, BOSS_STAGE_PATTERNS[1])
+    r = random.random() * sum(w for _, w in table)
+    for name, weight in table:
+        r -= weight
+        if r <= 0:
+            return COMPILED_PATTERNS[name]
+    return COMPILED_PATTERNS[table[-1][0]]
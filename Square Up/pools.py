@@ -0,0 +1,57 @@
+# pools.py
+import numpy as np
+
+# ==========================================
+# PACKED ARRAY POOLS
+# ==========================================
+# Shared storage for the struct-of-arrays pools (BulletPool, ParticlePool,
+# PropPool): one numpy array per name in FIELDS, with the live rows always
+# packed into [0, count).
+#
+# A subclass creates each field as a zero-length array (that fixes its dtype
+# and any trailing shape, e.g. (0, 3) for colours) and then calls
+# PackedPool.__init__, which sizes them all to the starting capacity.
+# Growth doubles, so spawning n rows at a time costs amortised O(n).
+
+
+class PackedPool:
+    FIELDS = ()
+
+    def __init__(self, capacity=64):
+        self.count = 0
+        self.capacity = 0
+        self._grow(capacity)
+
+    def __len__(self):
+        return self.count
+
+    def _grow(self, needed):
+        new_cap = max(needed, self.capacity * 2, 64)
+        for name in self.FIELDS:
+            old = getattr(self, name)
+            arr = np.zeros((new_cap,) + old.shape[1:], dtype=old.dtype)
+            arr[:self.count] = old[:self.count]
+            setattr(self, name, arr)
+        self.capacity = new_cap
+
+    def _reserve(self, n):
+        """Returns the slice of n fresh slots at the end of the live range (contents are stale)."""
+        if self.count + n > self.capacity:
+            self._grow(self.count + n)
+        start = self.count
+        self.count += n
+        return slice(start, self.count)
+
+    def clear(self):
+        self.count = 0
+
+    def keep(self, alive):
+        """Packs the rows where alive[:count] is True to the front. Returns False if nothing was dropped."""
+        n = self.count
+        kept = int(np.count_nonzero(alive))
+        if kept == n: return False
+        for name in self.FIELDS:
+            arr = getattr(self, name)
+            arr[:kept] = arr[:n][alive]
+        self.count = kept
+        return True
@@ -0,0 +1,75 @@
+# profiler.py
+import time
+import collections
+from surfaces import SURFACES
+
+# ==========================================
+# FRAME PROFILER
+# ==========================================
+# Times the work done in a frame (not the clock.tick sleep), split into named
+# sections, and keeps rolling averages. Other systems can publish counters
+# and status lines so they show up in the F3 overlay.
+
+class FrameProfiler:
+    def __init__(self, window=120):
+        self.window = window
+        self.frame_times = collections.deque(maxlen=window)
+        self.sections = {}  # name -> deque of ms
+        self.counters = {}  # name -> value for the current frame
+        self.status = {}  # name -> text line (e.g. quality tier)
+        self.visible = False
+        self.last_frame_ms = 0.0
+        self._t0 = time.perf_counter()
+        self._last = self._t0
+
+    def begin_frame(self):
+        self._t0 = self._last = time.perf_counter()
+        self.counters = {}
+
+    def mark(self, name):
+        """Charges the time since the previous mark to section `name`."""
+        now = time.perf_counter()
+        if name not in self.sections:
+            self.sections[name] = collections.deque(maxlen=self.window)
+        self.sections[name].append((now - self._last) * 1000.0)
+        self._last = now
+
+    def end_frame(self):
+        """Returns this frame's work time in ms."""
+        self.last_frame_ms = (time.perf_counter() - self._t0) * 1000.0
+        self.frame_times.append(self.last_frame_ms)
+        return self.last_frame_ms
+
+    def count(self, name, amount=1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def set_status(self, name, text):
+        self.status[name] = text
+
+    def average(self, name=None):
+        samples = self.frame_times if name is None else self.sections.get(name, ())
+        return sum(samples) / len(samples) if samples else 0.0
+
+    def toggle(self):
+        self.visible = not self.visible
+
+    def draw(self, surf, font):
+        if not self.visible: return
+        lines = [f"frame {self.average():5.2f} ms  (last {self.last_frame_ms:5.2f})"]
+        for name in self.sections:
+            lines.append(f"  {name:<10} {self.average(name):5.2f} ms")
+        for name, value in self.counters.items():
+            lines.append(f"{name}: {value}")
+        for name, text in self.status.items():
+            lines.append(f"{name}: {text}")
+
+        line_h = font.get_linesize()
+        w = 320
+        h = line_h * len(lines) + 10
+        panel = SURFACES.acquire(w, h)
+        panel.set_alpha(190)
+        panel.fill((0, 0, 0))
+        x, y = surf.get_width() - w - 10, 10
+        surf.blit(panel, (x, y))
+        for i, text in enumerate(lines):
+            surf.blit(font.render(text, True, (200, 255, 200)), (x + 5, y + 5 + i * line_h))
@@ -0,0 +1,290 @@
+# props.py
+import sys
+import math
+import time
+import numpy as np
+import pygame
+from config import *
+from pools import PackedPool
+from utils import grid_array, grid_blocked
+
+# ==========================================
+# BALLISTIC PROPS
+# ==========================================
+# Everything that is thrown or flung and then bounces - grenades, cluster
+# bomblets, shrapnel, shell casings, debris chunks - lives in one PropPool
+# of parallel arrays, packed into [0, count) like BulletPool. A frame is one
+# vectorized step for all of them, whatever their kind: the per-kind
+# physics comes from a lookup table indexed by the kind column.
+#
+#   gravity      downward acceleration on z (tiles/s^2)
+#   xy           multiplier on the horizontal velocity
+#   wall         velocity kept (and reversed) when a wall is hit on one axis;
+#                None = not stopped by walls
+#   ground       vz kept (and reversed) on a ground bounce
+#   friction     vx / vy kept on a ground bounce
+#   min_v        after a bounce, vx / vy below this snap to 0
+#   settle       after a bounce, |vz| below this snaps to 0 and the prop
+#                rests (no more integration) until its fuse runs out
+#   fuse         (lo, hi) seconds before it expires, drawn per prop
+#   rest_fuse    the fuse only burns while resting (casings, chunks)
+#   blast        (damage, radius) explosion when the fuse runs out
+#   split        (kind, count, (speed lo, hi), (vz lo, hi)) children burst
+#                out when the fuse runs out
+#   contact      damage to the first enemy touched; the prop is used up
+#   stamp        leaves a floor decal where it expires
+#   style        how draw() renders it; lift = screen px per unit of z
+#
+# Kind order is the save/netplay kind index, so new kinds go at the end.
+
+PROP_KINDS = {
+    "grenade": {"gravity": GRAVITY * 2, "wall": 0.6, "ground": 0.5, "friction": 0.4, "min_v": 0.1,
+                "fuse": (2.0, 2.0), "blast": (80.0, 4.0), "style": "ball", "size": 6, "color": COL_GRENADE},
+    "cluster": {"gravity": GRAVITY * 2, "wall": 0.6, "ground": 0.5, "friction": 0.4, "min_v": 0.1,
+                "fuse": (1.4, 1.4), "blast": (30.0, 2.5), "split": ("bomblet", 12, (3.0, 6.0), (10.0, 16.0)),
+                "style": "ball", "size": 6, "color": (150, 110, 40)},
+    "bomblet": {"gravity": GRAVITY * 2, "wall": 0.6, "ground": 0.4, "friction": 0.5, "min_v": 0.1,
+                "fuse": (0.6, 1.1), "blast": (25.0, 1.8), "split": ("shrapnel", 16, (8.0, 12.0), (2.0, 6.0)),
+                "style": "ball", "size": 3, "color": (220, 150, 50)},
+    "frag": {"gravity": GRAVITY * 2, "wall": 0.6, "ground": 0.5, "friction": 0.4, "min_v": 0.1,
+             "fuse": (1.6, 1.6), "blast": (30.0, 2.0), "split": ("shrapnel", 160, (8.0, 16.0), (2.0, 10.0)),
+             "style": "ball", "size": 6, "color": (90, 90, 100)},
+    "shrapnel": {"gravity": GRAVITY * 2, "wall": 0.5, "ground": 0.3, "friction": 0.6, "min_v": 0.5,
+                 "fuse": (0.4, 0.8), "contact": 6.0, "style": "spark", "size": 2, "color": (255, 220, 150)},
+    "casing": {"gravity": 30.0, "xy": 2.0, "ground": 0.6, "friction": 0.8, "settle": 1.0, "fuse": (10.0, 10.0),
+               "rest_fuse": True, "style": "casing", "lift": 15, "color": (255, 200, 50)},
+    "chunk": {"gravity": 30.0, "ground": 0.4, "friction": 0.5, "settle": 1.0, "fuse": (0.05, 0.05),
+              "rest_fuse": True, "stamp": True, "style": "chunk", "size": 3, "color": (100, 100, 100)},
+}
+
+PROP_NAMES = tuple(PROP_KINDS)
+GRENADE_TYPES = ("grenade", "cluster", "frag")  # What the player can throw (saved as an index)
+CONTACT_RADIUS = 0.6  # Shrapnel hits an enemy whose centre is this close
+
+THROW_MAX = 6.0  # Longest throw in tiles
+THROW_SPEED = 8.0
+THROW_Z = 15.0
+
+
+def _column(key, default, dtype=np.float64):
+    return np.array([spec.get(key, default) for spec in PROP_KINDS.values()], dtype=dtype)
+
+
+K_GRAVITY = _column("gravity", 0.0)
+K_XY = _column("xy", 1.0)
+K_WALL = np.array([-1.0 if s.get("wall") is None else s["wall"] for s in PROP_KINDS.values()])  # -1 = no walls
+K_GROUND = _column("ground", 0.5)
+K_FRICTION = _column("friction", 1.0)
+K_MIN_V = _column("min_v", 0.0)
+K_SETTLE = _column("settle", 0.0)
+K_REST_FUSE = _column("rest_fuse", False, bool)
+K_CONTACT = _column("contact", 0.0)
+K_EVENT = np.array([("blast" in s or "split" in s or "stamp" in s) for s in PROP_KINDS.values()])
+K_COLOR = np.array([s["color"] for s in PROP_KINDS.values()], dtype=np.uint8)
+K_STYLE = [s["style"] for s in PROP_KINDS.values()]
+K_SIZE = [s.get("size", 3) for s in PROP_KINDS.values()]
+K_LIFT = [s.get("lift", TILE_H_BASE / 2) for s in PROP_KINDS.values()]
+SPLITS = [(i, PROP_NAMES.index(s["split"][0])) + s["split"][1:]
+          for i, s in enumerate(PROP_KINDS.values()) if "split" in s]
+
+
+def kind_id(name):
+    return PROP_NAMES.index(name)
+
+
+class PropPool(PackedPool):
+    FIELDS = ("x", "y", "z", "vx", "vy", "vz", "fuse", "kind", "bounces", "color")
+
+    def __init__(self, capacity=64, rng=np.random):
+        self.rng = rng  # np.random for gameplay props (part of the saved state), a private Generator for cosmetics
+        self.x = np.zeros(0)
+        self.y = np.zeros(0)
+        self.z = np.zeros(0)
+        self.vx = np.zeros(0)
+        self.vy = np.zeros(0)
+        self.vz = np.zeros(0)
+        self.fuse = np.zeros(0)
+        self.kind = np.zeros(0, dtype=np.uint8)
+        self.bounces = np.zeros(0, dtype=np.uint16)
+        self.color = np.zeros((0, 3), dtype=np.uint8)
+        super().__init__(capacity)
+
+    def _reserve(self, n):
+        s = super()._reserve(n)
+        self.bounces[s] = 0
+        return s
+
+    # --- SPAWNING ---
+    def spawn(self, kind, x, y, z, vx, vy, vz, color=None):
+        """n props of one kind; every argument may be a scalar or a length-n array."""
+        k = kind_id(kind)
+        n = max(np.size(a) for a in (x, y, z, vx, vy, vz))
+        s = self._reserve(n)
+        self.x[s], self.y[s], self.z[s] = x, y, z
+        self.vx[s], self.vy[s], self.vz[s] = vx, vy, vz
+        lo, hi = PROP_KINDS[kind]["fuse"]
+        self.fuse[s] = self.rng.uniform(lo, hi, n) if hi > lo else lo
+        self.kind[s] = k
+        self.color[s] = K_COLOR[k] if color is None else color
+        return s
+
+    def throw(self, kind, sx, sy, tx, ty):
+        """A hand-thrown grenade from (sx, sy) towards (tx, ty), landing at most THROW_MAX away."""
+        angle = math.atan2(ty - sy, tx - sx)
+        dist = min(math.hypot(tx - sx, ty - sy), THROW_MAX)
+        return self.spawn(kind, sx, sy, THROW_Z, math.cos(angle) * THROW_SPEED, math.sin(angle) * THROW_SPEED,
+                          20 + dist * 2.0)
+
+    def burst(self, kind, xs, ys, zs, n, speed, vz, color=None):
+        """n props of `kind` flung in random directions from each (x, y, z) origin."""
+        xs, ys, zs = np.repeat(xs, n), np.repeat(ys, n), np.repeat(zs, n)
+        m = len(xs)
+        if m == 0: return None
+        angle = self.rng.uniform(0.0, 2.0 * math.pi, m)
+        spd = self.rng.uniform(speed[0], speed[1], m)
+        return self.spawn(kind, xs, ys, zs, np.cos(angle) * spd, np.sin(angle) * spd,
+                          self.rng.uniform(vz[0], vz[1], m), color)
+
+    # --- SIMULATION ---
+    def update(self, dt, grid=None):
+        """Steps every prop, bursts split kinds and drops the expired ones.
+
+        Returns (kind, x, y, color) arrays for the expired props whose kind
+        has a blast, split or stamp - the caller applies those effects.
+        """
+        n = self.count
+        if n == 0: return _NO_EVENTS
+        k = self.kind[:n]
+        x, y, z = self.x[:n], self.y[:n], self.z[:n]
+        vx, vy, vz = self.vx[:n], self.vy[:n], self.vz[:n]
+        resting = (z == 0) & (vz == 0) & (K_SETTLE[k] > 0)
+        moving = ~resting
+
+        # Horizontal: X then Y, each axis bouncing off the tile grid on its own
+        step = np.where(moving, dt * K_XY[k], 0.0)
+        nx, ny = x + vx * step, y + vy * step
+        wall = K_WALL[k]
+        if grid is not None:
+            solid = grid_array(grid)
+            walled = moving & (wall >= 0)
+            hit = walled & grid_blocked(solid, nx, y)
+            vx[hit] *= -wall[hit]
+            x[~hit] = nx[~hit]
+            hit = walled & grid_blocked(solid, x, ny)
+            vy[hit] *= -wall[hit]
+            y[~hit] = ny[~hit]
+        else:
+            x[:], y[:] = nx, ny
+
+        # Vertical: integrate, then bounce off the ground
+        z += np.where(moving, vz * dt, 0.0)
+        vz -= np.where(moving, K_GRAVITY[k] * dt, 0.0)
+        ground = moving & (z < 0)
+        if ground.any():
+            z[ground] = 0.0
+            vz[ground] *= -K_GROUND[k][ground]
+            vx[ground] *= K_FRICTION[k][ground]
+            vy[ground] *= K_FRICTION[k][ground]
+            self.bounces[:n][ground] += 1
+            min_v = K_MIN_V[k]
+            vx[ground & (np.abs(vx) < min_v)] = 0.0
+            vy[ground & (np.abs(vy) < min_v)] = 0.0
+            vz[ground & (np.abs(vz) < K_SETTLE[k])] = 0.0
+
+        self.fuse[:n] -= np.where(resting | ~K_REST_FUSE[k], dt, 0.0)
+        done = self.fuse[:n] <= 0
+        if not done.any(): return _NO_EVENTS
+        ev = done & K_EVENT[k]
+        events = (k[ev], x[ev], y[ev], self.color[:n][ev])
+        parents = (k[done], x[done], y[done], z[done])
+        self.compact()
+        for parent, child, count, speed, vz_range in SPLITS:
+            sel = parents[0] == parent
+            if sel.any():
+                self.burst(PROP_NAMES[child], parents[1][sel], parents[2][sel], np.maximum(parents[3][sel], 0.2),
+                           count, speed, vz_range)
+        return events
+
+    def compact(self):
+        """Drops expired props, keeping the live ones packed at the front."""
+        self.keep(self.fuse[:self.count] > 0)
+
+    def contact_rows(self):
+        """Indices of live props that deal contact damage."""
+        n = self.count
+        return np.flatnonzero((K_CONTACT[self.kind[:n]] > 0) & (self.fuse[:n] > 0))
+
+    def contact_damage(self, rows):
+        return K_CONTACT[self.kind[rows]]
+
+    def kill(self, rows):
+        """Expires rows on the next update (only for contact kinds, which have no blast, split or stamp)."""
+        self.fuse[rows] = 0
+
+    # --- RENDERING ---
+    def draw(self, surf, cam):
+        n = self.count
+        if n == 0: return
+        sx, sy = cam.world_to_screen_array(self.x[:n], self.y[:n])
+        zoom = cam.zoom
+        circle, rect = pygame.draw.circle, pygame.draw.rect
+        rows = zip(sx.tolist(), sy.tolist(), self.z[:n].tolist(), self.kind[:n].tolist(), self.fuse[:n].tolist(),
+                   self.bounces[:n].tolist(), self.color[:n].tolist())
+        for x, y, z, k, fuse, bounces, col in rows:
+            style = K_STYLE[k]
+            top = y - z * K_LIFT[k] * zoom
+            size = K_SIZE[k] * zoom
+            if style == "spark":
+                circle(surf, col, (x, top), size)
+            elif style == "ball":
+                circle(surf, (0, 0, 0), (x, y), size - zoom)
+                blink = fuse < 0.5 and int(fuse * 20) % 2 == 0
+                circle(surf, (255, 255, 255) if blink else col, (x, top), size)
+            elif style == "casing":
+                if bounces % 2 == 0: col = (200, 150, 20)
+                w = 3 * zoom
+                rect(surf, (0, 0, 0), (x, y, w + 1, 2 * zoom))
+                rect(surf, col, (x, top, w, 5 * zoom))
+            else:
+                rect(surf, col, (x - size / 2, top - size / 2, size, size))
+
+
+_NO_EVENTS = (np.zeros(0, dtype=np.uint8), np.zeros(0), np.zeros(0), np.zeros((0, 3), dtype=np.uint8))
+
+
+# ==========================================
+# CLUSTER GRENADE BENCHMARK
+# ==========================================
+def bench(frames=600, every=40, kind="cluster"):
+    """Sim ms per frame while a `kind` grenade goes off every `every` frames in a crowd of enemies."""
+    import random
+    from main import Game
+    from controls import Controls
+
+    random.seed(1)
+    np.random.seed(1)
+    game = Game(headless=True)
+    game.land()
+    for _ in range(30): game.spawn_enemy()
+    times, peak = [], 0
+    for f in range(frames):
+        c = Controls()
+        if f % every == 0:
+            game.player.grenade_type = kind
+            game.player.grenade_count = 1
+            c.grenade_target = (game.player.wx + 4, game.player.wy)
+        game.player.health = game.player.stats["hp_max"]
+        t0 = time.perf_counter()
+        game.update(1.0 / FPS, c)
+        times.append((time.perf_counter() - t0) * 1000.0)
+        peak = max(peak, game.props.count)
+    times = sorted(times[30:])
+    print(f"{kind} every {every} frames: peak {peak} props, sim avg {sum(times) / len(times):.2f} ms "
+          f"p50 {times[len(times) // 2]:.2f}  p99 {times[int(len(times) * 0.99)]:.2f}  max {times[-1]:.2f}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "bench":
+        for k in GRENADE_TYPES: bench(kind=k)
+    else:
+        print("usage: python props.py bench")
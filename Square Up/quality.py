@@ -0,0 +1,87 @@
+# quality.py
+import collections
+
+# ==========================================
+# QUALITY TIERS
+# ==========================================
+# Ordered best -> worst. The governor only ever moves one step at a time.
+
+QUALITY_TIERS = [
+    {"name": "ULTRA", "light_scale": 1.0, "max_particles": 2000, "max_lights": 400, "max_casings": 400,
+     "max_ghosts": 200, "floor_lines": True, "text_effects": True, "shadows": True, "occlusion_ms": 4.0,
+     "colored_lights": True},
+    {"name": "HIGH", "light_scale": 1.0, "max_particles": 800, "max_lights": 150, "max_casings": 150,
+     "max_ghosts": 80, "floor_lines": True, "text_effects": True, "shadows": True, "occlusion_ms": 3.0,
+     "colored_lights": True},
+    {"name": "MEDIUM", "light_scale": 0.5, "max_particles": 400, "max_lights": 60, "max_casings": 60,
+     "max_ghosts": 40, "floor_lines": True, "text_effects": False, "shadows": True, "occlusion_ms": 2.0,
+     "colored_lights": True},
+    {"name": "LOW", "light_scale": 0.5, "max_particles": 200, "max_lights": 25, "max_casings": 25,
+     "max_ghosts": 20, "floor_lines": False, "text_effects": False, "shadows": False, "occlusion_ms": 0.0,
+     "colored_lights": False},
+    {"name": "POTATO", "light_scale": 0.25, "max_particles": 80, "max_lights": 8, "max_casings": 8,
+     "max_ghosts": 8, "floor_lines": False, "text_effects": False, "shadows": False, "occlusion_ms": 0.0,
+     "colored_lights": False},
+]
+
+
+# ==========================================
+# QUALITY GOVERNOR
+# ==========================================
+class QualityGovernor:
+    """Steps the quality tier to keep the rolling frame time inside the budget.
+
+    Hysteresis: we drop a tier as soon as the average is over budget (after a
+    short hold), but only climb back when there is clear headroom and the
+    frame time has been stable for a while. That keeps it from flip-flopping
+    around the threshold.
+    """
+
+    def __init__(self, budget_ms, tier=1, window=60):
+        self.budget_ms = budget_ms
+        self.tier = tier
+        self.samples = collections.deque(maxlen=window)
+        self.degrade_ratio = 1.0  # avg > budget -> step down
+        self.upgrade_ratio = 0.65  # avg < 65% of budget -> step up
+        self.degrade_hold = 1.0  # seconds since last change before stepping down
+        self.upgrade_hold = 4.0  # ... and before stepping back up
+        self.since_change = 0.0
+        self.enabled = True
+        self.reason = "start"
+        self.history = []  # (game time, old tier, new tier, reason)
+        self.clock = 0.0
+
+    @property
+    def settings(self):
+        return QUALITY_TIERS[self.tier]
+
+    def average(self):
+        return sum(self.samples) / len(self.samples) if self.samples else 0.0
+
+    def update(self, frame_ms, dt):
+        """Feeds one frame time. Returns True if the tier changed."""
+        self.clock += dt
+        self.since_change += dt
+        self.samples.append(frame_ms)
+        if not self.enabled or len(self.samples) < self.samples.maxlen:
+            return False
+
+        avg = self.average()
+        if avg > self.budget_ms * self.degrade_ratio and self.since_change >= self.degrade_hold:
+            if self.tier < len(QUALITY_TIERS) - 1:
+                return self._change(self.tier + 1, f"avg {avg:.1f}ms > budget {self.budget_ms:.1f}ms")
+        elif avg < self.budget_ms * self.upgrade_ratio and self.since_change >= self.upgrade_hold:
+            if self.tier > 0:
+                return self._change(self.tier - 1, f"avg {avg:.1f}ms < {self.upgrade_ratio:.0%} of budget")
+        return False
+
+    def _change(self, new_tier, reason):
+        self.history.append((self.clock, self.tier, new_tier, reason))
+        self.tier = new_tier
+        self.reason = reason
+        self.since_change = 0.0
+        self.samples.clear()  # Judge the new tier on its own frames
+        return True
+
+    def describe(self):
+        return f"{self.settings['name']} ({self.reason})"
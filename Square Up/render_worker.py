@@ -0,0 +1,129 @@
+# render_worker.py
+import os
+import sys
+import time
+import math
+from concurrent.futures import ThreadPoolExecutor, Future
+from config import *
+
+# ==========================================
+# RENDER WORKER
+# ==========================================
+# One background thread for the render passes that never touch the scene
+# surface:
+#
+#   floor   FloorLayer.refresh - the rotate + scale of the floor texture
+#           when the cached projection is stale (every frame of a camera
+#           rotation or zoom)
+#   fog     Game.build_fog - light map, white / occluded light blits and
+#           the stretch into fog_full, from a light snapshot taken on the
+#           main thread right after the simulation
+#
+# The main thread projects and sorts entities while the floor rebuilds,
+# draws entities, effects and shadows while the fog builds, and joins each
+# job just before it needs the result (the floor blit, the BLEND_MULT
+# composite). pygame drops the GIL inside blits, transforms and
+# smoothscale, and numpy inside the light map maths, so on a multi-core
+# machine the two really overlap.
+#
+# With RENDER_WORKER off (or a single core) jobs run inline at submit(),
+# so the render code has only one path.
+#
+# Off by default (RENDER_WORKER in config.py) until `python render_worker.py
+# bench`, which reports frame times with and without it, shows a gain on a
+# machine with 4 or more cores.
+
+
+class RenderWorker:
+    def __init__(self, enabled=True):
+        self.enabled = enabled and (os.cpu_count() or 1) > 1
+        self.pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="render") if self.enabled else None
+        self.jobs = {}  # name -> Future
+        self.wait_ms = 0.0  # Main thread time spent blocked in join() this frame
+
+    def submit(self, name, fn, *args):
+        if self.pool is not None:
+            self.jobs[name] = self.pool.submit(fn, *args)
+            return
+        fut = Future()
+        fut.set_result(fn(*args))
+        self.jobs[name] = fut
+
+    def join(self, name):
+        """Blocks until job `name` is done and returns its result (None if it was never submitted)."""
+        fut = self.jobs.pop(name, None)
+        if fut is None: return None
+        t0 = time.perf_counter()
+        result = fut.result()
+        self.wait_ms += (time.perf_counter() - t0) * 1000.0
+        return result
+
+    def join_all(self):
+        for name in list(self.jobs): self.join(name)
+
+    def end_frame(self):
+        """Returns this frame's wait time and resets it."""
+        self.join_all()
+        ms, self.wait_ms = self.wait_ms, 0.0
+        return ms
+
+    def close(self):
+        self.join_all()
+        if self.pool is not None: self.pool.shutdown()
+
+
+# ==========================================
+# SERIAL VS WORKER BENCHMARK
+# ==========================================
+def bench(frames=300, tier=0, bullets=400):
+    """ms per rendered frame with the worker off and on, in a busy fight with the camera turning."""
+    import random
+    import numpy as np
+    from main import Game
+    from controls import Controls
+    from surfaces import SURFACES
+
+    def run(enabled):
+        random.seed(1)
+        np.random.seed(1)
+        game = Game(headless=True)
+        game.governor.tier = tier
+        game.apply_quality()
+        game.set_render_worker(enabled)
+        game.land()
+        for _ in range(12): game.spawn_enemy()
+        times = []
+        for f in range(frames):
+            c = Controls()
+            c.fire = True
+            c.aim_wx, c.aim_wy = game.player.wx + math.cos(f * 0.05) * 5, game.player.wy + math.sin(f * 0.05) * 5
+            if game.bullets.count < bullets:
+                a = np.linspace(0, math.tau, 64, endpoint=False) + f
+                game.bullets.emit(game.player.wx, game.player.wy, np.cos(a), np.sin(a), 6.0, 0, 0, (255, 120, 40), 0)
+            if f % 60 == 0: game.cam.rotate_view()  # Keeps the floor cache rebuilding
+            if f % 20 == 0: game.vm.add_explosion(game.player.wx + 2, game.player.wy, (255, 150, 50))
+            game.player.health = game.player.stats["hp_max"]
+            SURFACES.begin_frame()  # As the frame loop does: last frame's pooled surfaces are reused
+            game.update(1.0 / FPS, c)
+            t0 = time.perf_counter()
+            game.render(1.0 / FPS)
+            game.render_worker.end_frame()
+            times.append((time.perf_counter() - t0) * 1000.0)
+        game.render_worker.close()
+        times = sorted(times[30:])
+        return sum(times) / len(times), times[len(times) // 2], times[int(len(times) * 0.95)], game.render_worker.enabled
+
+    print(f"{os.cpu_count()} cores, tier {tier}, {frames} frames, up to {bullets} bullets")
+    serial = run(False)
+    worker = run(True)
+    for name, (avg, p50, p95, _) in (("serial", serial), ("worker", worker)):
+        print(f"  {name:7s} avg {avg:6.2f} ms   p50 {p50:6.2f}   p95 {p95:6.2f}")
+    if not worker[3]: print("  (single core: the worker is disabled, both runs were serial)")
+    print(f"  speedup x{serial[0] / worker[0]:.2f}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "bench":
+        bench()
+    else:
+        print("usage: python render_worker.py bench")
@@ -0,0 +1,424 @@
+# save.py
+import sys
+import random
+import struct
+import numpy as np
+from config import *
+from entities import Player, EnergyOrb, OrbEnemy, BlockEnemy, SpikeEnemy, HexBoss
+from patterns import COMPILED_PATTERNS
+from weapons import WEAPON_NAMES
+from props import GRENADE_TYPES
+from iowriter import write_atomic
+from ecs import EntityStore
+
+# ==========================================
+# GAME SNAPSHOTS
+# ==========================================
+# Full game state as a compact versioned binary blob:
+#
+#   header   MAGIC, version, total length
+#   game     level, wave counters, map seed (the map itself is regenerated)
+#   camera   rotation / zoom
+#   player   fixed record + weapon + grenade type + stats + drones
+#   enemies  kind byte + fixed record + BFS route (tile count + tiles) per enemy
+#   bullets  count + one packed array per BulletPool field + pierce hits
+#   props    count + one packed array per PropPool field (grenades,
+#            bomblets, shrapnel), energy orbs
+#   rng      python `random` and numpy global generator states
+#
+# Everything is little-endian struct/array data, so a snapshot is a few KB
+# and takes well under a millisecond - cheap enough to autosave on every
+# wave transition. Visual-only state (particles, texts, decals) is not saved.
+#
+# Entity uids are handles issued per session and change on load, so bullet
+# owners and pierce hit lists are stored as enemy indices (-1 = player,
+# -2 = nobody).
+#
+# Bump SAVE_VERSION whenever a record layout below changes.
+
+MAGIC = b"SQUP"
+SAVE_VERSION = 3
+HEADER = struct.Struct("<4sHI")
+
+OWNER_PLAYER = -1
+OWNER_NONE = -2
+
+WEAPONS = WEAPON_NAMES  # Saved as an index: weapons.py only ever appends
+ENEMY_KINDS = (OrbEnemy, BlockEnemy, SpikeEnemy, HexBoss)
+PATTERN_NAMES = tuple(sorted(COMPILED_PATTERNS))
+STAT_KEYS = ("hp_max", "hp_regen", "speed", "damage", "fire_rate", "bullet_speed", "spread", "pierce",
+             "dash_duration", "dash_speed_mult")
+
+# --- RECORD LAYOUTS ---
+# (attribute, struct code). "2d" fields are (x, y) tuples.
+GAME_FIELDS = (("level", "H"), ("map_seed", "q"), ("wave_active", "?"), ("enemies_spawned", "H"),
+               ("enemies_killed_in_wave", "H"), ("enemies_to_spawn", "H"), ("spawn_timer", "d"))
+CAMERA_FIELDS = (("rotation_index", "B"), ("angle", "d"), ("target_angle", "d"), ("view_zoom", "d"),
+                 ("target_zoom", "d"))
+PLAYER_FIELDS = (("wx", "d"), ("wy", "d"), ("vx", "d"), ("vy", "d"), ("knockback_x", "d"), ("knockback_y", "d"),
+                 ("health", "d"), ("money", "i"), ("energy", "d"), ("ultimate_active", "?"),
+                 ("ultimate_timer", "d"), ("grenade_count", "H"), ("dash_cooldown", "d"), ("is_dashing", "?"),
+                 ("dash_timer", "d"), ("ghost_spawn_timer", "d"), ("last_shot", "d"), ("anim_timer", "d"))
+DRONE_FIELDS = (("angle_offset", "d"), ("last_shot", "d"))
+ENEMY_FIELDS = (("wx", "d"), ("wy", "d"), ("z", "d"), ("knockback_x", "d"), ("knockback_y", "d"),
+                ("health", "d"), ("max_health", "d"), ("speed", "d"), ("flash_timer", "d"), ("path_timer", "d"),
+                ("damage_to_player", "d"), ("money_value", "i"), ("level_scaling", "H"))
+ENEMY_EXTRA = {
+    OrbEnemy: (),
+    BlockEnemy: (("jump_cooldown", "d"), ("is_jumping", "?"), ("jump_timer", "d"), ("jump_start", "2d"),
+                 ("jump_target", "2d")),
+    SpikeEnemy: (("base_speed", "d"), ("move_timer", "d"), ("move_dir", "2d"), ("dash_active", "?"),
+                 ("dash_timer", "d"), ("ghost_timer", "d"), ("dash_cooldown", "d")),
+    HexBoss: (("shoot_timer", "d"), ("current_stage", "B"), ("volley", "H")),
+}
+BOSS_PATTERN = struct.Struct("<BB")  # pattern index + 1 (0 = none), idle flag
+ORB_FIELDS = (("wx", "d"), ("wy", "d"), ("lifetime", "d"), ("bob_offset", "d"))
+BULLET_FIELDS = (("wx", "<f8"), ("wy", "<f8"), ("px", "<f8"), ("py", "<f8"), ("vx", "<f8"), ("vy", "<f8"),
+                 ("damage", "<f8"), ("lifetime", "<f8"), ("radius", "<f8"), ("pierce", "<i2"), ("owner", "<i4"),
+                 ("color", "<u1"))
+PROP_FIELDS = (("x", "<f8"), ("y", "<f8"), ("z", "<f8"), ("vx", "<f8"), ("vy", "<f8"), ("vz", "<f8"),
+               ("fuse", "<f8"), ("kind", "<u1"), ("bounces", "<u2"), ("color", "<u1"))
+
+U8 = struct.Struct("<B")
+U16 = struct.Struct("<H")
+U32 = struct.Struct("<I")
+
+
+def _layout(fields):
+    return struct.Struct("<" + "".join(code for _, code in fields))
+
+
+GAME_REC = _layout(GAME_FIELDS)
+CAMERA_REC = _layout(CAMERA_FIELDS)
+PLAYER_REC = _layout(PLAYER_FIELDS)
+STATS_REC = struct.Struct("<%dd" % len(STAT_KEYS))
+DRONE_REC = _layout(DRONE_FIELDS)
+ENEMY_REC = {cls: _layout(ENEMY_FIELDS + extra) for cls, extra in ENEMY_EXTRA.items()}
+ORB_REC = _layout(ORB_FIELDS)
+
+
+def _values(obj, fields):
+    out = []
+    for name, code in fields:
+        v = getattr(obj, name)
+        if code == "2d": out.extend(v)
+        else: out.append(v)
+    return out
+
+
+def _assign(obj, fields, values):
+    i = 0
+    for name, code in fields:
+        if code == "2d":
+            setattr(obj, name, (values[i], values[i + 1]))
+            i += 2
+        else:
+            setattr(obj, name, values[i])
+            i += 1
+    return i
+
+
+class _Reader:
+    def __init__(self, data, offset):
+        self.data = data
+        self.pos = offset
+
+    def read(self, st):
+        vals = st.unpack_from(self.data, self.pos)
+        self.pos += st.size
+        return vals
+
+    def one(self, st):
+        return self.read(st)[0]
+
+    def array(self, dtype, count, shape=()):
+        dt = np.dtype(dtype)
+        n = count * int(np.prod(shape, dtype=int)) if shape else count
+        arr = np.frombuffer(self.data, dtype=dt, count=n, offset=self.pos).reshape((count,) + shape)
+        self.pos += n * dt.itemsize
+        return arr
+
+
+# ==========================================
+# SNAPSHOT
+# ==========================================
+def snapshot(game):
+    """Returns the game state as bytes."""
+    out = []
+    w = out.append
+    p = game.player
+
+    w(GAME_REC.pack(*_values(game, GAME_FIELDS)))
+    w(CAMERA_REC.pack(*_values(game.cam, CAMERA_FIELDS)))
+
+    vals = _values(p, PLAYER_FIELDS)
+    w(PLAYER_REC.pack(*vals))
+    w(U8.pack(WEAPONS.index(p.weapon_type)))
+    w(U8.pack(GRENADE_TYPES.index(p.grenade_type)))
+    w(STATS_REC.pack(*(p.stats[k] for k in STAT_KEYS)))
+    w(U16.pack(len(p.drones)))
+    for d in p.drones: w(DRONE_REC.pack(*_values(d, DRONE_FIELDS)))
+
+    index = {e.uid: i for i, e in enumerate(game.enemies)}
+    w(U16.pack(len(game.enemies)))
+    for e in game.enemies:
+        cls = type(e)
+        w(U8.pack(ENEMY_KINDS.index(cls)))
+        w(ENEMY_REC[cls].pack(*_values(e, ENEMY_FIELDS + ENEMY_EXTRA[cls])))
+        if cls is HexBoss:
+            pat = PATTERN_NAMES.index(e.pattern.name) + 1 if e.pattern else 0
+            w(BOSS_PATTERN.pack(pat, e.phase == "IDLE"))
+        w(U16.pack(len(e.path)))
+        w(np.array(e.path, dtype="<u2").tobytes())
+
+    pool = game.bullets
+    n = pool.count
+    w(U32.pack(n))
+    for name, dtype in BULLET_FIELDS:
+        arr = getattr(pool, name)[:n]
+        if name == "owner":
+            arr = np.array([OWNER_PLAYER if o == p.uid else index.get(o, OWNER_NONE) for o in arr.tolist()])
+        w(np.ascontiguousarray(arr, dtype=dtype).tobytes())
+    hits = [(i, index[u]) for i in range(n) for u in pool.hits(i) if u in index]
+    w(U32.pack(len(hits)))
+    w(np.array(hits, dtype="<u4").tobytes())
+
+    props = game.props
+    w(U32.pack(props.count))
+    for name, dtype in PROP_FIELDS:
+        w(np.ascontiguousarray(getattr(props, name)[:props.count], dtype=dtype).tobytes())
+    w(U16.pack(len(game.orbs)))
+    for o in game.orbs: w(ORB_REC.pack(*_values(o, ORB_FIELDS)))
+
+    version, mt, gauss = random.getstate()
+    w(struct.pack("<625I?d", *mt, gauss is not None, gauss or 0.0))
+    _, keys, pos, has_gauss, cached = np.random.get_state()
+    w(np.asarray(keys, dtype="<u4").tobytes())
+    w(struct.pack("<i?d", pos, has_gauss, cached))
+
+    body = b"".join(out)
+    return HEADER.pack(MAGIC, SAVE_VERSION, HEADER.size + len(body)) + body
+
+
+# ==========================================
+# RESTORE
+# ==========================================
+def read_header(data):
+    if len(data) < HEADER.size:
+        raise ValueError("not a Square Up save (too short)")
+    magic, version, length = HEADER.unpack_from(data, 0)
+    if magic != MAGIC:
+        raise ValueError("not a Square Up save (bad magic)")
+    if version != SAVE_VERSION:
+        raise ValueError(f"save version {version} is not supported (expected {SAVE_VERSION})")
+    if length != len(data):
+        raise ValueError(f"save is truncated ({len(data)} of {length} bytes)")
+    return version
+
+
+def restore(game, data):
+    """Replaces the state of `game` with a snapshot. The game resumes mid-wave, no intro."""
+    read_header(data)
+    r = _Reader(data, HEADER.size)
+
+    _assign(game, GAME_FIELDS, r.read(GAME_REC))
+    cam_vals = r.read(CAMERA_REC)
+    game.store = EntityStore().activate()  # Everything is rebuilt below; the old rows go with the old store
+    game.build_map()
+    game.floor.set_level(game.level)
+
+    p = Player()
+    _assign(p, PLAYER_FIELDS, r.read(PLAYER_REC))
+    p.weapon_type = WEAPONS[r.one(U8)]
+    p.grenade_type = GRENADE_TYPES[r.one(U8)]
+    p.stats.update(zip(STAT_KEYS, r.read(STATS_REC)))
+    p.stats["pierce"] = int(p.stats["pierce"])
+    for _ in range(r.one(U16)): p.add_drone()
+    for d in p.drones: _assign(d, DRONE_FIELDS, r.read(DRONE_REC))
+    game.player = p
+
+    _assign(game.cam, CAMERA_FIELDS, cam_vals)
+    game.cam.set_target(p.wx, p.wy)
+    game.cam.focus_wx, game.cam.focus_wy = p.wx, p.wy
+    game.cam.zoom = game.cam.view_zoom * game.cam.render_scale
+
+    enemies = []
+    for _ in range(r.one(U16)):
+        cls = ENEMY_KINDS[r.one(U8)]
+        vals = r.read(ENEMY_REC[cls])
+        e = cls(vals[0], vals[1], vals[12], game.vm)
+        _assign(e, ENEMY_FIELDS + ENEMY_EXTRA[cls], vals)
+        if cls is HexBoss:
+            pat, idle = r.read(BOSS_PATTERN)
+            e.pattern = COMPILED_PATTERNS[PATTERN_NAMES[pat - 1]] if pat else None
+            e.phase = "IDLE" if idle or not e.pattern else e.pattern.name
+        e.path = [tuple(t) for t in r.array("<u2", r.one(U16), (2,)).tolist()]
+        enemies.append(e)
+    game.enemies = enemies
+
+    pool = game.bullets
+    pool.clear()
+    n = r.one(U32)
+    s = pool._reserve(n)
+    for name, dtype in BULLET_FIELDS:
+        arr = r.array(dtype, n, (3,) if name == "color" else ())
+        if name == "owner":
+            arr = np.array([p.uid if o == OWNER_PLAYER else (enemies[o].uid if o >= 0 else 0)
+                            for o in arr.tolist()], dtype=np.int64)
+        getattr(pool, name)[s] = arr
+    for i, j in r.array("<u4", r.one(U32), (2,)).tolist():
+        pool.add_hit(i, enemies[j].uid)
+
+    props = game.props
+    props.clear()
+    n = r.one(U32)
+    s = props._reserve(n)
+    for name, dtype in PROP_FIELDS:
+        getattr(props, name)[s] = r.array(dtype, n, (3,) if name == "color" else ())
+    game.orbs = []
+    for _ in range(r.one(U16)):
+        vals = r.read(ORB_REC)
+        o = EnergyOrb(vals[0], vals[1])
+        _assign(o, ORB_FIELDS, vals)
+        game.orbs.append(o)
+
+    # RNG last: building the objects above may have drawn from it
+    mt_gauss = r.read(struct.Struct("<625I?d"))
+    random.setstate((3, tuple(mt_gauss[:625]), mt_gauss[626] if mt_gauss[625] else None))
+    keys = r.array("<u4", 624).copy()
+    pos, has_gauss, cached = r.read(struct.Struct("<i?d"))
+    np.random.set_state(("MT19937", keys, pos, int(has_gauss), cached))
+
+    game.vm.clear()
+    game.game_over = False
+    game.intro_active = False
+    game.damage_alpha = 0.0
+
+
+# ==========================================
+# FILES
+# ==========================================
+def save_file(game, path):
+    """Writes a snapshot through iowriter.write_atomic, so a crash never leaves half a save."""
+    data = snapshot(game)
+    write_atomic(path, data)
+    return len(data)
+
+
+def load_file(game, path):
+    with open(path, "rb") as f:
+        restore(game, f.read())
+
+
+def describe(data):
+    """One-line summary of a snapshot, for bug reports."""
+    read_header(data)
+    r = _Reader(data, HEADER.size)
+    g = dict(zip((n for n, _ in GAME_FIELDS), r.read(GAME_REC)))
+    r.read(CAMERA_REC)
+    pl = dict(zip((n for n, _ in PLAYER_FIELDS), r.read(PLAYER_REC)))
+    weapon = WEAPONS[r.one(U8)]
+    r.one(U8)  # Grenade type
+    r.read(STATS_REC)
+    drones = r.one(U16)
+    r.pos += drones * DRONE_REC.size
+    kinds = []
+    for _ in range(r.one(U16)):
+        cls = ENEMY_KINDS[r.one(U8)]
+        r.read(ENEMY_REC[cls])
+        if cls is HexBoss: r.read(BOSS_PATTERN)
+        r.pos += r.one(U16) * 4  # Route: two u16 per tile
+        kinds.append(cls.__name__)
+    bullets = r.one(U32)
+    return (f"v{SAVE_VERSION} {len(data)} bytes | level {g['level']} (seed {g['map_seed']}) "
+            f"wave {'active' if g['wave_active'] else 'cleared'} {g['enemies_spawned']}/{g['enemies_to_spawn']} | "
+            f"player hp {pl['health']:.0f} ${pl['money']} {weapon} drones {drones} | "
+            f"enemies {len(kinds)} ({', '.join(sorted(set(kinds)))}) | bullets {bullets}")
+
+
+def make_boss_fight(level=5, weapon="shotgun", upgrades=0):
+    """Headless game parked at the start of a boss wave (level must be a multiple of 5)."""
+    from main import Game
+    if level % 5 != 0:
+        raise ValueError("bosses only appear on levels that are a multiple of 5")
+    game = Game(headless=True)
+    game.land()
+    game.vm.clear()
+    game.level = level - 1
+    game.start_next_level()
+    p = game.player
+    p.weapon_type = weapon
+    for _ in range(upgrades):
+        p.stats["damage"] *= 1.2
+        p.stats["fire_rate"] += 0.5
+    game.enemies_spawned = game.enemies_to_spawn - 1
+    game.spawn_enemy()
+    return game
+
+
+def _fingerprint(game):
+    """Everything the simulation steps, as plain values (uids excluded: they are per session)."""
+    p = game.player
+    n = game.bullets.count
+    return (p.wx, p.wy, p.health, p.money, p.energy, game.enemies_killed_in_wave,
+            [(type(e).__name__, e.wx, e.wy, e.z, e.health) for e in game.enemies],
+            game.bullets.wx[:n].tolist(), game.bullets.wy[:n].tolist(), game.props.x[:game.props.count].tolist())
+
+
+def check_replay(seed=4, warmup=1500, frames=300, dt=1.0 / 30):
+    """Snapshots a bot-played game mid-fight, then checks that a fresh Game restored from the snapshot and fed the
+    same inputs matches the original tick for tick. Returns the first diverging tick (0 = the restored game does not
+    snapshot back to the same bytes), or None."""
+    from main import Game
+    from bot import ScriptedBot
+    random.seed(seed)
+    np.random.seed(seed)
+    game = Game(headless=True)
+    game.land()
+    bot = ScriptedBot(seed)
+    # Play the warmup, then on until some enemy is mid-route (routes are the easiest state to lose)
+    tick = 0
+    while tick < warmup or not any(e.path for e in game.enemies):
+        if not game.wave_active:
+            bot.shop(game)
+            game.start_next_level()
+        game.update(dt, bot.act(game, dt))
+        tick += 1
+        if game.game_over or tick > warmup * 2: raise RuntimeError("no mid-route snapshot; try another seed")
+    data = snapshot(game)
+
+    inputs, original = [], []
+    for _ in range(frames):
+        c = bot.act(game, dt)
+        inputs.append(c)
+        game.update(dt, c)
+        original.append(_fingerprint(game))
+
+    restored = Game(headless=True)
+    restore(restored, data)
+    if snapshot(restored) != data: return 0
+    for tick, c in enumerate(inputs, 1):
+        restored.update(dt, c)
+        if _fingerprint(restored) != original[tick - 1]: return tick
+    return None
+
+
+if __name__ == "__main__":
+    # python save.py info <file>
+    # python save.py boss <out> [level] [weapon] [upgrades]
+    # python save.py check [seed]     restore + same inputs must replay the original run exactly
+    if len(sys.argv) >= 3 and sys.argv[1] == "info":
+        with open(sys.argv[2], "rb") as f:
+            print(describe(f.read()))
+    elif len(sys.argv) >= 3 and sys.argv[1] == "boss":
+        args = sys.argv[3:]
+        g = make_boss_fight(int(args[0]) if args else 5, args[1] if len(args) > 1 else "shotgun",
+                            int(args[2]) if len(args) > 2 else 0)
+        size = save_file(g, sys.argv[2])
+        print(f"wrote {sys.argv[2]} ({size} bytes)")
+    elif len(sys.argv) >= 2 and sys.argv[1] == "check":
+        bad = check_replay(*(int(a) for a in sys.argv[2:3]))
+        print("replay matches" if bad is None else f"replay diverges at tick {bad}")
+        sys.exit(bad is not None)
+    else:
+        print("usage: save.py info <file> | save.py boss <out> [level] [weapon] [upgrades] | save.py check [seed]")
@@ -0,0 +1,71 @@
+# spatial.py
+import numpy as np
+
+# ==========================================
+# UNIFORM GRID INDEX
+# ==========================================
+# Point lookup for "who is near here" questions (explosions, shrapnel).
+# Points are bucketed into square cells of CELL tiles; the cell keys are
+# sorted once, so every query is a few searchsorted calls instead of a
+# scan over every point. Build one per frame from the current positions -
+# it is a single argsort, cheaper than any incremental bookkeeping at the
+# enemy counts this game has.
+
+CELL = 2.0  # Tiles per cell; pairs() needs its radius <= CELL
+KEY_W = 1 << 20  # Key stride between cell columns
+NEIGHBOURS_X = np.repeat([-1.0, 0.0, 1.0], 3)
+NEIGHBOURS_Y = np.tile([-1.0, 0.0, 1.0], 3)
+
+
+class SpatialIndex:
+    def __init__(self, xs, ys, cell=CELL):
+        self.cell = cell
+        self.xs = np.asarray(xs, dtype=np.float64)
+        self.ys = np.asarray(ys, dtype=np.float64)
+        keys = self._keys(np.floor(self.xs / cell), np.floor(self.ys / cell))
+        self.order = np.argsort(keys, kind="stable")
+        self.keys = keys[self.order]
+
+    def __len__(self):
+        return len(self.xs)
+
+    @staticmethod
+    def _keys(cx, cy):
+        return (cx.astype(np.int64) + KEY_W // 2) * KEY_W + cy.astype(np.int64)
+
+    def _gather(self, keys):
+        """(owner, point) index pairs for every point in each of `keys` cells."""
+        lo = np.searchsorted(self.keys, keys, "left")
+        counts = np.searchsorted(self.keys, keys, "right") - lo
+        total = int(counts.sum())
+        owner = np.repeat(np.arange(len(keys)), counts)
+        offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+        return owner, self.order[np.repeat(lo, counts) + offsets]
+
+    # --- QUERIES ---
+    def query(self, x, y, r):
+        """Indices (ascending) of the points strictly within r of (x, y)."""
+        if not len(self.xs): return np.zeros(0, dtype=np.int64)
+        c = self.cell
+        cxs = np.arange(np.floor((x - r) / c), np.floor((x + r) / c) + 1)
+        cys = np.arange(np.floor((y - r) / c), np.floor((y + r) / c) + 1)
+        _, idx = self._gather(self._keys(np.repeat(cxs, len(cys)), np.tile(cys, len(cxs))))
+        d2 = (self.xs[idx] - x) ** 2 + (self.ys[idx] - y) ** 2
+        return np.sort(idx[d2 < r * r])
+
+    def pairs(self, px, py, r):
+        """Every (probe, point) index pair closer than r, for arrays of probes. Sorted by probe."""
+        if r > self.cell: raise ValueError(f"pairs radius {r} is larger than the cell size {self.cell}")
+        px = np.asarray(px, dtype=np.float64)
+        py = np.asarray(py, dtype=np.float64)
+        if not len(self.xs) or not len(px):
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        # The 3x3 cells around every probe, looked up in one pass
+        cx = np.floor(px / self.cell) + NEIGHBOURS_X[:, None]
+        cy = np.floor(py / self.cell) + NEIGHBOURS_Y[:, None]
+        owner, point = self._gather(self._keys(cx.ravel(), cy.ravel()))
+        probe = owner % len(px)
+        close = (self.xs[point] - px[probe]) ** 2 + (self.ys[point] - py[probe]) ** 2 < r * r
+        probe, point = probe[close], point[close]
+        order = np.lexsort((point, probe))
+        return probe[order], point[order]
@@ -0,0 +1,165 @@
+# sprites.py
+import math
+import pygame
+from config import TILE_W_BASE, TILE_H_BASE
+
+# ==========================================
+# SHAPE SPRITE CACHE
+# ==========================================
+# Enemies, the player and shadows used to be drawn from primitives every
+# frame. Each distinct look (shape, colour, zoom level) is now rendered once
+# into a small colour-keyed surface and blitted from then on.
+#
+# Zoom is quantized to ZOOM_STEP so the cache stays small while zooming.
+# Every sprite carries an anchor: the pixel inside the sprite that sits on
+# the entity's foot point (its projected world position).
+
+ZOOM_STEP = 0.05
+EXACT_KINDS = ("wall",)  # Tiled shapes: must match the floor exactly, so no zoom quantizing
+COLORKEY = (255, 0, 255)
+HEX_PHASE_STEP = 5  # Degrees; the hexagon repeats every 60
+
+
+def quantize_zoom(zoom):
+    return max(ZOOM_STEP, round(zoom / ZOOM_STEP) * ZOOM_STEP)
+
+
+def _canvas(w, h):
+    surf = pygame.Surface((max(1, int(math.ceil(w))), max(1, int(math.ceil(h)))))
+    surf.fill(COLORKEY)
+    surf.set_colorkey(COLORKEY, pygame.RLEACCEL)
+    return surf
+
+
+# --- BUILDERS ---
+# Each returns (surface, anchor_x, anchor_y) for one zoom level.
+
+def _build_shadow(z):
+    w, h = 30 * z, 10 * z
+    surf = _canvas(w + 1, h + 1)
+    pygame.draw.ellipse(surf, (0, 0, 0), (0, 0, w, h))
+    # Old draw_shadow put the ellipse's top-left at (sx - w // 2, sy + h // 2)
+    return surf, w // 2, -(h // 2)
+
+
+def _build_orb(col, z):
+    r = 18 * z
+    surf = _canvas(2 * r + 2, 2 * r + 2)
+    ax, ay = r + 1, 2 * r + 1
+    pygame.draw.circle(surf, col, (ax, ay - r), r)
+    pygame.draw.circle(surf, (255, 100, 100), (ax - 5 * z, ay - 20 * z), 5 * z)
+    return surf, ax, ay
+
+
+def _build_block(col, z):
+    s = 40 * z
+    surf = _canvas(s + 2, s + 2)
+    rect = pygame.Rect(0, 0, s, s)
+    rect.center = (s / 2 + 1, s / 2 + 1)
+    pygame.draw.rect(surf, col, rect)
+    pygame.draw.rect(surf, (20, 20, 50), rect, int(2 * z))
+    return surf, s / 2 + 1, s / 2 + 1 + s // 2
+
+
+def _build_spike(col, z):
+    h, w = 40 * z, 15 * z
+    surf = _canvas(2 * w + 2, h + 2)
+    ax, ay = w + 1, h + 1
+    pygame.draw.polygon(surf, col, [(ax, ay - h), (ax - w, ay), (ax + w, ay)])
+    return surf, ax, ay
+
+
+def _build_hex(col, phase, z):
+    radius = 40 * z
+    width = int(3 * z)
+    pad = width + 2
+    surf = _canvas(2 * radius + 2 * pad, 1.4 * radius + 2 * pad)
+    cx, cy = radius + pad, 0.7 * radius + pad
+    pts = []
+    for i in range(6):
+        ang = math.radians(i * 60 + phase)
+        pts.append((cx + math.cos(ang) * radius, cy + math.sin(ang) * radius * 0.7))
+    pygame.draw.polygon(surf, col, pts)
+    pygame.draw.polygon(surf, (255, 255, 255), pts, width)
+    return surf, cx, cy + 20 * z
+
+
+def _build_player(col, weapon, ult, z):
+    r = 18 * z + 2
+    surf = _canvas(2 * r + 2, 2 * r + 2)
+    cx = cy = r + 1  # Anchored on the body centre; the caller adds the bob
+    if ult:
+        pygame.draw.circle(surf, (0, 255, 255), (cx, cy), 18 * z, 2)
+    pygame.draw.circle(surf, col, (cx, cy), 14 * z)
+    if weapon == "shotgun":
+        pygame.draw.circle(surf, (255, 50, 50), (cx + 10 * z, cy), 5 * z)
+    elif weapon == "sniper":
+        pygame.draw.line(surf, (50, 255, 50), (cx, cy), (cx + 15 * z, cy), int(3 * z))
+    elif weapon == "minigun":
+        pygame.draw.rect(surf, (200, 180, 90), (cx + 4 * z, cy - 4 * z, 12 * z, 8 * z))
+    elif weapon == "flamethrower":
+        pygame.draw.circle(surf, (255, 140, 40), (cx + 11 * z, cy), 4 * z)
+        pygame.draw.line(surf, (120, 120, 120), (cx, cy + 3 * z), (cx + 8 * z, cy + 3 * z), max(1, int(2 * z)))
+    pygame.draw.circle(surf, (150, 200, 255), (cx - 4 * z, cy - 4 * z), 5 * z)
+    return surf, cx, cy
+
+
+def _build_wall(col_top, col_side, z):
+    # Only valid while the camera sits on one of its four rest angles: the
+    # block is a square, so every quarter turn projects to the same shape
+    tw, th, h = TILE_W_BASE * z, TILE_H_BASE * z, 30 * z
+    surf = _canvas(tw + 2, th + h + 2)
+    ax, ay = tw / 2 + 1, th / 2 + h + 1
+    s2, s3, s4 = (ax + tw / 2, ay), (ax, ay + th / 2), (ax - tw / 2, ay)
+    t1, t2, t3, t4 = (ax, ay - th / 2 - h), (ax + tw / 2, ay - h), (ax, ay + th / 2 - h), (ax - tw / 2, ay - h)
+    pygame.draw.polygon(surf, col_side, [s3, s2, t2, t3])
+    pygame.draw.polygon(surf, col_side, [s3, s4, t4, t3])
+    pygame.draw.polygon(surf, col_top, [t1, t2, t3, t4])
+    pygame.draw.polygon(surf, (0, 0, 0), [t1, t2, t3, t4], 1)
+    return surf, ax, ay
+
+
+BUILDERS = {
+    "shadow": _build_shadow,
+    "orb": _build_orb,
+    "block": _build_block,
+    "spike": _build_spike,
+    "hex": _build_hex,
+    "player": _build_player,
+    "wall": _build_wall,
+}
+
+
+class ShapeCache:
+    def __init__(self):
+        self.sprites = {}
+
+    def get(self, kind, zoom, *args):
+        """Returns (surface, anchor_x, anchor_y), building it on first use."""
+        zq = round(zoom, 4) if kind in EXACT_KINDS else quantize_zoom(zoom)
+        key = (kind, zq) + args
+        sprite = self.sprites.get(key)
+        if sprite is None:
+            sprite = BUILDERS[kind](*args, zq)
+            self.sprites[key] = sprite
+        return sprite
+
+    def blit(self, surf, kind, sx, sy, zoom, *args):
+        sprite, ax, ay = self.get(kind, zoom, *args)
+        surf.blit(sprite, (sx - ax, sy - ay))
+
+    def hex_phase(self, degrees):
+        return int(degrees % 60 // HEX_PHASE_STEP) * HEX_PHASE_STEP
+
+    def draw_shadows(self, surf, cam, entities):
+        """All shadows in one Surface.blits call."""
+        sprite, ax, ay = self.get("shadow", cam.zoom)
+        batch = []
+        for e in entities:
+            if not e.casts_shadow: continue
+            sx, sy = cam.world_to_screen(e.wx, e.wy)
+            batch.append((sprite, (sx - ax, sy - ay)))
+        surf.blits(batch, doreturn=False)
+
+
+SHAPES = ShapeCache()
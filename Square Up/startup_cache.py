@@ -0,0 +1,195 @@
+# startup_cache.py
+import os
+import sys
+import json
+import time
+import pygame
+from config import *
+from sprites import SHAPES, COLORKEY as SPRITE_COLORKEY
+
+# ==========================================
+# STARTUP CACHE
+# ==========================================
+# Launch used to spend most of its time in two places: SysFont scanning the
+# system font list for every font we ask for, and baking textures (the light
+# gradient, shape sprites) from primitives. Both results only depend on their
+# parameters, so they are written to CACHE_DIR and read back on later launches:
+#
+#   fonts.json          (name, bold, italic) -> resolved file + synthetic styles
+#   tex_<key>.raw       raw RGB texture, size in the key
+#   sprites.json/.raw   index + pixels of every ShapeCache sprite built so far
+#
+# Bump CACHE_VERSION whenever a builder changes what it draws; old entries
+# are then simply ignored. `python startup_cache.py bench` measures a cold
+# (empty cache) against a warm launch.
+
+CACHE_VERSION = 1
+
+
+def _default_dir():
+    return os.environ.get("SQUARE_UP_CACHE") or os.path.join(os.path.dirname(os.path.abspath(__file__)), CACHE_DIR)
+
+
+def _write_atomic(path, data):
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def _tuplify(v):
+    return tuple(_tuplify(x) for x in v) if isinstance(v, list) else v
+
+
+class StartupCache:
+    def __init__(self, path=None):
+        self.path = path or _default_dir()
+        self.enabled = True
+        self.fonts = None  # Loaded lazily from fonts.json
+        self.sprites_loaded = 0
+        self.stats = {"font_hits": 0, "font_misses": 0, "tex_hits": 0, "tex_misses": 0}
+        try:
+            os.makedirs(self.path, exist_ok=True)
+        except OSError:
+            self.enabled = False  # Read-only install: everything is just built every launch
+
+    def _file(self, name):
+        return os.path.join(self.path, name)
+
+    def _read_json(self, name):
+        try:
+            with open(self._file(name)) as f:
+                data = json.load(f)
+            return data if data.get("version") == CACHE_VERSION else None
+        except (OSError, ValueError):
+            return None
+
+    def _save(self, name, data):
+        if not self.enabled: return
+        try:
+            _write_atomic(self._file(name), data)
+        except OSError:
+            self.enabled = False
+
+    # --- FONTS ---
+    def font(self, name, size, bold=False, italic=False):
+        """Drop-in for pygame.font.SysFont that remembers where the font was found."""
+        if self.fonts is None:
+            data = self._read_json("fonts.json")
+            self.fonts = data["fonts"] if data else {}
+
+        key = f"{name}|{int(bold)}|{int(italic)}"
+        entry = self.fonts.get(key)
+        if entry is not None and entry[0] is not None and not os.path.exists(entry[0]):
+            entry = None  # Font was uninstalled / moved
+        if entry is None:
+            self.stats["font_misses"] += 1
+            # Let SysFont do the lookup, but capture its decision instead of a Font
+            entry = list(pygame.font.SysFont(name, size, bold, italic, constructor=lambda path, s, b, i: (path, b, i)))
+            self.fonts[key] = entry
+            self._save("fonts.json", json.dumps({"version": CACHE_VERSION, "fonts": self.fonts}, indent=1).encode())
+        else:
+            self.stats["font_hits"] += 1
+
+        path, set_bold, set_italic = entry
+        font = pygame.font.Font(path, size)
+        if set_bold: font.set_bold(True)
+        if set_italic: font.set_italic(True)
+        return font
+
+    # --- TEXTURES ---
+    def texture(self, key, size, build):
+        """Raw RGB texture `key` of `size`, produced by build() on a miss."""
+        name = f"tex_{key}_{size[0]}x{size[1]}_v{CACHE_VERSION}.raw"
+        try:
+            with open(self._file(name), "rb") as f:
+                surf = pygame.image.frombytes(f.read(), size, "RGB")
+            self.stats["tex_hits"] += 1
+            return surf
+        except (OSError, ValueError):
+            pass
+        self.stats["tex_misses"] += 1
+        surf = build()
+        self._save(name, pygame.image.tobytes(surf, "RGB"))
+        return surf
+
+    # --- SHAPE SPRITES ---
+    # Sprites are tiny, so they share one index (json) + one pixel blob.
+    def load_sprites(self, shapes):
+        index = self._read_json("sprites.json")
+        if not index: return 0
+        try:
+            with open(self._file("sprites.raw"), "rb") as f:
+                blob = f.read()
+        except OSError:
+            return 0
+        for key, offset, w, h, ax, ay in index["sprites"]:
+            surf = pygame.image.frombytes(blob[offset:offset + w * h * 3], (w, h), "RGB")
+            surf.set_colorkey(SPRITE_COLORKEY, pygame.RLEACCEL)
+            shapes.sprites.setdefault(_tuplify(key), (surf, ax, ay))
+        self.sprites_loaded = len(shapes.sprites)
+        return self.sprites_loaded
+
+    def save_sprites(self, shapes):
+        """Writes the sprite cache back if anything new was built this session."""
+        if len(shapes.sprites) == self.sprites_loaded: return
+        entries, chunks, offset = [], [], 0
+        for key, (surf, ax, ay) in shapes.sprites.items():
+            data = pygame.image.tobytes(surf, "RGB")
+            entries.append([list(key), offset, surf.get_width(), surf.get_height(), ax, ay])
+            chunks.append(data)
+            offset += len(data)
+        self._save("sprites.raw", b"".join(chunks))
+        self._save("sprites.json", json.dumps({"version": CACHE_VERSION, "sprites": entries}).encode())
+        self.sprites_loaded = len(shapes.sprites)
+
+    def clear(self):
+        for name in os.listdir(self.path):
+            if name.endswith((".json", ".raw")): os.remove(self._file(name))
+        self.fonts = None
+
+
+CACHE = StartupCache()
+
+
+# ==========================================
+# COLD VS WARM STARTUP BENCHMARK
+# ==========================================
+def _time_to_first_frame(t0):
+    """Run in a fresh process: import, build the game, render one frame."""
+    from main import Game
+    game = Game(headless=True)
+    game.land()
+    game.render(1 / FPS)
+    t = time.perf_counter() - t0
+    CACHE.save_sprites(SHAPES)
+    print(json.dumps({"ms": t * 1000.0, **CACHE.stats, "sprites": len(SHAPES.sprites)}))
+
+
+def bench(runs=3):
+    import subprocess
+    import tempfile
+    env = dict(os.environ, SDL_VIDEODRIVER="dummy", SDL_AUDIODRIVER="dummy")
+    code = "import time; t0 = time.perf_counter(); import startup_cache; startup_cache._time_to_first_frame(t0)"
+    cmd = [sys.executable, "-c", code]
+    cold, warm = [], []
+    for _ in range(runs):
+        with tempfile.TemporaryDirectory() as tmp:
+            env["SQUARE_UP_CACHE"] = tmp
+            for bucket in (cold, warm):
+                out = subprocess.run(cmd, env=env, cwd=os.path.dirname(os.path.abspath(__file__)),
+                                     capture_output=True, text=True, check=True).stdout
+                bucket.append(json.loads(out.strip().splitlines()[-1]))
+    for label, rows in (("cold", cold), ("warm", warm)):
+        ms = sorted(r["ms"] for r in rows)
+        print(f"{label}: time to first frame {ms[len(ms) // 2]:.0f} ms (median of {runs})  "
+              f"fonts {rows[-1]['font_hits']} hit / {rows[-1]['font_misses']} miss, "
+              f"textures {rows[-1]['tex_hits']} hit / {rows[-1]['tex_misses']} miss")
+
+
+if __name__ == "__main__":
+    # python startup_cache.py bench | clear
+    if len(sys.argv) > 1 and sys.argv[1] == "clear":
+        CACHE.clear()
+    else:
+        bench()
@@ -0,0 +1,92 @@
+# surfaces.py
+import collections
+import threading
+import pygame
+
+# ==========================================
+# TRANSIENT SURFACE POOL
+# ==========================================
+# Scratch surfaces that only live for part of a frame (ghost trails, the
+# damage flash, ...) are borrowed from here instead of being allocated with
+# pygame.Surface every frame. Everything acquired is handed back by
+# begin_frame(), so callers never release anything themselves. Pixels are
+# left as they were, but per-surface alpha is cleared there, so a surface
+# never comes back with the previous borrower's set_alpha.
+#
+# Scaled copies of a texture (the light gradient at each light size) are
+# content, not scratch: they are kept across frames in a small LRU keyed by
+# (source, size).
+#
+# `allocated` counts real Surface allocations this frame; the game publishes
+# it to the profiler so a new per-frame allocation shows up immediately.
+#
+# The render worker borrows surfaces while the main thread draws, so
+# acquire() and scaled() hold a lock around the bookkeeping.
+
+SCALE_STEP = 8  # Scaled sizes are rounded to this many pixels so they repeat
+MAX_SCALED = 96
+IDLE_FRAMES = 240  # Free lists untouched this long are dropped
+
+
+class SurfacePool:
+    def __init__(self):
+        self.free = {}  # (w, h, flags, bitsize) -> [Surface]
+        self.in_use = []  # (key, Surface) handed out this frame
+        self.last_used = {}  # key -> frame number
+        self.scaled_cache = collections.OrderedDict()
+        self.frame = 0
+        self.allocated = 0  # This frame
+        self.reused = 0
+        self.lock = threading.Lock()
+
+    def begin_frame(self):
+        for key, surf in self.in_use:
+            surf.set_alpha(None)
+            self.free[key].append(surf)
+        self.in_use = []
+        self.frame += 1
+        self.allocated = 0
+        self.reused = 0
+        if self.frame % 60 == 0: self._trim()
+
+    def _trim(self):
+        for key in [k for k, f in self.last_used.items() if self.frame - f > IDLE_FRAMES]:
+            del self.last_used[key]
+            self.free.pop(key, None)
+
+    def acquire(self, w, h, flags=0, like=None):
+        """A surface of this size/flags for the rest of the frame. Contents are undefined; alpha is unset."""
+        depth = like.get_bitsize() if like is not None else 0
+        key = (max(1, int(w)), max(1, int(h)), flags, depth)
+        with self.lock:
+            self.last_used[key] = self.frame
+            stack = self.free.setdefault(key, [])
+            if stack:
+                surf = stack.pop()
+                self.reused += 1
+            else:
+                surf = pygame.Surface(key[:2], flags, like) if like is not None else pygame.Surface(key[:2], flags)
+                self.allocated += 1
+            self.in_use.append((key, surf))
+        return surf
+
+    def scaled(self, src, w, h):
+        """`src` stretched to about (w, h). Cached; treat the result as read-only."""
+        w = max(SCALE_STEP, int(round(w / SCALE_STEP)) * SCALE_STEP)
+        h = max(SCALE_STEP, int(round(h / SCALE_STEP)) * SCALE_STEP)
+        key = (id(src), w, h)
+        with self.lock:
+            surf = self.scaled_cache.get(key)
+            if surf is not None:
+                self.scaled_cache.move_to_end(key)
+                self.reused += 1
+                return surf
+            surf = pygame.transform.scale(src, (w, h))
+            self.allocated += 1
+            self.scaled_cache[key] = surf
+            if len(self.scaled_cache) > MAX_SCALED:
+                self.scaled_cache.popitem(last=False)
+        return surf
+
+
+SURFACES = SurfacePool()
@@ -0,0 +1,8 @@
+# conftest.py
+import os
+import sys
+
+# The game modules import each other by bare name from "Square Up/"
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,61 @@
+# test_ecs.py
+import gc
+from ecs import HandleTable, EntityStore, INDEX_MASK
+
+
+class Thing:
+    pass
+
+
+def test_stale_uid_is_rejected_after_its_slot_is_reused():
+    handles = HandleTable()
+    a = Thing()
+    old = handles.issue(a)
+    handles.release(old)
+    b = Thing()
+    new = handles.issue(b)
+    assert new & INDEX_MASK == old & INDEX_MASK  # Same slot...
+    assert new != old  # ...next generation
+    assert handles.resolve(old) is None
+    assert not handles.valid(old)
+    assert handles.resolve(new) is b
+
+
+def test_released_uid_stays_dead_and_double_release_is_harmless():
+    handles = HandleTable()
+    uid = handles.issue(Thing())
+    handles.release(uid)
+    handles.release(uid)
+    assert len(handles) == 0
+    assert handles.resolve(uid) is None
+    assert handles.free == [uid & INDEX_MASK]  # Freed once, not twice
+
+
+def test_uid_zero_never_resolves():
+    handles = HandleTable()
+    handles.issue(Thing())
+    assert handles.resolve(0) is None
+
+
+def test_collected_entity_frees_its_row_and_uid():
+    store = EntityStore()
+    keep, drop = Thing(), Thing()
+    store.spawn(keep, ("position",))
+    store.spawn(drop, ("position",))
+    dropped = drop.uid
+    del drop
+    gc.collect()
+    assert store.handles.resolve(dropped) is None
+    reused = Thing()
+    store.spawn(reused, ("position",))
+    assert store.handles.resolve(dropped) is None
+    assert store.handles.resolve(reused.uid) is reused
+    assert len(store) == 2
+
+
+def test_stores_do_not_share_handles():
+    a, b = EntityStore(), EntityStore()
+    x = Thing()
+    a.spawn(x, ("position",))
+    assert b.handles.resolve(x.uid) is None
+    assert len(b) == 0
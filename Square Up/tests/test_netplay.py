@@ -0,0 +1,63 @@
+# test_netplay.py
+import numpy as np
+from netplay import (encode, decode, GAME_NET, ENEMY_DT, ORB_DT, PROP_DT, BULLET_DT, KEYED, WHOLE)
+
+
+def make_state(enemy_ids=(), orb_ids=(), props=0, bullets=0, level=1, hp=100.0):
+    """A capture()-shaped state with distinct values in every row."""
+    enemies = np.zeros(len(enemy_ids), dtype=ENEMY_DT)
+    enemies["id"] = enemy_ids
+    enemies["wx"] = np.arange(len(enemy_ids)) * 256
+    enemies["health"] = hp
+    orbs = np.zeros(len(orb_ids), dtype=ORB_DT)
+    orbs["id"] = orb_ids
+    orbs["wy"] = np.arange(len(orb_ids)) * 128
+    pr = np.zeros(props, dtype=PROP_DT)
+    pr["fuse"] = np.linspace(0.5, 2.0, props)
+    bl = np.zeros(bullets, dtype=BULLET_DT)
+    bl["vx"] = np.arange(bullets)
+    return {"game": GAME_NET.pack(level, level, True, False, 10, 3, 1), "player": b"player-bytes",
+            "enemies": np.sort(enemies, order="id"), "orbs": np.sort(orbs, order="id"), "props": pr, "bullets": bl}
+
+
+def assert_same(a, b):
+    assert a["game"] == b["game"]
+    assert a["player"] == b["player"]
+    for name, _ in KEYED + WHOLE:
+        assert a[name].tobytes() == b[name].tobytes(), name
+
+
+def roundtrip(state, base=None, base_tick=0):
+    msg = encode(state, base, 7, base_tick, 1.5)
+    tick, echo, _, out = decode(msg, {base_tick: base} if base is not None else {})
+    assert (tick, echo) == (7, 1.5)
+    return out
+
+
+def test_full_snapshot_roundtrip():
+    state = make_state(enemy_ids=(3, 9, 12), orb_ids=(4,), props=5, bullets=8)
+    assert_same(roundtrip(state), state)
+
+
+def test_empty_snapshot_roundtrip():
+    assert_same(roundtrip(make_state()), make_state())
+
+
+def test_delta_with_added_removed_and_changed_rows():
+    base = make_state(enemy_ids=(3, 9, 12), orb_ids=(4, 5), props=2, bullets=4)
+    state = make_state(enemy_ids=(3, 12, 20), orb_ids=(5, 6), props=3, bullets=1, level=2)
+    state["enemies"]["health"][0] = 40.0  # id 3 changed, 9 removed, 12 moved row, 20 added
+    assert_same(roundtrip(state, base, 5), state)
+
+
+def test_delta_against_identical_base():
+    base = make_state(enemy_ids=(1, 2), orb_ids=(8,), bullets=2)
+    state = make_state(enemy_ids=(1, 2), orb_ids=(8,), bullets=2)
+    assert_same(roundtrip(state, base, 5), state)
+    assert len(encode(state, base, 7, 5, 0.0)) < len(encode(state, None, 7, 0, 0.0))  # No keyed rows resent
+
+
+def test_delta_from_empty_base_and_to_empty_state():
+    full = make_state(enemy_ids=(1, 2), orb_ids=(8,))
+    assert_same(roundtrip(full, make_state(), 5), full)
+    assert_same(roundtrip(make_state(), full, 5), make_state())
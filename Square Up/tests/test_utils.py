@@ -0,0 +1,66 @@
+# test_utils.py
+import math
+import numpy as np
+from utils import grid_array, segment_grid_hits, swept_circle_hits
+
+# 5x4 map: walls round the edge plus one pillar at (3, 1)
+GRID = [[1, 1, 1, 1, 1],
+        [1, 0, 0, 1, 1],
+        [1, 0, 0, 0, 1],
+        [1, 1, 1, 1, 1]]
+
+
+def grid_hits(*segments):
+    x0, y0, x1, y1 = (np.array(v, dtype=float) for v in zip(*segments))
+    return segment_grid_hits(x0, y0, x1, y1, grid_array(GRID))
+
+
+# --- SEGMENT VS GRID ---
+def test_segment_inside_one_open_tile_never_hits():
+    assert grid_hits((1.2, 1.2, 1.8, 1.7)).tolist() == [math.inf]
+
+
+def test_segment_through_open_tiles_never_hits():
+    assert grid_hits((1.5, 2.5, 3.5, 2.5), (1.5, 1.5, 2.5, 2.5)).tolist() == [math.inf, math.inf]
+
+
+def test_segment_stops_at_the_first_wall_face():
+    t = grid_hits((2.5, 1.5, 4.5, 1.5), (1.5, 2.5, 1.5, 4.0), (1.5, 1.5, 0.5, 0.5))
+    assert t.tolist() == [0.25, 0.5 / 1.5, 0.5]
+
+
+def test_segment_starting_in_a_wall_hits_at_zero():
+    assert grid_hits((3.5, 1.5, 2.5, 1.5)).tolist() == [0.0]
+
+
+def test_segment_leaving_the_map_hits_the_border():
+    grid = grid_array([[0, 0], [0, 0]])
+    t = segment_grid_hits(np.array([1.5]), np.array([0.5]), np.array([3.5]), np.array([0.5]), grid)
+    assert t.tolist() == [0.25]
+
+
+def test_segment_rows_are_independent():
+    # A long segment that walks several tiles must not disturb short ones resolved earlier
+    t = grid_hits((1.5, 2.5, 3.5, 2.5), (2.5, 1.5, 4.5, 1.5), (1.2, 1.2, 1.8, 1.7), (1.5, 2.5, 5.5, 2.5))
+    assert t.tolist() == [math.inf, 0.25, math.inf, 0.625]
+
+
+# --- SEGMENT VS CIRCLES ---
+def test_swept_circle_first_contact_and_misses():
+    x0, y0 = np.array([0.0, 0.0, 0.0]), np.array([0.0, 3.0, 0.0])
+    x1, y1 = np.array([4.0, 4.0, 1.0]), np.array([0.0, 3.0, 0.0])
+    t = swept_circle_hits(x0, y0, x1, y1, np.array([2.0]), np.array([0.0]), 1.0)
+    assert t.shape == (3, 1)
+    assert t[:, 0].tolist() == [0.25, math.inf, 1.0]  # Entry at x = 1; passes above; just touches at the end
+
+
+def test_swept_circle_starting_inside_is_zero():
+    t = swept_circle_hits(np.array([2.5]), np.array([0.0]), np.array([9.0]), np.array([0.0]),
+                          np.array([2.0, 8.0]), np.array([0.0, 0.0]), 1.0)
+    assert t.tolist() == [[0.0, 4.5 / 6.5]]
+
+
+def test_swept_circle_zero_length_segment():
+    t = swept_circle_hits(np.array([0.0, 5.0]), np.array([0.0, 5.0]), np.array([0.0, 5.0]), np.array([0.0, 5.0]),
+                          np.array([0.5]), np.array([0.0]), 1.0)
+    assert t[:, 0].tolist() == [0.0, math.inf]
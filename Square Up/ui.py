@@ -10,7 +10,8 @@ class Button:
         self.cost_fn = cost_fn
         self.condition_fn = condition_fn  # New: Function to check if button is clickable
 
-    def draw(self, surf, font, player_money):
+    def draw(self, surf, font, player_money, rect=None):
+        rect = rect or self.rect  # The HUD draws buttons into their own surfaces
         cost, val_str = self.cost_fn()
 
         # Check condition (e.g., is Health full?)
@@ -30,24 +31,29 @@ class Button:
             col_border = (80, 80, 80)
             col_text = (150, 150, 150)  # Grayed out text
 
-        pygame.draw.rect(surf, col_bg, self.rect)
-        pygame.draw.rect(surf, col_border, self.rect, 2)
+        pygame.draw.rect(surf, col_bg, rect)
+        pygame.draw.rect(surf, col_border, rect, 2)
 
         lbl_name = font.render(f"{self.text}", True, col_text)
         lbl_cost = font.render(f"${cost} | {val_str}", True, (200, 200, 100) if is_active else (100, 100, 100))
 
-        surf.blit(lbl_name, (self.rect.x + 10, self.rect.y + 5))
-        surf.blit(lbl_cost, (self.rect.x + 10, self.rect.y + 25))
+        surf.blit(lbl_name, (rect.x + 10, rect.y + 5))
+        surf.blit(lbl_cost, (rect.x + 10, rect.y + 25))
 
     def click(self, mx, my, player):
-        # Check condition before clicking
+        if self.rect.collidepoint(mx, my):
+            return self.buy(player)
+        return False
+
+    def buy(self, player):
+        """Pays and applies the upgrade if allowed. Also used by the balance bot."""
+        # Check condition before buying
         if self.condition_fn and not self.condition_fn():
             return False
 
-        if self.rect.collidepoint(mx, my):
-            cost, _ = self.cost_fn()
-            if player.money >= cost:
-                player.money -= cost
-                self.callback(player)
-                return True
+        cost, _ = self.cost_fn()
+        if player.money >= cost:
+            player.money -= cost
+            self.callback(player)
+            return True
         return False
\ No newline at end of file
@@ -1,6 +1,7 @@
 # utils.py
 import math
 import collections
+import numpy as np
 import config
 
 # ==========================================
@@ -41,6 +42,107 @@ def has_line_of_sight(x1, y1, x2, y2, grid):
             return False
     return True
 
+_GRID = [None, None]  # (grid list, int8 copy) of the last grid passed to grid_array
+
+def grid_array(grid):
+    """The tile grid as an int8 array, rebuilt only when a different grid list is passed."""
+    if _GRID[0] is not grid:
+        _GRID[:] = grid, np.asarray(grid, dtype=np.int8)
+    return _GRID[1]
+
+def grid_blocked(solid, x, y, m=0.0):
+    """check_grid_collision for arrays: the tile under each point, or with m > 0 any tile
+    touched by the box [x - m, x + m] x [y - m, y + m] (as Entity.check_area_collision).
+    Outside the map counts as wall."""
+    h, w = solid.shape
+    if np.isscalar(m) and m == 0:
+        ix, iy = np.floor(x).astype(np.int64), np.floor(y).astype(np.int64)
+        oob = (ix < 0) | (ix >= w) | (iy < 0) | (iy >= h)
+        return oob | (solid[np.where(oob, 0, iy), np.where(oob, 0, ix)] == 1)
+    x0, x1 = np.floor(x - m).astype(np.int64), np.ceil(x + m).astype(np.int64)
+    y0, y1 = np.floor(y - m).astype(np.int64), np.ceil(y + m).astype(np.int64)
+    hit = np.zeros(len(x), dtype=bool)
+    for dy in range(int((y1 - y0).max(initial=0))):
+        for dx in range(int((x1 - x0).max(initial=0))):
+            tx, ty = x0 + dx, y0 + dy
+            inside = (tx < x1) & (ty < y1)
+            oob = (tx < 0) | (tx >= w) | (ty < 0) | (ty >= h)
+            hit |= inside & (oob | (solid[np.clip(ty, 0, h - 1), np.clip(tx, 0, w - 1)] == 1))
+    return hit
+
+# ==========================================
+# SWEPT COLLISION
+# ==========================================
+# Fast projectiles can cross a whole tile (or an enemy) between two frames,
+# so instead of testing the end point we test the segment travelled this
+# step. Results are the fraction t in [0, 1] along the segment of the first
+# contact, which lets callers apply hits in the order they happened.
+
+def segment_grid_hits(x0, y0, x1, y1, solid):
+    """First t where each segment (x0, y0)->(x1, y1) enters a wall tile of `solid` (grid_array), inf if none.
+
+    x0/y0/x1/y1 are arrays of N segments; all of them walk the grid together,
+    one tile border per pass, so the Python cost is the longest segment in
+    tiles rather than the number of segments.
+    """
+    h, w = solid.shape
+    t = np.where(grid_blocked(solid, x0, y0), 0.0, np.inf)
+    ix, iy = np.floor(x0).astype(np.int64), np.floor(y0).astype(np.int64)
+    moved = (ix != np.floor(x1)) | (iy != np.floor(y1))  # Rows that never leave their (empty) tile are done
+    a = np.flatnonzero(moved & (t > 0))
+    if not len(a): return t
+
+    # Grid traversal (Amanatides & Woo): each row steps to whichever tile border is closer
+    x0, y0, ix, iy = x0[a], y0[a], ix[a], iy[a]
+    dx, dy = x1[a] - x0, y1[a] - y0
+    step_x = np.where(dx > 0, 1, -1)
+    step_y = np.where(dy > 0, 1, -1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t_max_x = np.where(dx != 0, ((ix + (dx > 0)) - x0) / dx, np.inf)
+        t_max_y = np.where(dy != 0, ((iy + (dy > 0)) - y0) / dy, np.inf)
+        t_delta_x = np.where(dx != 0, np.abs(1.0 / dx), np.inf)
+        t_delta_y = np.where(dy != 0, np.abs(1.0 / dy), np.inf)
+
+    while len(a):
+        go_x = t_max_x < t_max_y
+        tt = np.where(go_x, t_max_x, t_max_y)
+        ix = ix + np.where(go_x, step_x, 0)
+        iy = iy + np.where(go_x, 0, step_y)
+        t_max_x = np.where(go_x, t_max_x + t_delta_x, t_max_x)
+        t_max_y = np.where(go_x, t_max_y, t_max_y + t_delta_y)
+        oob = (ix < 0) | (ix >= w) | (iy < 0) | (iy >= h)
+        wall = oob | (solid[np.where(oob, 0, iy), np.where(oob, 0, ix)] == 1)
+        past = tt > 1.0
+        hit = wall & ~past
+        t[a[hit]] = tt[hit]
+        go = ~(hit | past)
+        a, ix, iy, tt = a[go], ix[go], iy[go], tt[go]
+        step_x, step_y, t_max_x, t_max_y = step_x[go], step_y[go], t_max_x[go], t_max_y[go]
+        t_delta_x, t_delta_y = t_delta_x[go], t_delta_y[go]
+    return t
+
+
+def swept_circle_hits(x0, y0, x1, y1, cx, cy, r):
+    """First t in [0, 1] where each segment enters each circle (starting inside counts as t = 0).
+
+    x0/y0/x1/y1 are arrays of N segments, cx/cy arrays of M circle centres.
+    Returns an (N, M) array of contact times, with inf where there is no hit.
+    """
+    dx = (x1 - x0)[:, None]
+    dy = (y1 - y0)[:, None]
+    fx = x0[:, None] - cx[None, :]
+    fy = y0[:, None] - cy[None, :]
+    a = dx * dx + dy * dy
+    b = fx * dx + fy * dy
+    c = fx * fx + fy * fy - r * r
+    disc = b * b - a * c
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t = (-b - np.sqrt(np.maximum(disc, 0.0))) / a
+    t = np.where((disc >= 0) & (a > 0) & (t >= 0.0) & (t <= 1.0), t, np.inf)
+    return np.where(c <= 0, 0.0, t)
+
+
 # ==========================================
 # PATHFINDING (BFS)
 # ==========================================
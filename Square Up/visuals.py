@@ -1,8 +1,16 @@
 # visuals.py
+import sys
+import time
 import pygame
 import random
 import math
+import numpy as np
 from config import *
+from startup_cache import CACHE
+from surfaces import SURFACES
+from sprites import COLORKEY
+from props import PropPool, PROP_NAMES
+from pools import PackedPool
 
 
 class CrackDecal:
@@ -12,7 +20,6 @@ class CrackDecal:
         self.wx = wx
         self.wy = wy
         self.color = color
-        self.lifetime = 5.0  # Lasts 5 seconds
         self.points = []
 
         # Generate 3-5 jagged lines radiating from center
@@ -40,36 +47,10 @@ class CrackDecal:
 
             self.points.append(branch)
 
-    def update(self, dt):
-        self.lifetime -= dt
-
-    def draw(self, surf, cam):
-        if self.lifetime > 0:
-            sx_start, sy_start = cam.world_to_screen(self.wx, self.wy)
-
-            # Fade out
-            alpha = int(255 * min(1.0, self.lifetime / 2.0))
-            if alpha < 5: return
-
-            # We need a temp surface for alpha lines if we want them to fade nicely,
-            # but for sharp cracks, direct drawing is usually fine.
-            # To support fading, we pick a color that gets darker.
-            fade_col = (
-                max(0, self.color[0] * (alpha / 255)),
-                max(0, self.color[1] * (alpha / 255)),
-                max(0, self.color[2] * (alpha / 255))
-            )
-
-            for branch in self.points:
-                # Convert relative points to screen points
-                screen_points = []
-                for pt in branch:
-                    wx = self.wx + pt[0]
-                    wy = self.wy + pt[1]
-                    screen_points.append(cam.world_to_screen(wx, wy))
-
-                if len(screen_points) > 1:
-                    pygame.draw.lines(surf, fade_col, False, screen_points, max(1, int(2 * cam.zoom)))
+    def stamp(self, floor):
+        """Burns the crack into the floor decal layer (drawn for free from then on)."""
+        for branch in self.points:
+            floor.stamp_lines([(self.wx + px, self.wy + py) for px, py in branch], self.color)
 
 
 class GhostTrace:
@@ -90,75 +71,98 @@ class GhostTrace:
     def draw(self, surf, cam):
         if self.lifetime > 0:
             sx, sy = cam.world_to_screen(self.wx, self.wy)
-            s = pygame.Surface((self.radius * 2 * cam.zoom + 10, self.radius * 2 * cam.zoom + 10), pygame.SRCALPHA)
+            s = SURFACES.acquire(self.radius * 2 * cam.zoom + 10, self.radius * 2 * cam.zoom + 10, pygame.SRCALPHA)
+            s.fill((0, 0, 0, 0))
             cx, cy = s.get_width() // 2, s.get_height() // 2
             r_scaled = self.radius * cam.zoom
             pygame.draw.circle(s, (*self.color, self.alpha), (cx, cy), r_scaled)
             surf.blit(s, (sx - cx, sy - cy - (15 * cam.zoom)))
 
 
-class Particle:
-    def __init__(self, x, y, color, speed, lifetime, size_start):
-        self.x = x
-        self.y = y
-        angle = random.uniform(0, 6.28)
-        self.vx = math.cos(angle) * speed
-        self.vy = math.sin(angle) * speed * 0.6
-        self.color = color
-        self.lifetime = lifetime
-        self.max_life = lifetime
-        self.size = size_start
-
-    def update(self, dt):
-        self.x += self.vx * dt
-        self.y += self.vy * dt
-        self.lifetime -= dt
-        self.size = max(0, self.size - (self.size / self.max_life) * dt)
-
-    def draw(self, surf):
-        if self.lifetime > 0:
-            pygame.draw.circle(surf, self.color, (int(self.x), int(self.y)), int(self.size))
-
-
-class ShellCasing:
-    def __init__(self, wx, wy):
-        self.wx = wx
-        self.wy = wy
-        self.z = 1.0
-        angle = random.uniform(0, 6.28)
-        speed = random.uniform(2.0, 4.0)
-        self.vx = math.cos(angle) * speed
-        self.vy = math.sin(angle) * speed
-        self.vz = random.uniform(8.0, 12.0)
-        self.lifetime = 10.0
-        self.bounces = 0
+# ==========================================
+# WORLD-SPACE PARTICLES
+# ==========================================
+# Particles live in world coordinates in packed parallel arrays (the same
+# layout as BulletPool) and are projected through the camera in one batch
+# when drawn, so they stay put when the camera pans, zooms or rotates.
+# Speeds and sizes are given in screen pixels at zoom 1, as they were when
+# particles lived on the screen; PX_PER_UNIT converts speeds to world units.
+# Drawing is a single fblits of cached circle sprites, one per colour and
+# pixel radius, instead of a draw.circle call per particle.
+
+PX_PER_UNIT = TILE_W_BASE / math.sqrt(2)  # Screen px per world unit at zoom 1
+_RNG = np.random.default_rng()
+
+
+class ParticlePool(PackedPool):
+    FIELDS = ("wx", "wy", "vx", "vy", "lifetime", "max_life", "size", "color")
+
+    def __init__(self, capacity=256):
+        self.wx = np.zeros(0)
+        self.wy = np.zeros(0)
+        self.vx = np.zeros(0)
+        self.vy = np.zeros(0)
+        self.lifetime = np.zeros(0)
+        self.max_life = np.zeros(0)
+        self.size = np.zeros(0)  # Radius in screen px at zoom 1
+        self.color = np.zeros((0, 3), dtype=np.uint8)
+        self.dots = {}  # (radius << 24 | rgb) -> circle sprite
+        super().__init__(capacity)
+
+    def emit(self, wx, wy, color, n, speed, life, size):
+        """n particles bursting from (wx, wy). speed/life/size are (low, high) ranges."""
+        s = self._reserve(n)
+        angle = _RNG.uniform(0.0, 2.0 * math.pi, n)
+        spd = _RNG.uniform(speed[0], speed[1], n) / PX_PER_UNIT
+        self.wx[s] = wx
+        self.wy[s] = wy
+        self.vx[s] = np.cos(angle) * spd
+        self.vy[s] = np.sin(angle) * spd
+        self.lifetime[s] = self.max_life[s] = _RNG.uniform(life[0], life[1], n)
+        self.size[s] = _RNG.uniform(size[0], size[1], n)
+        self.color[s] = color
 
     def update(self, dt):
-        if self.z > 0 or self.vz > 0:
-            self.vz -= 30.0 * dt
-            self.wx += self.vx * dt * 2.0
-            self.wy += self.vy * dt * 2.0
-            self.z += self.vz * dt
-            if self.z < 0:
-                self.z = 0
-                self.vz = -self.vz * 0.6
-                self.vx *= 0.8
-                self.vy *= 0.8
-                self.bounces += 1
-                if abs(self.vz) < 1.0:
-                    self.vz = 0
-        else:
-            self.lifetime -= dt
+        n = self.count
+        if n == 0: return
+        self.wx[:n] += self.vx[:n] * dt
+        self.wy[:n] += self.vy[:n] * dt
+        self.lifetime[:n] -= dt
+        self.size[:n] = np.maximum(0.0, self.size[:n] * (1.0 - dt / self.max_life[:n]))
+        self.keep(self.lifetime[:n] > 0)
+
+    def project(self, cam, min_size=0.0):
+        """(sx, sy, radius in scene px, colours) of the particles bigger than min_size that are on screen."""
+        n = self.count
+        sx, sy = cam.world_to_screen_array(self.wx[:n], self.wy[:n])
+        r = self.size[:n] * cam.zoom
+        vis = (self.size[:n] > min_size) & (sx > -r) & (sx < cam.w + r) & (sy > -r) & (sy < cam.h + r)
+        return sx[vis], sy[vis], r[vis], self.color[:n][vis]
+
+    def _dot(self, key):
+        surf = self.dots.get(key)
+        if surf is None:
+            r, rgb = key >> 24, key & 0xFFFFFF
+            surf = pygame.Surface((2 * r + 1, 2 * r + 1))
+            surf.fill(COLORKEY)
+            surf.set_colorkey(COLORKEY, pygame.RLEACCEL)
+            pygame.draw.circle(surf, (rgb >> 16, (rgb >> 8) & 255, rgb & 255), (r, r), r)
+            self.dots[key] = surf
+        return surf
 
     def draw(self, surf, cam):
-        sx, sy = cam.world_to_screen(self.wx, self.wy)
-        draw_y = sy - (self.z * 15 * cam.zoom)
-        col = (255, 200, 50)
-        if self.bounces % 2 == 0:
-            col = (200, 150, 20)
-        w, h = 3 * cam.zoom, 5 * cam.zoom
-        pygame.draw.rect(surf, (0, 0, 0), (sx, sy, w + 1, 2 * cam.zoom))
-        pygame.draw.rect(surf, col, (sx, draw_y, w, h))
+        """One fblits call; each (colour, pixel radius) is a cached circle sprite."""
+        if self.count == 0: return
+        sx, sy, r, colors = self.project(cam)
+        r = r.astype(np.int64)
+        keep = r >= 1
+        r = r[keep]
+        rgb = colors[keep].astype(np.int64)
+        keys, inv = np.unique((r << 24) | (rgb[:, 0] << 16) | (rgb[:, 1] << 8) | rgb[:, 2], return_inverse=True)
+        dots = [self._dot(k) for k in keys.tolist()]
+        xs = (sx[keep].astype(np.int64) - r).tolist()
+        ys = (sy[keep].astype(np.int64) - r).tolist()
+        surf.fblits([(dots[i], (x, y)) for i, x, y in zip(inv.tolist(), xs, ys)])
 
 
 class Debris:
@@ -168,19 +172,13 @@ class Debris:
         self.type = d_type
         self.scale = random.uniform(0.8, 1.2)
         self.color = level_color
-        self.lifetime = 10.0
-
-    def update(self, dt):
-        self.lifetime -= dt
 
-    def draw(self, surf, cam):
-        sx, sy = cam.world_to_screen(self.wx, self.wy)
+    def stamp(self, floor):
+        """Leaves a permanent mark on the floor decal layer."""
         if self.type == "blood":
-            pygame.draw.ellipse(surf, (100, 0, 0),
-                                (sx - 10 * self.scale, sy - 5 * self.scale, 20 * self.scale, 10 * self.scale))
-        elif self.type == "robot_parts":
-            c = (self.color[0] * 0.5, self.color[1] * 0.5, self.color[2] * 0.5)
-            pygame.draw.rect(surf, c, (sx, sy, 8, 8))
+            floor.stamp_circle(self.wx, self.wy, 0.15 * self.scale, (100, 0, 0))
+        elif self.type == "scorch":
+            floor.stamp_circle(self.wx, self.wy, 0.6 * self.scale, (25, 20, 20), sides=16)
 
 
 class FloatingText:
@@ -198,79 +196,183 @@ class FloatingText:
         self.timer += dt
         self.y += self.vy * dt
 
-    def draw(self, surf, font_dict):
+    def draw(self, surf, font_dict, outline=True, scale=1.0):
+        # x/y are scene pixels; scale converts them to the target surface
         if self.timer < self.duration:
+            x, y = self.x / scale, self.y / scale
             font = font_dict.get(self.size, font_dict[20])
             lbl = font.render(self.text, True, self.color)
-            outline = font.render(self.text, True, (0, 0, 0))
-            surf.blit(outline, (self.x - lbl.get_width() // 2 + 1, self.y + 1))
-            surf.blit(lbl, (self.x - lbl.get_width() // 2, self.y))
+            if outline:
+                shadow = font.render(self.text, True, (0, 0, 0))
+                surf.blit(shadow, (x - lbl.get_width() // 2 + 1, y + 1))
+            surf.blit(lbl, (x - lbl.get_width() // 2, y))
 
 
 class VisualManager:
-    def __init__(self):
-        self.particles = []
+    def __init__(self, floor):
+        self.floor = floor  # FloorLayer that cracks and debris are stamped into
+        self.particles = ParticlePool()
         self.texts = []
-        self.casings = []
-        self.debris = []
+        self.props = PropPool(rng=_RNG)  # Shell casings and debris chunks (cosmetic, not saved)
         self.ghosts = []
-        self.cracks = []  # NEW: Jagged cracks
+
+        # Caps set by the quality governor (Game.apply_quality)
+        self.max_particles = 2000
+        self.max_casings = 400  # Cap on self.props
+        self.max_ghosts = 200
+        self.text_effects = True
+
+        # Scene pixels per window pixel; screen-space effect sizes scale with it
+        self.pixel_scale = 1.0
+
         self.fonts = {
-            16: pygame.font.SysFont("Consolas", 16, bold=True),
-            20: pygame.font.SysFont("Verdana", 20, bold=True),
-            30: pygame.font.SysFont("Verdana", 30, bold=True)
+            16: CACHE.font("Consolas", 16, bold=True),
+            20: CACHE.font("Verdana", 20, bold=True),
+            30: CACHE.font("Verdana", 30, bold=True)
         }
 
-    def add_particle(self, x, y, color):
-        p = Particle(x, y, color, random.uniform(20, 100), random.uniform(0.3, 0.8), random.uniform(3, 6))
-        self.particles.append(p)
+    def clear(self):
+        """Drops every live effect (decals live in the floor and are not touched)."""
+        self.particles.clear()
+        self.texts = []
+        self.props.clear()
+        self.ghosts = []
+
+    def add_particle(self, wx, wy, color):
+        if len(self.particles) >= self.max_particles: return
+        self.particles.emit(wx, wy, color, 1, (20, 100), (0.3, 0.8), (3, 6))
+
+    def add_particles(self, wxs, wys, color):
+        """add_particle at each (wx, wy) of two arrays, as one emit."""
+        n = min(len(wxs), self.max_particles - len(self.particles))
+        if n <= 0: return
+        self.particles.emit(wxs[:n], wys[:n], color, n, (20, 100), (0.3, 0.8), (3, 6))
 
-    def add_explosion(self, x, y, color=(255, 100, 50)):
-        for _ in range(15):
-            p = Particle(x, y, color, random.uniform(50, 150), random.uniform(0.5, 1.0), random.uniform(5, 10))
-            self.particles.append(p)
-        for _ in range(5):
-            p = Particle(x, y, (100, 100, 100), random.uniform(20, 80), 1.5, 8)
-            self.particles.append(p)
+    def add_explosion(self, wx, wy, color=(255, 100, 50)):
+        if len(self.particles) + 20 > self.max_particles: return
+        self.particles.emit(wx, wy, color, 15, (50, 150), (0.5, 1.0), (5, 10))
+        self.particles.emit(wx, wy, (100, 100, 100), 5, (20, 80), (1.5, 1.5), (8, 8))
 
     def add_text(self, x, y, msg, color=(255, 255, 255), duration=1.0, size=20):
-        self.texts.append(FloatingText(x, y, msg, color, duration, size))
+        t = FloatingText(x, y, msg, color, duration, size)
+        t.vy *= self.pixel_scale
+        self.texts.append(t)
 
     def add_casing(self, wx, wy):
-        self.casings.append(ShellCasing(wx, wy))
+        if len(self.props) >= self.max_casings: return
+        self.props.burst("casing", wx, wy, 1.0, 1, (2.0, 4.0), (8.0, 12.0))
 
     def add_debris(self, wx, wy, d_type, col=(100, 100, 100)):
-        self.debris.append(Debris(wx, wy, d_type, col))
+        if d_type == "robot_parts":
+            # Flung as chunk props; each one stamps where it comes to rest
+            if len(self.props) >= self.max_casings: return
+            shade = (col[0] * 0.5, col[1] * 0.5, col[2] * 0.5)
+            self.props.burst("chunk", wx, wy, 0.5, 3, (1.0, 3.0), (4.0, 8.0), shade)
+            return
+        Debris(wx, wy, d_type, col).stamp(self.floor)
 
     def add_ghost(self, wx, wy, color, radius):
+        if len(self.ghosts) >= self.max_ghosts: return
         self.ghosts.append(GhostTrace(wx, wy, color, radius))
 
     def add_crack(self, wx, wy, color=(200, 200, 200)):
-        self.cracks.append(CrackDecal(wx, wy, color))
+        CrackDecal(wx, wy, color).stamp(self.floor)
 
     def update(self, dt):
-        for p in self.particles: p.update(dt)
+        self.particles.update(dt)
         for t in self.texts: t.update(dt)
-        for c in self.casings: c.update(dt)
-        for d in self.debris: d.update(dt)
+        kinds, xs, ys, colors = self.props.update(dt)
+        for k, x, y, c in zip(kinds.tolist(), xs.tolist(), ys.tolist(), colors.tolist()):
+            if PROP_NAMES[k] == "chunk":
+                h = 0.06 * _RNG.uniform(0.8, 1.2)  # Per-chunk size, as Debris.scale
+                self.floor.stamp_polygon([(x - h, y - h), (x + h, y - h), (x + h, y + h), (x - h, y + h)], c)
         for g in self.ghosts: g.update(dt)
-        for k in self.cracks: k.update(dt)
 
-        self.particles = [p for p in self.particles if p.lifetime > 0]
         self.texts = [t for t in self.texts if t.timer < t.duration]
-        self.casings = [c for c in self.casings if c.lifetime > 0]
-        self.debris = [d for d in self.debris if d.lifetime > 0]
         self.ghosts = [g for g in self.ghosts if g.lifetime > 0]
-        self.cracks = [k for k in self.cracks if k.lifetime > 0]
-
-    def draw_floor(self, surf, cam):
-        for d in self.debris: d.draw(surf, cam)
-        for k in self.cracks: k.draw(surf, cam)  # Draw cracks on floor
 
     def draw_ghosts(self, surf, cam):
         for g in self.ghosts: g.draw(surf, cam)
 
     def draw_top(self, surf, cam):
-        for c in self.casings: c.draw(surf, cam)
-        for p in self.particles: p.draw(surf)
-        for t in self.texts: t.draw(surf, self.fonts)
\ No newline at end of file
+        self.props.draw(surf, cam)
+        self.particles.draw(surf, cam)
+
+    def draw_texts(self, surf, scale=1.0):
+        for t in self.texts: t.draw(surf, self.fonts, self.text_effects, scale)
+
+
+# ==========================================
+# PARTICLE BENCHMARK
+# ==========================================
+class _ScreenParticle:
+    """The screen-space particle ParticlePool replaced (one object per particle), kept as the bench baseline."""
+    __slots__ = ("x", "y", "vx", "vy", "color", "lifetime", "max_life", "size")
+
+    def __init__(self, x, y, color, speed, lifetime, size):
+        angle = random.uniform(0, 6.28)
+        self.x, self.y = x, y
+        self.vx = math.cos(angle) * speed
+        self.vy = math.sin(angle) * speed * 0.6
+        self.color = color
+        self.lifetime = self.max_life = lifetime
+        self.size = size
+
+    def update(self, dt):
+        self.x += self.vx * dt
+        self.y += self.vy * dt
+        self.lifetime -= dt
+        self.size = max(0, self.size - (self.size / self.max_life) * dt)
+
+    def draw(self, surf):
+        if self.lifetime > 0:
+            pygame.draw.circle(surf, self.color, (int(self.x), int(self.y)), int(self.size))
+
+
+def bench(n=10000, frames=30, size=(1280, 720)):
+    """Update + draw ms per frame for n long-lived particles: screen-space objects vs the world-space pool."""
+    import os
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    pygame.init()
+    from camera import Camera
+    surf = pygame.Surface(size)
+    cam = Camera(*size)
+    cam.focus_wx = cam.focus_wy = 20
+    random.seed(1)
+    points = [(random.uniform(10, 30), random.uniform(10, 30)) for _ in range(n)]
+    color, dt = (255, 120, 40), 1.0 / FPS
+
+    screen = []
+    for wx, wy in points:
+        sx, sy = cam.world_to_screen(wx, wy)
+        screen.append(_ScreenParticle(sx, sy, color, random.uniform(20, 100), 1e9, random.uniform(3, 6)))
+    pool = ParticlePool()
+    pool.emit(np.array([p[0] for p in points]), np.array([p[1] for p in points]), color, n, (20, 100), (1e9, 1e9),
+              (3, 6))
+
+    def screen_path():
+        # As the old VisualManager did it: update, filter the list, draw
+        for p in screen: p.update(dt)
+        screen[:] = [p for p in screen if p.lifetime > 0]
+        for p in screen: p.draw(surf)
+
+    def world_path():
+        pool.update(dt)
+        pool.draw(surf, cam)
+
+    row = []
+    for fn in (screen_path, world_path):
+        fn()  # Warm the dot sprites
+        t0 = time.perf_counter()
+        for _ in range(frames): fn()
+        row.append((time.perf_counter() - t0) * 1000.0 / frames)
+    print(f"{n} particles: screen-space objects {row[0]:6.2f} ms   world-space pool {row[1]:6.2f} ms "
+          f"(x{row[0] / row[1]:.1f})")
+
+
+if __name__ == "__main__":
+    # python visuals.py bench [count]
+    if len(sys.argv) > 1 and sys.argv[1] == "bench":
+        bench(*(int(a) for a in sys.argv[2:3]))
+    else:
+        print("usage: python visuals.py bench [count]")
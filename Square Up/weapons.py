@@ -0,0 +1,115 @@
+# weapons.py
+import numpy as np
+
+# ==========================================
+# PLAYER WEAPON DEFINITIONS
+# ==========================================
+# Weapons are plain data, one entry per weapon with a "normal" and an "ult"
+# (ultimate active) mode. Table order is the save/netplay weapon index, so
+# new weapons go at the end.
+#
+#   rate        multiplier on the player's fire_rate stat
+#   cooldown    extra wait after a shot, in shots (1.0 = none)
+#   recoil      knockback on the player per shot
+#   pellets     bullets per shot
+#   spread      random +/- angle per pellet (radians); "stat" = stats["spread"]
+#   fan         pellets evenly spaced over +/- fan before the random spread
+#   any_angle   ignore the aim and fire in a random direction (pistol ult)
+#   speed       multiplier on stats["bullet_speed"]; speed_jitter = (lo, hi)
+#               random multiplier per pellet
+#   damage      multiplier on stats["damage"]
+#   pierce      ("stat", n) = stats["pierce"] + n, or a fixed count
+#   casing      eject a shell casing per shot
+#
+# Each mode is compiled once into a WeaponMode. A shot is one pool.emit():
+# the pellet offsets and speed factors are drawn as one numpy block, so a
+# flamethrower throwing hundreds of flames a second costs the same Python
+# per shot as a pistol.
+
+WEAPONS = {
+    "pistol": {
+        "normal": {"rate": 1.0, "pellets": 1, "spread": "stat", "damage": 1.0, "pierce": ("stat", 0),
+                   "color": (255, 255, 150), "casing": True},
+        "ult": {"rate": 4.0, "cooldown": 0.2, "pellets": 1, "any_angle": True, "damage": 1.0, "pierce": ("stat", 0),
+                "color": (255, 255, 150)},
+    },
+    "shotgun": {
+        "normal": {"rate": 1.0, "cooldown": 1.5, "recoil": 3.0, "pellets": 5, "spread": 0.3,
+                   "speed_jitter": (0.8, 1.1), "damage": 0.6, "lifetime": 0.6, "color": (255, 100, 100),
+                   "casing": True},
+        "ult": {"rate": 2.5, "cooldown": 0.4, "pellets": 7, "spread": 0.6, "speed_jitter": (0.8, 1.1),
+                "damage": 0.6, "lifetime": 0.6, "color": (255, 50, 0)},
+    },
+    "sniper": {
+        "normal": {"rate": 1.0, "cooldown": 2.5, "recoil": 6.0, "speed": 2.0, "damage": 4.0, "pierce": ("stat", 10),
+                   "color": (100, 255, 255), "casing": True},
+        "ult": {"rate": 2.0, "cooldown": 0.5, "speed": 3.0, "damage": 8.0, "pierce": 999, "color": (0, 255, 255)},
+    },
+    "flamethrower": {
+        "normal": {"rate": 8.0, "pellets": 6, "spread": 0.25, "speed": 0.6, "speed_jitter": (0.7, 1.3),
+                   "damage": 0.15, "pierce": 2, "lifetime": 0.35, "radius": 7, "color": (255, 140, 40)},
+        "ult": {"rate": 16.0, "pellets": 12, "spread": 0.5, "speed": 0.7, "speed_jitter": (0.7, 1.4),
+                "damage": 0.2, "pierce": 4, "lifetime": 0.5, "radius": 8, "color": (255, 60, 0)},
+    },
+    "minigun": {
+        "normal": {"rate": 5.0, "recoil": 0.4, "pellets": 1, "spread": 0.12, "damage": 0.45, "pierce": ("stat", 0),
+                   "color": (255, 220, 120), "casing": True},
+        "ult": {"rate": 10.0, "pellets": 2, "fan": 0.08, "spread": 0.1, "damage": 0.45, "pierce": ("stat", 1),
+                "color": (255, 255, 255)},
+    },
+}
+
+WEAPON_NAMES = tuple(WEAPONS)
+
+
+class WeaponMode:
+    """One weapon mode baked for batched emission."""
+
+    def __init__(self, name, spec):
+        self.name = name
+        self.rate = spec.get("rate", 1.0)
+        self.cooldown = spec.get("cooldown", 1.0)
+        self.recoil = spec.get("recoil", 0.0)
+        self.pellets = spec.get("pellets", 1)
+        self.spread = spec.get("spread", 0.0)
+        self.any_angle = spec.get("any_angle", False)
+        self.speed = spec.get("speed", 1.0)
+        self.speed_jitter = spec.get("speed_jitter")
+        self.damage = spec.get("damage", 1.0)
+        self.pierce = spec.get("pierce", 0)
+        self.lifetime = spec.get("lifetime", 3.0)
+        self.radius = spec.get("radius", 5)
+        self.color = spec["color"]
+        self.casing = spec.get("casing", False)
+        fan = spec.get("fan", 0.0)
+        self.fan_table = np.linspace(-fan, fan, self.pellets) if fan and self.pellets > 1 else np.zeros(self.pellets)
+
+    def interval(self, stats):
+        return 1.0 / (stats["fire_rate"] * self.rate)
+
+    def fire(self, pool, wx, wy, aim_angle, stats, owner_id):
+        """Emits one shot into a BulletPool. Returns the number of bullets."""
+        n = self.pellets
+        spread = stats["spread"] if self.spread == "stat" else self.spread
+        if self.any_angle:
+            angles = np.random.uniform(0, 6.28, n)
+        elif spread:
+            angles = aim_angle + self.fan_table + np.random.uniform(-spread, spread, n)
+        else:
+            angles = aim_angle + self.fan_table
+        speed = stats["bullet_speed"] * self.speed
+        if self.speed_jitter:
+            speed = speed * np.random.uniform(self.speed_jitter[0], self.speed_jitter[1], n)
+        pierce = self.pierce
+        if isinstance(pierce, tuple): pierce = int(stats["pierce"]) + pierce[1]
+        pool.emit(wx, wy, np.cos(angles), np.sin(angles), speed, stats["damage"] * self.damage, pierce, self.color,
+                  owner_id, self.lifetime, self.radius)
+        return n
+
+
+COMPILED_WEAPONS = {name: {mode: WeaponMode(name, spec) for mode, spec in modes.items()}
+                    for name, modes in WEAPONS.items()}
+
+
+def weapon_mode(name, ultimate):
+    return COMPILED_WEAPONS[name]["ult" if ultimate else "normal"]